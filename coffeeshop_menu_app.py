@@ -34,6 +34,7 @@ disappears everywhere once merged/renamed.
 Run
 ---
   pip install flask
+  pip install orjson   # optional: faster JSON export
   python coffeeshop_menu_app.py --db database/coffeeshops.sqlite
   open http://127.0.0.1:5000
 
@@ -60,19 +61,50 @@ v5-full-ui-edit-by-id+true-rename-or-merge-strains
 from __future__ import annotations
 
 import argparse
+import atexit
+import bisect
+import contextlib
 import csv
+import functools
+import hashlib
+import importlib.util
+import inspect
+import io
 import json
+import math
 import os
 import re
 import sqlite3
 import subprocess
 import sys
+import threading
 import time
+import traceback
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-from urllib.parse import urlparse
-
-from flask import Flask, Response, jsonify, redirect, render_template_string, request, send_file, url_for
+from queue import Empty, Full, LifoQueue
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urlparse, uses_params
+
+from flask import (
+    Flask,
+    Response,
+    g,
+    has_request_context,
+    jsonify,
+    redirect,
+    request,
+    send_file,
+    stream_with_context,
+    url_for,
+)
+from jinja2 import DictLoader, FileSystemBytecodeCache
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import Markup
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
 
 # -----------------------------------------------------------------------------
 # Configuration
@@ -96,6 +128,39 @@ DEFAULT_LOCATION_FILES = {
     "Amsterdam": "amsterdamLoc.csv",
     "Utrecht": "utrechtLoc.csv",
 }
+# INSERT ... RETURNING needs SQLite 3.35+; older libraries fall back to a SELECT.
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+# LAG/LEAD window functions need SQLite 3.25+; older libraries walk the queue in Python.
+SQLITE_HAS_WINDOW_FUNCTIONS = sqlite3.sqlite_version_info >= (3, 25, 0)
+# Max ids bound into one "IN (?, ...)" list; stays under SQLITE_MAX_VARIABLE_NUMBER (999 before 3.32).
+SQL_IN_CHUNK_SIZE = 500
+# Suggestions returned per /api/strain_suggest call.
+STRAIN_SUGGEST_LIMIT = 30
+# Distinct queries whose suggestions are kept per data_revision.
+STRAIN_SUGGEST_CACHE_SIZE = 2048
+# Seconds a path_exists() answer may be reused; menu files and the CSV/scraper rarely move.
+PATH_EXISTS_TTL_S = 2
+# Held for the whole of each export_json_snapshot call.
+_EXPORT_LOCK = threading.Lock()
+# Idle SQLite connections create_app keeps for reuse; extra ones opened at busy moments are closed after use.
+DB_POOL_SIZE = 4
+# DB files already switched to WAL by db_connect during this process.
+_WAL_READY_PATHS: Set[str] = set()
+
+# Tables whose changes bump data_revision (everything export_json_snapshot reads).
+EXPORT_SOURCE_TABLES = ("shops", "menus", "menu_history", "strains", "shop_offerings", "menu_entries")
+# Bump when the JSON layout changes so unchanged-DB exports are rewritten anyway.
+EXPORT_FORMAT_VERSION = 1
+# Gives this DB file (or a fresh backup copy of it) a new random identity in data_revision.
+ASSIGN_DB_ID_SQL = "UPDATE data_revision SET db_id = lower(hex(randomblob(16))) WHERE id = 1"
+EXPORT_FILES = [
+    "shops.json",
+    "shop_lookup.json",
+    "strains.json",
+    "active_offerings.json",
+    "menu_entries.json",
+    "strain_index.json",
+]
 
 
 # -----------------------------------------------------------------------------
@@ -107,29 +172,75 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def utc_now_iso_cached() -> str:
+    """Like utc_now_iso(), but fixed for the duration of the current Flask request.
+
+    All rows written while handling one form post then share one timestamp.
+    Outside a request (CLI, scripts) this is just utc_now_iso().
+    """
+    if not has_request_context():
+        return utc_now_iso()
+    now = getattr(g, "_utc_now_iso", None)
+    if now is None:
+        now = g._utc_now_iso = utc_now_iso()
+    return now
+
+
 # -----------------------------------------------------------------------------
 # Scraper helpers
 # -----------------------------------------------------------------------------
 
+_SCRAPE_SUMMARY_RE = re.compile(r"^[ \t]*(New menus|Unchanged|Errors):[ \t]*(\d+)", re.M)
+_SCRAPE_SUMMARY_KEYS = {"New menus": "new", "Unchanged": "unchanged", "Errors": "errors"}
+
+
 def parse_scrape_summary(text: str) -> Dict[str, int]:
     """Parse summary counts from scrape_update_menus.py output."""
     summary = {"new": 0, "unchanged": 0, "errors": 0}
-    for raw in (text or "").splitlines():
-        line = raw.strip()
-        m = re.match(r"New menus:\s*(\d+)", line)
-        if m:
-            summary["new"] = int(m.group(1))
-            continue
-        m = re.match(r"Unchanged:\s*(\d+)", line)
-        if m:
-            summary["unchanged"] = int(m.group(1))
-            continue
-        m = re.match(r"Errors:\s*(\d+)", line)
-        if m:
-            summary["errors"] = int(m.group(1))
+    for m in _SCRAPE_SUMMARY_RE.finditer(text or ""):
+        summary[_SCRAPE_SUMMARY_KEYS[m.group(1)]] = int(m.group(2))
     return summary
 
 
+# Scraper modules imported in-process, keyed by absolute script path: (mtime_ns, module).
+_SCRAPER_MODULES: Dict[str, Tuple[int, Optional[Any]]] = {}
+
+
+def load_scraper_module(scraper_path: str) -> Optional[Any]:
+    """Import the scraper script, again whenever the file changes; None if unusable.
+
+    Unusable means it can't be imported or has no run() taking a `log` callable.
+    """
+    abs_path = os.path.abspath(scraper_path)
+    try:
+        mtime_ns = os.stat(abs_path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _SCRAPER_MODULES.get(abs_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    module: Optional[Any] = None
+    try:
+        name = os.path.splitext(os.path.basename(abs_path))[0]
+        spec = importlib.util.spec_from_file_location(name, abs_path)
+        if spec is not None and spec.loader is not None:
+            module = importlib.util.module_from_spec(spec)
+            # dataclasses resolve annotations through sys.modules while the module executes.
+            sys.modules[name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                sys.modules.pop(name, None)
+                raise
+            run = getattr(module, "run", None)
+            if not callable(run) or "log" not in inspect.signature(run).parameters:
+                module = None
+    except (Exception, SystemExit):
+        module = None
+    _SCRAPER_MODULES[abs_path] = (mtime_ns, module)
+    return module
+
+
 def run_scrape_update(
     scraper_path: str,
     shops_csv: str,
@@ -137,8 +248,54 @@ def run_scrape_update(
     out_dir: str,
     cwd: Optional[str] = None,
 ) -> Dict[str, object]:
-    """Run scrape_update_menus.py and return a structured result."""
+    """Run scrape_update_menus.py and return a structured result.
+
+    The scraper is imported and its run() called in-process, which skips the
+    interpreter start-up and returns the counts directly. Its log lines are collected
+    for the results page through run(log=...), so the process-wide sys.stdout is never
+    swapped. Scripts without a usable run() fall back to a subprocess.
+    """
     start = time.monotonic()
+    module = load_scraper_module(scraper_path)
+    if module is not None:
+
+        def resolve(path: str) -> str:
+            # Match the subprocess behaviour, where relative paths resolve against cwd.
+            return path if os.path.isabs(path) or not cwd else os.path.join(cwd, path)
+
+        out = io.StringIO()
+
+        def log(line: str) -> None:
+            out.write(line + "\n")
+
+        try:
+            counts = module.run(
+                shops_csv=resolve(shops_csv), db_path=resolve(db_path), out_dir=resolve(out_dir), log=log
+            )
+        except (Exception, SystemExit):
+            # SystemExit too: a sys.exit() in the script must fail the run, not stop the server thread.
+            stdout = out.getvalue()
+            return {
+                "ok": False,
+                "returncode": 1,
+                "stdout": stdout,
+                "stderr": traceback.format_exc(),
+                "duration_s": time.monotonic() - start,
+                "summary": parse_scrape_summary(stdout),
+            }
+        return {
+            "ok": True,
+            "returncode": 0,
+            "stdout": out.getvalue(),
+            "stderr": "",
+            "duration_s": time.monotonic() - start,
+            "summary": {
+                "new": int(counts.get("new", 0)),
+                "unchanged": int(counts.get("unchanged", 0)),
+                "errors": int(counts.get("errors", 0)),
+            },
+        }
+
     try:
         proc = subprocess.run(
             [sys.executable, scraper_path, "--shops", shops_csv, "--db", db_path, "--out-dir", out_dir],
@@ -264,24 +421,48 @@ def backup_db_before_scrape(db_path: str, base_dir: str) -> str:
     target = sqlite3.connect(backup_path)
     try:
         source.backup(target)
+        # A restored backup must not pass for the DB the last export was taken from.
+        with contextlib.suppress(sqlite3.OperationalError):
+            target.execute(f"{ASSIGN_DB_ID_SQL};")
+            target.commit()
     finally:
         target.close()
         source.close()
     return backup_path
 
 
+@functools.lru_cache(maxsize=1024)
+def _path_exists_in_window(path: str, window: int) -> bool:
+    return os.path.exists(path)
+
+
+def path_exists(path: str) -> bool:
+    """os.path.exists() memoised for PATH_EXISTS_TTL_S, for the status flags on rendered pages.
+
+    Anything that acts on the file should still call os.path.exists() itself.
+    """
+    return _path_exists_in_window(path, int(time.monotonic() // PATH_EXISTS_TTL_S))
+
+
 # -----------------------------------------------------------------------------
 # JSON export helpers (for static frontends / GitHub Pages)
 # -----------------------------------------------------------------------------
 
+_SLUG_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_URL_SCHEME_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.\-]*:")
+# urlsplit strips leading C0 controls and spaces, and drops tab/CR/LF anywhere in the URL.
+_URL_LEADING_STRIP = "".join(chr(i) for i in range(0x21))
+_URL_UNSAFE_CHARS_RE = re.compile(r"[\t\r\n]")
+
+
 def slug_token(text: str) -> str:
     """Return a lowercase URL/file-safe token."""
-    t = (text or "").strip().lower()
-    t = re.sub(r"[^a-z0-9]+", "-", t)
-    t = re.sub(r"-+", "-", t).strip("-")
+    # One pass suffices: the character class already collapses runs into a single "-".
+    t = _SLUG_NON_ALNUM_RE.sub("-", (text or "").strip().lower()).strip("-")
     return t or "unknown"
 
 
+@functools.lru_cache(maxsize=4096)
 def derive_shop_key(name: str, city: str, shop_url: str) -> str:
     """Derive a stable key for linking CSV rows to DB shops.
 
@@ -289,8 +470,22 @@ def derive_shop_key(name: str, city: str, shop_url: str) -> str:
     1) shop_url path basename (best stable identifier for this dataset)
     2) name+city slug fallback
     """
-    path = urlparse(shop_url or "").path or ""
-    base = os.path.basename(path).strip().lower()
+    # Same basename urlparse(...).path would give, via plain string splits.
+    u = _URL_UNSAFE_CHARS_RE.sub("", (shop_url or "").lstrip(_URL_LEADING_STRIP))
+    u = u.partition("#")[0].partition("?")[0]
+    scheme = ""
+    m = _URL_SCHEME_RE.match(u)
+    if m:
+        scheme = m.group()[:-1].lower()
+        u = u[m.end():]
+    if u.startswith("//"):
+        # Drop the netloc; a bare "https://host" has no path at all.
+        u = u[2:].partition("/")[2]
+    base = u.rpartition("/")[2]
+    if scheme in uses_params:
+        # urlparse splits ;params off the last segment only for schemes that use them.
+        base = base.partition(";")[0]
+    base = base.strip().lower()
     if base.endswith(".html"):
         base = base[:-5]
     if base:
@@ -298,11 +493,71 @@ def derive_shop_key(name: str, city: str, shop_url: str) -> str:
     return slug_token(f"{name}-{city}")
 
 
+def unique_shop_keys(base_keys: List[str]) -> List[str]:
+    """Suffix repeats of a key with -2, -3, ... in order, skipping suffixes already taken."""
+    used: Set[str] = set()
+    keys: List[str] = []
+    for base_key in base_keys:
+        key = base_key
+        n = 2
+        while key in used:
+            key = f"{base_key}-{n}"
+            n += 1
+        used.add(key)
+        keys.append(key)
+    return keys
+
+
+@contextlib.contextmanager
+def open_replacing(path: str) -> Iterator[BinaryIO]:
+    """Write to path + ".tmp" and move it over path only once the block completes.
+
+    Readers (and the published site) never see a half-written export file, even if the
+    process stops mid-write; a failed write leaves the previous file in place.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
 def json_dump(path: str, data: Any) -> None:
-    """Write pretty JSON with UTF-8 encoding."""
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    """Write pretty JSON with UTF-8 encoding (orjson when installed)."""
+    with open_replacing(path) as f:
+        if orjson is not None:
+            f.write(
+                orjson.dumps(
+                    data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+                )
+            )
+        else:
+            f.write((json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+
+
+def json_dump_rows(path: str, rows: Iterable[Any]) -> int:
+    """Stream a JSON array to disk one item at a time; returns the item count.
+
+    Output matches json_dump(path, list(rows)) without holding the whole list.
+    """
+    count = 0
+    with open_replacing(path) as f:
+        for item in rows:
+            if orjson is not None:
+                chunk = orjson.dumps(item, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                chunk = json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")
+            # JSON text never contains raw newlines inside strings, so re-indenting is safe.
+            f.write(b"[\n  " if count == 0 else b",\n  ")
+            f.write(chunk.replace(b"\n", b"\n  "))
+            count += 1
+        f.write(b"\n]\n" if count else b"[]\n")
+    return count
 
 
 def parse_csv_bool(raw: object, default: bool = False) -> bool:
@@ -579,282 +834,353 @@ def export_json_snapshot(conn: sqlite3.Connection, out_dir: str) -> Dict[str, An
     - menu_entries.json
     - strain_index.json
     - manifest.json
-    """
-    os.makedirs(out_dir, exist_ok=True)
-    exported_at_utc = utc_now_iso()
-
-    shop_rows = conn.execute(
-        """
-        SELECT s.id AS shop_id,
-               s.name,
-               s.city,
-               s.shop_url,
-               COALESCE(s.show_in_admin, 1) AS show_in_admin,
-               COALESCE(s.is_closed, 0) AS is_closed,
-               s.created_at,
-               s.updated_at,
-               COALESCE(m.status, '') AS menu_status,
-               COALESCE(m.fetched_at_utc, '') AS fetched_at_utc,
-               COALESCE(m.image_url, '') AS image_url,
-               COALESCE(m.sha256, '') AS menu_sha256,
-               COALESCE(m.bytes, 0) AS menu_bytes
-        FROM shops s
-        LEFT JOIN menus m ON m.shop_id = s.id
-        ORDER BY s.city, s.name;
-        """
-    ).fetchall()
 
-    shop_key_by_id: Dict[int, str] = {}
-    used_keys: Dict[str, int] = {}
-    shops: List[Dict[str, Any]] = []
+    Exports are serialised process-wide. Each file is swapped in whole (open_replacing),
+    but two overlapping exports (request threads, the startup export) could still leave
+    files from different snapshots side by side, and would share the fixed path + ".tmp".
+    """
+    with _EXPORT_LOCK:
+        manifest = _export_json_snapshot(conn, out_dir)
+    if not conn.in_transaction:
+        checkpoint_wal(conn)
+    return manifest
 
-    for r in shop_rows:
-        sid = int(r["shop_id"])
-        base_key = derive_shop_key(r["name"], r["city"], r["shop_url"])
-        key = base_key
-        n = 2
-        while key in used_keys and used_keys[key] != sid:
-            key = f"{base_key}-{n}"
-            n += 1
-        used_keys[key] = sid
-        shop_key_by_id[sid] = key
 
-        shops.append(
-            {
-                "shop_id": sid,
-                "shop_key": key,
-                "name": r["name"],
-                "city": r["city"],
-                "shop_url": r["shop_url"],
-                "show_in_admin": int(r["show_in_admin"] or 0),
-                "is_closed": int(r["is_closed"] or 0),
-                "menu_status": r["menu_status"],
-                "fetched_at_utc": r["fetched_at_utc"],
-                "image_url": r["image_url"],
-                "menu_sha256": r["menu_sha256"],
-                "menu_bytes": int(r["menu_bytes"] or 0),
-                "created_at": r["created_at"],
-                "updated_at": r["updated_at"],
-            }
-        )
+def _export_json_snapshot(conn: sqlite3.Connection, out_dir: str) -> Dict[str, Any]:
+    os.makedirs(out_dir, exist_ok=True)
+    exported_at_utc = utc_now_iso()
 
-    strains = [
-        {
-            "strain_id": int(r["strain_id"]),
-            "name_display": r["name_display"],
-            "name_normalised": r["name_normalised"],
-            "created_at": r["created_at"],
-        }
-        for r in conn.execute(
+    # Skip the export entirely when the DB has not changed since the manifest was written.
+    rev = get_data_revision(conn)
+    source_digest = f"v{EXPORT_FORMAT_VERSION}:{rev}" if rev is not None else ""
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    if source_digest and all(os.path.exists(os.path.join(out_dir, f)) for f in EXPORT_FILES):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = None
+        if isinstance(previous, dict) and previous.get("source_digest") == source_digest:
+            return previous
+
+    # One deferred read transaction gives every SELECT below the same snapshot
+    # and takes the shared lock once instead of per statement.
+    owns_txn = not conn.in_transaction
+    if owns_txn:
+        conn.execute("BEGIN DEFERRED;")
+    try:
+        # Repeated base keys get -2, -3, ... in (city, name) order, numbered in SQL.
+        shop_rows = conn.execute(
             """
-            SELECT DISTINCT
-                   st.id AS strain_id,
-                   st.name_display,
-                   st.name_normalised,
-                   st.created_at
-            FROM strains st
-            JOIN shop_offerings so ON so.strain_id = st.id
-            JOIN shops s ON s.id = so.shop_id
-            WHERE so.status = 'active'
-              AND COALESCE(s.show_in_admin, 1) = 1
-              AND COALESCE(s.is_closed, 0) = 0
-            ORDER BY st.name_display;
+            WITH keyed AS (
+                SELECT s.id AS shop_id,
+                       s.name,
+                       s.city,
+                       s.shop_url,
+                       COALESCE(s.show_in_admin, 1) AS show_in_admin,
+                       COALESCE(s.is_closed, 0) AS is_closed,
+                       s.created_at,
+                       s.updated_at,
+                       COALESCE(m.status, '') AS menu_status,
+                       COALESCE(m.fetched_at_utc, '') AS fetched_at_utc,
+                       COALESCE(m.image_url, '') AS image_url,
+                       COALESCE(m.sha256, '') AS menu_sha256,
+                       COALESCE(m.bytes, 0) AS menu_bytes,
+                       shop_key(s.name, s.city, s.shop_url) AS base_key,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY shop_key(s.name, s.city, s.shop_url)
+                           ORDER BY s.city, s.name
+                       ) AS key_rank
+                FROM shops s
+                LEFT JOIN menus m ON m.shop_id = s.id
+            )
+            SELECT keyed.*,
+                   CASE WHEN key_rank = 1 THEN base_key ELSE base_key || '-' || key_rank END AS shop_key
+            FROM keyed
+            ORDER BY city, name;
             """
         ).fetchall()
-    ]
+        shop_keys = [r["shop_key"] for r in shop_rows]
+        if len(set(shop_keys)) != len(shop_keys):
+            # A generated "x-2" met a shop whose own key is "x-2": settle it the slow way.
+            shop_keys = unique_shop_keys([r["base_key"] for r in shop_rows])
 
-    active_offerings_rows = conn.execute(
-        """
-        SELECT so.shop_id,
-               s.name AS shop_name,
-               s.city AS shop_city,
-               st.id AS strain_id,
-               st.name_display AS strain_name,
-               st.name_normalised AS strain_name_normalised,
-               so.base_type,
-               so.is_cali,
-               so.grower,
-               so.price_currency,
-               so.price_amount,
-               so.price_unit,
-               so.package_price_amount,
-               so.package_weight_g,
-               so.notes,
-               COALESCE(mh_new.menu_changed_at_utc, '') AS menu_changed_at_utc,
-               COALESCE(m.fetched_at_utc, '') AS menu_checked_at_utc,
-               COALESCE(m.status, '') AS menu_status,
-               so.last_seen_at_utc,
-               so.updated_at
-        FROM shop_offerings so
-        JOIN shops s ON s.id = so.shop_id
-        JOIN strains st ON st.id = so.strain_id
-        LEFT JOIN menus m ON m.shop_id = so.shop_id
-        LEFT JOIN (
-            SELECT shop_id, MAX(fetched_at_utc) AS menu_changed_at_utc
-            FROM menu_history
-            WHERE event_type = 'new_menu'
-            GROUP BY shop_id
-        ) mh_new ON mh_new.shop_id = so.shop_id
-        WHERE so.status = 'active'
-          AND COALESCE(s.show_in_admin, 1) = 1
-          AND COALESCE(s.is_closed, 0) = 0
-        ORDER BY st.name_display, s.city, s.name;
-        """
-    ).fetchall()
+        shop_key_by_id: Dict[int, str] = {}
+        shops: List[Dict[str, Any]] = []
 
-    active_offerings: List[Dict[str, Any]] = []
-    strain_index_map: Dict[str, Dict[str, Any]] = {}
-
-    for r in active_offerings_rows:
-        sid = int(r["shop_id"])
-        item = {
-            "shop_id": sid,
-            "shop_key": shop_key_by_id.get(sid, ""),
-            "shop_name": r["shop_name"],
-            "shop_city": r["shop_city"],
-            "strain_id": int(r["strain_id"]),
-            "strain_name": r["strain_name"],
-            "strain_name_normalised": r["strain_name_normalised"],
-            "base_type": r["base_type"],
-            "is_cali": int(r["is_cali"] or 0),
-            "grower": r["grower"] or "",
-            "price_currency": r["price_currency"],
-            "price_amount": float(r["price_amount"]),
-            "price_unit": r["price_unit"],
-            "package_price_amount": float(r["package_price_amount"] or r["price_amount"]),
-            "package_weight_g": float(r["package_weight_g"] or 1),
-            "notes": r["notes"] or "",
-            "menu_changed_at_utc": r["menu_changed_at_utc"] or "",
-            "menu_checked_at_utc": r["menu_checked_at_utc"] or "",
-            "menu_status": r["menu_status"] or "",
-            "last_seen_at_utc": r["last_seen_at_utc"],
-            "updated_at": r["updated_at"],
-        }
-        active_offerings.append(item)
-
-        skey = item["strain_name_normalised"]
-        if skey not in strain_index_map:
-            strain_index_map[skey] = {
-                "strain_name_normalised": skey,
-                "strain_name_display": item["strain_name"],
-                "shops": [],
-            }
-        strain_index_map[skey]["shops"].append(
-            {
-                "shop_id": item["shop_id"],
-                "shop_key": item["shop_key"],
-                "shop_name": item["shop_name"],
-                "shop_city": item["shop_city"],
-                "menu_changed_at_utc": item["menu_changed_at_utc"],
-                "menu_checked_at_utc": item["menu_checked_at_utc"],
-                "menu_status": item["menu_status"],
-            }
-        )
+        for r, key in zip(shop_rows, shop_keys):
+            sid = int(r["shop_id"])
+            shop_key_by_id[sid] = key
 
-    menu_entries = [
-        {
-            "entry_id": int(r["entry_id"]),
-            "shop_id": int(r["shop_id"]),
-            "shop_key": shop_key_by_id.get(int(r["shop_id"]), ""),
-            "strain_id": int(r["strain_id"]),
-            "strain_name": r["strain_name"],
-            "strain_name_normalised": r["strain_name_normalised"],
-            "base_type": r["base_type"],
-            "is_cali": int(r["is_cali"] or 0),
-            "grower": r["grower"] or "",
-            "price_currency": r["price_currency"],
-            "price_amount": float(r["price_amount"]),
-            "price_unit": r["price_unit"],
-            "package_price_amount": float(r["package_price_amount"] or r["price_amount"]),
-            "package_weight_g": float(r["package_weight_g"] or 1),
-            "notes": r["notes"] or "",
-            "menu_changed_at_utc": r["menu_changed_at_utc"] or "",
-            "menu_checked_at_utc": r["menu_checked_at_utc"] or "",
-            "menu_status": r["menu_status"] or "",
-            "created_at": r["created_at"],
-        }
-        for r in conn.execute(
+            shops.append(
+                {
+                    "shop_id": sid,
+                    "shop_key": key,
+                    "name": r["name"],
+                    "city": r["city"],
+                    "shop_url": r["shop_url"],
+                    "show_in_admin": int(r["show_in_admin"] or 0),
+                    "is_closed": int(r["is_closed"] or 0),
+                    "menu_status": r["menu_status"],
+                    "fetched_at_utc": r["fetched_at_utc"],
+                    "image_url": r["image_url"],
+                    "menu_sha256": r["menu_sha256"],
+                    "menu_bytes": int(r["menu_bytes"] or 0),
+                    "created_at": r["created_at"],
+                    "updated_at": r["updated_at"],
+                }
+            )
+
+        # The two largest result sets are read as plain tuples and unpacked positionally;
+        # sqlite3.Row key lookups cost a column-name scan per field on these wide rows.
+        offerings_cur = conn.cursor()
+        offerings_cur.row_factory = None
+        active_offerings_rows = offerings_cur.execute(
             """
-            SELECT me.id AS entry_id,
-                   me.shop_id,
-                   me.strain_id,
+            SELECT so.shop_id,
+                   s.name AS shop_name,
+                   s.city AS shop_city,
+                   st.id AS strain_id,
                    st.name_display AS strain_name,
                    st.name_normalised AS strain_name_normalised,
-                   me.base_type,
-                   me.is_cali,
-                   me.grower,
-                   me.price_currency,
-                   me.price_amount,
-                   me.price_unit,
-                   me.package_price_amount,
-                   me.package_weight_g,
-                   me.notes,
+                   st.created_at AS strain_created_at,
+                   so.base_type,
+                   so.is_cali,
+                   so.grower,
+                   so.price_currency,
+                   so.price_amount,
+                   so.price_unit,
+                   so.package_price_amount,
+                   so.package_weight_g,
+                   so.notes,
                    COALESCE(mh_new.menu_changed_at_utc, '') AS menu_changed_at_utc,
                    COALESCE(m.fetched_at_utc, '') AS menu_checked_at_utc,
                    COALESCE(m.status, '') AS menu_status,
-                   me.created_at
-            FROM menu_entries me
-            JOIN strains st ON st.id = me.strain_id
-            JOIN shops s ON s.id = me.shop_id
-            LEFT JOIN menus m ON m.shop_id = me.shop_id
+                   so.last_seen_at_utc,
+                   so.updated_at
+            FROM shop_offerings so
+            JOIN shops s ON s.id = so.shop_id
+            JOIN strains st ON st.id = so.strain_id
+            LEFT JOIN menus m ON m.shop_id = so.shop_id
             LEFT JOIN (
                 SELECT shop_id, MAX(fetched_at_utc) AS menu_changed_at_utc
                 FROM menu_history
                 WHERE event_type = 'new_menu'
                 GROUP BY shop_id
-            ) mh_new ON mh_new.shop_id = me.shop_id
-            WHERE COALESCE(s.show_in_admin, 1) = 1
+            ) mh_new ON mh_new.shop_id = so.shop_id
+            WHERE so.status = 'active'
+              AND COALESCE(s.show_in_admin, 1) = 1
               AND COALESCE(s.is_closed, 0) = 0
-            ORDER BY me.shop_id, st.name_display;
+            ORDER BY st.name_display, s.city, s.name;
             """
-        ).fetchall()
-    ]
+        )
+
+        # strains.json is exactly the distinct strains of the active offerings,
+        # so it is collected from the same rows (already ordered by name_display)
+        # instead of re-running the offerings JOIN as a separate DISTINCT query.
+        active_offerings: List[Dict[str, Any]] = []
+        strains_by_id: Dict[int, Dict[str, Any]] = {}
+        strain_index_map: Dict[str, Dict[str, Any]] = {}
+
+        for (
+            sid,
+            shop_name,
+            shop_city,
+            strain_id,
+            strain_name,
+            strain_name_normalised,
+            strain_created_at,
+            base_type,
+            is_cali,
+            grower,
+            price_currency,
+            price_amount,
+            price_unit,
+            package_price_amount,
+            package_weight_g,
+            notes,
+            menu_changed_at_utc,
+            menu_checked_at_utc,
+            menu_status,
+            last_seen_at_utc,
+            updated_at,
+        ) in active_offerings_rows:
+            sid = int(sid)
+            strain_id = int(strain_id)
+            if strain_id not in strains_by_id:
+                strains_by_id[strain_id] = {
+                    "strain_id": strain_id,
+                    "name_display": strain_name,
+                    "name_normalised": strain_name_normalised,
+                    "created_at": strain_created_at,
+                }
+            item = {
+                "shop_id": sid,
+                "shop_key": shop_key_by_id.get(sid, ""),
+                "shop_name": shop_name,
+                "shop_city": shop_city,
+                "strain_id": strain_id,
+                "strain_name": strain_name,
+                "strain_name_normalised": strain_name_normalised,
+                "base_type": base_type,
+                "is_cali": int(is_cali or 0),
+                "grower": grower or "",
+                "price_currency": price_currency,
+                "price_amount": float(price_amount),
+                "price_unit": price_unit,
+                "package_price_amount": float(package_price_amount or price_amount),
+                "package_weight_g": float(package_weight_g or 1),
+                "notes": notes or "",
+                "menu_changed_at_utc": menu_changed_at_utc or "",
+                "menu_checked_at_utc": menu_checked_at_utc or "",
+                "menu_status": menu_status or "",
+                "last_seen_at_utc": last_seen_at_utc,
+                "updated_at": updated_at,
+            }
+            active_offerings.append(item)
+
+            # Rows arrive by strain, then city and name, so each shops list is already in order.
+            index_entry = strain_index_map.get(strain_name_normalised)
+            if index_entry is None:
+                index_entry = strain_index_map[strain_name_normalised] = {
+                    "strain_name_normalised": strain_name_normalised,
+                    "strain_name_display": strain_name,
+                    "shops": [],
+                }
+            index_entry["shops"].append(
+                {
+                    "shop_id": sid,
+                    "shop_key": item["shop_key"],
+                    "shop_name": shop_name,
+                    "shop_city": shop_city,
+                    "menu_changed_at_utc": item["menu_changed_at_utc"],
+                    "menu_checked_at_utc": item["menu_checked_at_utc"],
+                    "menu_status": item["menu_status"],
+                }
+            )
+
+        strains = list(strains_by_id.values())
+        strain_index = sorted(strain_index_map.values(), key=lambda x: x["strain_name_normalised"])
+
+        entries_cur = conn.cursor()
+        entries_cur.row_factory = None
+        menu_entries_rows = (
+            {
+                "entry_id": int(entry_id),
+                "shop_id": int(shop_id),
+                "shop_key": shop_key_by_id.get(int(shop_id), ""),
+                "strain_id": int(strain_id),
+                "strain_name": strain_name,
+                "strain_name_normalised": strain_name_normalised,
+                "base_type": base_type,
+                "is_cali": int(is_cali or 0),
+                "grower": grower or "",
+                "price_currency": price_currency,
+                "price_amount": float(price_amount),
+                "price_unit": price_unit,
+                "package_price_amount": float(package_price_amount or price_amount),
+                "package_weight_g": float(package_weight_g or 1),
+                "notes": notes or "",
+                "menu_changed_at_utc": menu_changed_at_utc or "",
+                "menu_checked_at_utc": menu_checked_at_utc or "",
+                "menu_status": menu_status or "",
+                "created_at": created_at,
+            }
+            for (
+                entry_id,
+                shop_id,
+                strain_id,
+                strain_name,
+                strain_name_normalised,
+                base_type,
+                is_cali,
+                grower,
+                price_currency,
+                price_amount,
+                price_unit,
+                package_price_amount,
+                package_weight_g,
+                notes,
+                menu_changed_at_utc,
+                menu_checked_at_utc,
+                menu_status,
+                created_at,
+            ) in entries_cur.execute(
+                """
+                SELECT me.id AS entry_id,
+                       me.shop_id,
+                       me.strain_id,
+                       st.name_display AS strain_name,
+                       st.name_normalised AS strain_name_normalised,
+                       me.base_type,
+                       me.is_cali,
+                       me.grower,
+                       me.price_currency,
+                       me.price_amount,
+                       me.price_unit,
+                       me.package_price_amount,
+                       me.package_weight_g,
+                       me.notes,
+                       COALESCE(mh_new.menu_changed_at_utc, '') AS menu_changed_at_utc,
+                       COALESCE(m.fetched_at_utc, '') AS menu_checked_at_utc,
+                       COALESCE(m.status, '') AS menu_status,
+                       me.created_at
+                FROM menu_entries me
+                JOIN strains st ON st.id = me.strain_id
+                JOIN shops s ON s.id = me.shop_id
+                LEFT JOIN menus m ON m.shop_id = me.shop_id
+                LEFT JOIN (
+                    SELECT shop_id, MAX(fetched_at_utc) AS menu_changed_at_utc
+                    FROM menu_history
+                    WHERE event_type = 'new_menu'
+                    GROUP BY shop_id
+                ) mh_new ON mh_new.shop_id = me.shop_id
+                WHERE COALESCE(s.show_in_admin, 1) = 1
+                  AND COALESCE(s.is_closed, 0) = 0
+                ORDER BY me.shop_id, st.name_display;
+                """
+            )
+        )
 
-    shop_lookup = {
-        s["shop_key"]: {
-            "shop_id": s["shop_id"],
-            "name": s["name"],
-            "city": s["city"],
-            "shop_url": s["shop_url"],
-            "show_in_admin": s["show_in_admin"],
-            "is_closed": s["is_closed"],
+        shop_lookup = {
+            s["shop_key"]: {
+                "shop_id": s["shop_id"],
+                "name": s["name"],
+                "city": s["city"],
+                "shop_url": s["shop_url"],
+                "show_in_admin": s["show_in_admin"],
+                "is_closed": s["is_closed"],
+            }
+            for s in shops
         }
-        for s in shops
-    }
 
-    strain_index = list(strain_index_map.values())
-    strain_index.sort(key=lambda x: x["strain_name_normalised"])
-
-    json_dump(os.path.join(out_dir, "shops.json"), shops)
-    json_dump(os.path.join(out_dir, "shop_lookup.json"), shop_lookup)
-    json_dump(os.path.join(out_dir, "strains.json"), strains)
-    json_dump(os.path.join(out_dir, "active_offerings.json"), active_offerings)
-    json_dump(os.path.join(out_dir, "menu_entries.json"), menu_entries)
-    json_dump(os.path.join(out_dir, "strain_index.json"), strain_index)
-
-    manifest = {
-        "exported_at_utc": exported_at_utc,
-        "counts": {
-            "shops": len(shops),
-            "strains": len(strains),
-            "active_offerings": len(active_offerings),
-            "menu_entries": len(menu_entries),
-            "strain_index": len(strain_index),
-        },
-        "files": [
-            "shops.json",
-            "shop_lookup.json",
-            "strains.json",
-            "active_offerings.json",
-            "menu_entries.json",
-            "strain_index.json",
-        ],
-        "linking": {
-            "shop_key_note": "Use shops.shop_key as the stable CSV link key.",
-            "recommended_csv_column": "shop_key",
-        },
-    }
-    json_dump(os.path.join(out_dir, "manifest.json"), manifest)
+        json_dump(os.path.join(out_dir, "shops.json"), shops)
+        json_dump(os.path.join(out_dir, "shop_lookup.json"), shop_lookup)
+        json_dump(os.path.join(out_dir, "strains.json"), strains)
+        json_dump(os.path.join(out_dir, "active_offerings.json"), active_offerings)
+        menu_entries_count = json_dump_rows(os.path.join(out_dir, "menu_entries.json"), menu_entries_rows)
+        json_dump(os.path.join(out_dir, "strain_index.json"), strain_index)
+
+        manifest = {
+            "exported_at_utc": exported_at_utc,
+            "source_digest": source_digest,
+            "counts": {
+                "shops": len(shops),
+                "strains": len(strains),
+                "active_offerings": len(active_offerings),
+                "menu_entries": menu_entries_count,
+                "strain_index": len(strain_index),
+            },
+            "files": list(EXPORT_FILES),
+            "linking": {
+                "shop_key_note": "Use shops.shop_key as the stable CSV link key.",
+                "recommended_csv_column": "shop_key",
+            },
+        }
+        json_dump(manifest_path, manifest)
+    finally:
+        if owns_txn:
+            conn.commit()
     return manifest
 
 
@@ -862,14 +1188,67 @@ def export_json_snapshot(conn: sqlite3.Connection, out_dir: str) -> Dict[str, An
 # DB helpers
 # -----------------------------------------------------------------------------
 
-def db_connect(db_path: str) -> sqlite3.Connection:
-    """Connect to SQLite with foreign keys enabled and Row dict-like access."""
-    conn = sqlite3.connect(db_path)
+class ReusableConnection(sqlite3.Connection):
+    """Connection kept open across requests: close() only discards uncommitted work.
+
+    The views call c.close() when they are done; with a pooled connection that
+    must not drop the handle (and its page cache / statement cache). Pooled
+    connections are used by one request at a time but not always on the same thread.
+    """
+
+    def close(self) -> None:
+        if self.in_transaction:
+            self.rollback()
+
+    def close_for_real(self) -> None:
+        super().close()
+
+
+def db_connect(db_path: str, reusable: bool = False) -> sqlite3.Connection:
+    """Connect to SQLite with foreign keys enabled and Row dict-like access.
+
+    WAL is persistent in the DB file, so it is only requested once per path;
+    the remaining PRAGMAs are per-connection and applied every time.
+
+    page_size only takes effect for a brand-new file, so it is set before WAL
+    initialises the header; existing databases keep theirs (WAL forbids changing it).
+    """
+    conn = sqlite3.connect(
+        db_path,
+        factory=ReusableConnection if reusable else sqlite3.Connection,
+        check_same_thread=not reusable,
+        cached_statements=256,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    abs_path = os.path.abspath(db_path)
+    if abs_path not in _WAL_READY_PATHS:
+        conn.execute("PRAGMA page_size = 8192;")
+        conn.execute("PRAGMA journal_mode = WAL;")
+        _WAL_READY_PATHS.add(abs_path)
+    conn.executescript(
+        """
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+        """
+    )
+    # Same key as normalise_strain_name(), usable inside set-based SQL.
+    conn.create_function("norm_strain", 1, lambda name: normalise_strain_name(name or "")[0], deterministic=True)
+    conn.create_function("shop_key", 3, derive_shop_key, deterministic=True)
     return conn
 
 
+def checkpoint_wal(conn: sqlite3.Connection) -> None:
+    """Copy every committed WAL page into the DB file and empty the -wal file.
+
+    The DB files are tracked in git (and ignored -wal/-shm are not), so this runs
+    wherever the DB is handed off: after an export, after a scrape, at server exit.
+    """
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchall()
+
+
 def db_init(conn: sqlite3.Connection) -> None:
     """Create schema if missing.
 
@@ -901,6 +1280,8 @@ def db_init(conn: sqlite3.Connection) -> None:
             bytes INTEGER NOT NULL,
             status TEXT NOT NULL,   -- 'new' | 'processed' | 'error'
             error TEXT DEFAULT '',
+            http_etag TEXT NOT NULL DEFAULT '',
+            http_last_modified TEXT NOT NULL DEFAULT '',
             FOREIGN KEY(shop_id) REFERENCES shops(id) ON DELETE CASCADE
         );
 
@@ -996,7 +1377,10 @@ def db_init(conn: sqlite3.Connection) -> None:
             FOREIGN KEY(menu_history_id) REFERENCES menu_history(id) ON DELETE SET NULL
         );
 
-        CREATE INDEX IF NOT EXISTS idx_menus_status ON menus(status);
+        -- Queue/count joins filter menus by status and join on shop_id: covering. It also
+        -- serves every status-only lookup, so the old single-column index is dropped.
+        CREATE INDEX IF NOT EXISTS idx_menus_status_shop ON menus(status, shop_id);
+        DROP INDEX IF EXISTS idx_menus_status;
         CREATE INDEX IF NOT EXISTS idx_menu_entries_shop ON menu_entries(shop_id);
         CREATE INDEX IF NOT EXISTS idx_offerings_shop ON shop_offerings(shop_id);
         CREATE INDEX IF NOT EXISTS idx_offerings_status ON shop_offerings(status);
@@ -1004,8 +1388,40 @@ def db_init(conn: sqlite3.Connection) -> None:
         CREATE INDEX IF NOT EXISTS idx_menu_history_sha ON menu_history(sha256);
         CREATE INDEX IF NOT EXISTS idx_offering_history_shop ON offering_history(shop_id, observed_at_utc);
         CREATE INDEX IF NOT EXISTS idx_offering_history_strain ON offering_history(strain_id, observed_at_utc);
+        -- Export/admin JOINs: active offerings by strain, and latest new_menu per shop.
+        CREATE INDEX IF NOT EXISTS idx_offerings_status_strain ON shop_offerings(status, strain_id, shop_id);
+        CREATE INDEX IF NOT EXISTS idx_menu_history_event_shop ON menu_history(event_type, shop_id, fetched_at_utc);
+        -- Per-shop active counts and the auto-discontinue check read only this index
+        -- (menu_entries(shop_id, strain_id) is already covered by its UNIQUE constraint).
+        CREATE INDEX IF NOT EXISTS idx_offerings_shop_active
+            ON shop_offerings(shop_id, manual_status_lock, strain_id, status)
+            WHERE status = 'active';
+        -- /strain_lookup matches LOWER(name) LIKE '%text%', which no B-tree index can serve.
+        DROP INDEX IF EXISTS idx_strains_name_nocase;
+
+        -- Single change counter for the JSON export (see EXPORT_SOURCE_TABLES triggers);
+        -- db_id tells apart DB files whose counters happen to match.
+        CREATE TABLE IF NOT EXISTS data_revision (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL,
+            db_id TEXT
+        );
+        INSERT OR IGNORE INTO data_revision(id, revision) VALUES(1, 0);
         """
     )
+    conn.executescript(
+        "".join(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_revision
+            AFTER {op} ON {table}
+            BEGIN
+                UPDATE data_revision SET revision = revision + 1 WHERE id = 1;
+            END;
+            """
+            for table in EXPORT_SOURCE_TABLES
+            for op in ("INSERT", "UPDATE", "DELETE")
+        )
+    )
     # Backward-compatible migration for existing DBs.
     shop_cols = {str(r["name"]) for r in conn.execute("PRAGMA table_info(shops);").fetchall()}
     if "show_in_admin" not in shop_cols:
@@ -1013,6 +1429,11 @@ def db_init(conn: sqlite3.Connection) -> None:
     if "is_closed" not in shop_cols:
         conn.execute("ALTER TABLE shops ADD COLUMN is_closed INTEGER NOT NULL DEFAULT 0;")
 
+    menu_cols = {str(r["name"]) for r in conn.execute("PRAGMA table_info(menus);").fetchall()}
+    for column_name in ("http_etag", "http_last_modified"):
+        if column_name not in menu_cols:
+            conn.execute(f"ALTER TABLE menus ADD COLUMN {column_name} TEXT NOT NULL DEFAULT '';")
+
     migration_columns = {
         "menu_entries": [
             ("grower", "TEXT NOT NULL DEFAULT ''"),
@@ -1030,6 +1451,11 @@ def db_init(conn: sqlite3.Connection) -> None:
             ("package_weight_g", "REAL NOT NULL DEFAULT 1"),
         ],
     }
+    revision_cols = {str(r["name"]) for r in conn.execute("PRAGMA table_info(data_revision);").fetchall()}
+    if "db_id" not in revision_cols:
+        conn.execute("ALTER TABLE data_revision ADD COLUMN db_id TEXT;")
+    conn.execute(f"{ASSIGN_DB_ID_SQL} AND db_id IS NULL;")
+
     for table, columns in migration_columns.items():
         existing = {str(r["name"]) for r in conn.execute(f"PRAGMA table_info({table});").fetchall()}
         for column_name, column_sql in columns:
@@ -1043,12 +1469,100 @@ def db_init(conn: sqlite3.Connection) -> None:
             """
         )
     conn.commit()
+    ensure_strain_name_fts(conn)
+
+    # Give the planner statistics once; after that they are left to the operator.
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1';"
+    ).fetchone()
+    if not has_stats:
+        conn.execute("ANALYZE;")
+        conn.commit()
+    else:
+        # Indexes added after the first ANALYZE would otherwise stay unmeasured.
+        unmeasured = conn.execute(
+            """
+            SELECT name FROM sqlite_master
+            WHERE type = 'index' AND name LIKE 'idx_%'
+              AND name NOT IN (SELECT idx FROM sqlite_stat1 WHERE idx IS NOT NULL);
+            """
+        ).fetchall()
+        for r in unmeasured:
+            conn.execute(f"ANALYZE {r['name']};")
+        if unmeasured:
+            conn.commit()
+
+
+def ensure_strain_name_fts(conn: sqlite3.Connection) -> bool:
+    """Create (once) and return whether the trigram index over strains.name_display exists.
+
+    Trigram FTS5 serves LIKE '%text%' from an index (3+ character runs). It needs
+    SQLite 3.34+ built with FTS5; without it lookups keep scanning strains.
+    """
+    if has_strain_name_fts(conn):
+        return True
+    try:
+        conn.executescript(
+            """
+            BEGIN;
+            CREATE VIRTUAL TABLE strains_fts USING fts5(
+                name_display, content='strains', content_rowid='id', tokenize='trigram'
+            );
+            CREATE TRIGGER trg_strains_fts_insert AFTER INSERT ON strains BEGIN
+                INSERT INTO strains_fts(rowid, name_display) VALUES (new.id, new.name_display);
+            END;
+            CREATE TRIGGER trg_strains_fts_delete AFTER DELETE ON strains BEGIN
+                INSERT INTO strains_fts(strains_fts, rowid, name_display) VALUES ('delete', old.id, old.name_display);
+            END;
+            CREATE TRIGGER trg_strains_fts_update AFTER UPDATE OF name_display ON strains BEGIN
+                INSERT INTO strains_fts(strains_fts, rowid, name_display) VALUES ('delete', old.id, old.name_display);
+                INSERT INTO strains_fts(rowid, name_display) VALUES (new.id, new.name_display);
+            END;
+            INSERT INTO strains_fts(strains_fts) VALUES ('rebuild');
+            COMMIT;
+            """
+        )
+    except sqlite3.OperationalError:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        return False
+    return True
+
+
+def has_strain_name_fts(conn: sqlite3.Connection) -> bool:
+    """Whether db_init managed to create strains_fts on this DB."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'strains_fts';"
+    ).fetchone()
+    return row is not None
+
+
+def get_data_revision(conn: sqlite3.Connection) -> Optional[str]:
+    """"<db_id>:<counter>" from data_revision, or None on a DB that predates it.
+
+    The counter alone is not enough: another DB file, or a restored backup, can reach
+    the same counter with different data.
+    """
+    try:
+        row = conn.execute("SELECT db_id, revision FROM data_revision WHERE id = 1;").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if row is None or not row[0]:
+        return None
+    return f"{row[0]}:{int(row[1])}"
 
 
 # -----------------------------------------------------------------------------
 # Normalisation and parsing
 # -----------------------------------------------------------------------------
 
+# SQLite's LIKE folds ASCII letters only; Python-side prefix matching uses the same rule.
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_STRAIN_WS_RE = re.compile(r"\s+")
+_STRAIN_HAS_DIGIT_RE = re.compile(r"\d")
+_STRAIN_CODE_RE = re.compile(r"[A-Za-z0-9\- ]+")
+
+
 def normalise_strain_name(name: str) -> Tuple[str, str]:
     """Return (normalised, display) names.
 
@@ -1061,13 +1575,15 @@ def normalise_strain_name(name: str) -> Tuple[str, str]:
 
     # Collapse internal whitespace but otherwise preserve the user's intended capitalisation.
     # This is important for names like "Kosher OG" which should not be coerced to "Kosher Og".
-    s = re.sub(r"\s+", " ", raw).strip()
+    s = _STRAIN_WS_RE.sub(" ", raw)
 
     # Codes like AK47 / G13 (contains digits, short, safe chars)
     # For these, we prefer an uppercase normalised key and a display that keeps letters uppercase.
-    if re.search(r"\d", s) and re.fullmatch(r"[A-Za-z0-9\- ]+", s) and len(s) <= 24:
-        display = " ".join("".join(ch.upper() if ch.isalpha() else ch for ch in tok) for tok in s.split(" "))
-        return display.upper(), display
+    # Most names have no digits at all, so that check goes first and skips the fullmatch.
+    if len(s) <= 24 and _STRAIN_HAS_DIGIT_RE.search(s) and _STRAIN_CODE_RE.fullmatch(s):
+        # Only ASCII letters/digits/hyphens/single spaces remain, so upper() is the per-char upcase.
+        display = s.upper()
+        return display, display
 
     # Default behaviour:
     # - display: preserve the user's formatting (after whitespace collapse)
@@ -1080,15 +1596,20 @@ def normalise_strain_name(name: str) -> Tuple[str, str]:
 def parse_price_amount(text: str) -> float:
     """Parse a numeric price amount.
 
-    Accepts: 12 / 12.5 / 12,5
+    Accepts: 12 / 12.5 / 12,5 / .5
     """
     t = (text or "").strip()
     if not t:
         raise ValueError("Price amount is required.")
-    t = t.replace(",", ".")
-    if not re.fullmatch(r"\d+(?:\.\d+)?", t):
+    try:
+        value = float(t.replace(",", "."))
+    except ValueError:
+        raise ValueError("Price amount must be a number (e.g. 12 or 12.5).") from None
+    if not math.isfinite(value):
         raise ValueError("Price amount must be a number (e.g. 12 or 12.5).")
-    return float(t)
+    if value < 0:
+        raise ValueError("Price amount cannot be negative.")
+    return value
 
 
 def parse_positive_decimal(text: str, field_name: str) -> float:
@@ -1125,42 +1646,265 @@ def resolve_grower(grower_choice: str, grower_custom: str) -> str:
     return choice
 
 
-# -----------------------------------------------------------------------------
-# CRUD helpers
-# -----------------------------------------------------------------------------
+def format_unit_price(row: Any) -> str:
+    """Return the normalised price text, e.g. "€7.14/g"."""
+    return f"{row['price_currency']}{row['price_amount']:.2f}/{row['price_unit']}"
 
-def upsert_strain(conn: sqlite3.Connection, name: str) -> int:
-    """Insert a strain if missing; return strain_id.
 
-    NOTE:
-    This is used when adding new menu entries.
-    For correcting mistakes while editing, we now prefer a true rename/merge,
-    implemented in `rename_or_merge_strain_id(...)`.
-    """
-    norm, disp = normalise_strain_name(name)
-    if not norm:
-        raise ValueError("Strain name cannot be blank.")
+def format_price_display(row: Any) -> str:
+    """Return the table price text, e.g. "€25.00/3.5g pack · €7.14/g"."""
+    price = format_unit_price(row)
+    weight = row["package_weight_g"]
+    if weight and weight != 1:
+        return f"{row['price_currency']}{row['package_price_amount']:.2f}/{weight}g pack · {price}"
+    return price
 
-    now = utc_now_iso()
-    conn.execute(
-        """
-        INSERT INTO strains(name_normalised, name_display, created_at)
-        VALUES(?, ?, ?)
-        ON CONFLICT(name_normalised) DO UPDATE SET
-            name_display = excluded.name_display;
-        """,
-        (norm, disp, now),
-    )
-    row = conn.execute("SELECT id FROM strains WHERE name_normalised = ?;", (norm,)).fetchone()
-    assert row is not None
-    conn.commit()
-    return int(row["id"])
 
+def format_type_display(row: Any) -> str:
+    """Return the base type with its "(cali)" suffix."""
+    return f"{row['base_type']} (cali)" if row["is_cali"] else str(row["base_type"])
 
-def rename_or_merge_strain_id(
-    conn: sqlite3.Connection,
-    current_strain_id: int,
-    new_name: str,
+
+def with_display_fields(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Copy entry/offering rows with the price and type display strings filled in."""
+    out: List[Dict[str, Any]] = []
+    for r in rows:
+        d = dict(r)
+        d["unit_price_display"] = format_unit_price(d)
+        d["price_display"] = format_price_display(d)
+        d["type_display"] = format_type_display(d)
+        out.append(d)
+    return out
+
+
+# Keys of the entry and offering dicts on the shop page, in the order they are serialised.
+SHOP_ENTRY_FIELDS = (
+    "entry_id", "strain_id", "strain_name", "base_type", "is_cali", "grower",
+    "price_currency", "price_amount", "price_unit", "package_price_amount", "package_weight_g", "notes",
+)
+SHOP_OFFERING_FIELDS = (
+    "strain_id", "strain_name", "status", "last_seen_at_utc", "manual_status_lock", "discontinued_until_utc",
+)
+# The same for the read-only digitised menu page.
+DIGITISED_MENU_FIELDS = (
+    "strain", "base_type", "is_cali", "grower",
+    "price_currency", "price_amount", "price_unit", "package_price_amount", "package_weight_g", "notes",
+)
+DIGITISED_OFFERING_FIELDS = (
+    "strain", "status", "base_type", "is_cali", "grower",
+    "price_currency", "price_amount", "price_unit", "package_price_amount", "package_weight_g",
+    "last_seen_at_utc", "notes",
+)
+
+
+# Membership sets and messages for validate_menu_entry_fields; the config lists keep display order.
+_VALID_BASE_TYPE_SET = frozenset(VALID_BASE_TYPES)
+_SUPPORTED_CURRENCY_SET = frozenset(SUPPORTED_CURRENCIES)
+_BASE_TYPE_ERROR = f"Base type must be one of: {', '.join(VALID_BASE_TYPES)}"
+_CURRENCY_ERROR = f"Currency must be one of: {', '.join(SUPPORTED_CURRENCIES)}"
+
+
+def validate_menu_entry_fields(
+    base_type: str,
+    price_currency: str,
+    package_price_amount_text: str,
+    package_weight_choice: str,
+    package_weight_custom: str,
+) -> Tuple[str, str, float, float, float]:
+    """Validate add/edit form values.
+
+    Returns (base_type, price_currency, package_price_amount, package_weight_g, price_amount)
+    and raises ValueError with a user-facing message on bad input.
+    """
+    base_type = (base_type or "").strip().lower()
+    if base_type not in _VALID_BASE_TYPE_SET:
+        raise ValueError(_BASE_TYPE_ERROR)
+
+    price_currency = (price_currency or DEFAULT_CURRENCY).strip()
+    if price_currency not in _SUPPORTED_CURRENCY_SET:
+        raise ValueError(_CURRENCY_ERROR)
+
+    package_price_amount = parse_positive_decimal(package_price_amount_text, "Price amount")
+    package_weight_g = resolve_package_weight(package_weight_choice, package_weight_custom)
+    price_amount = normalised_price_per_gram(package_price_amount, package_weight_g)
+    return base_type, price_currency, package_price_amount, package_weight_g, price_amount
+
+
+# -----------------------------------------------------------------------------
+# CRUD helpers
+# -----------------------------------------------------------------------------
+
+# Conflict handling shared by the row and set-based upserts below, so they always update
+# the same columns the same way.
+_MENU_ENTRY_ON_CONFLICT_SQL = """
+    ON CONFLICT(shop_id, strain_id) DO UPDATE SET
+        base_type = excluded.base_type,
+        is_cali = excluded.is_cali,
+        grower = excluded.grower,
+        price_currency = excluded.price_currency,
+        price_amount = excluded.price_amount,
+        price_unit = excluded.price_unit,
+        package_price_amount = excluded.package_price_amount,
+        package_weight_g = excluded.package_weight_g,
+        notes = excluded.notes,
+        created_at = excluded.created_at;
+    """
+_SHOP_OFFERING_ON_CONFLICT_SQL = """
+    ON CONFLICT(shop_id, strain_id) DO UPDATE SET
+        base_type = excluded.base_type,
+        is_cali = excluded.is_cali,
+        grower = excluded.grower,
+        price_currency = excluded.price_currency,
+        price_amount = excluded.price_amount,
+        price_unit = excluded.price_unit,
+        package_price_amount = excluded.package_price_amount,
+        package_weight_g = excluded.package_weight_g,
+        notes = excluded.notes,
+        last_seen_at_utc = excluded.last_seen_at_utc,
+        updated_at = excluded.updated_at,
+        status = CASE
+            WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.status
+            ELSE 'active'
+        END,
+        discontinued_reason = CASE
+            WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_reason
+            ELSE ''
+        END,
+        discontinued_since_utc = CASE
+            WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_since_utc
+            ELSE ''
+        END,
+        discontinued_until_utc = CASE
+            WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_until_utc
+            ELSE ''
+        END;
+    """
+
+# Shared upserts for a current menu entry and its catalogue row (see add/sync/batch helpers).
+MENU_ENTRY_UPSERT_SQL = """
+    INSERT INTO menu_entries(
+        shop_id, strain_id, base_type, is_cali,
+        grower,
+        price_currency, price_amount, price_unit,
+        package_price_amount, package_weight_g,
+        notes, created_at
+    )
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """ + _MENU_ENTRY_ON_CONFLICT_SQL
+
+SHOP_OFFERING_UPSERT_SQL = """
+    INSERT INTO shop_offerings(
+        shop_id, strain_id,
+        base_type, is_cali,
+        grower,
+        price_currency, price_amount, price_unit,
+        package_price_amount, package_weight_g,
+        notes,
+        status,
+        discontinued_reason, discontinued_since_utc, discontinued_until_utc,
+        last_seen_at_utc,
+        manual_status_lock,
+        created_at, updated_at
+    )
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active', '', '', '', ?, 0, ?, ?)
+    """ + _SHOP_OFFERING_ON_CONFLICT_SQL
+
+# Set-based forms of the same upserts: clone active offerings into entries, and
+# reconcile the catalogue from the current entries (see load/reconcile helpers).
+MENU_ENTRY_CLONE_SQL = """
+    INSERT INTO menu_entries(
+        shop_id, strain_id, base_type, is_cali,
+        grower,
+        price_currency, price_amount, price_unit,
+        package_price_amount, package_weight_g,
+        notes, created_at
+    )
+    SELECT shop_id, strain_id, base_type, is_cali,
+           COALESCE(grower, ''),
+           price_currency, price_amount, COALESCE(NULLIF(price_unit, ''), ?),
+           COALESCE(NULLIF(package_price_amount, 0), price_amount),
+           COALESCE(NULLIF(package_weight_g, 0), 1),
+           TRIM(COALESCE(notes, ''), char(32, 9, 10, 13)), ?
+    FROM shop_offerings
+    WHERE shop_id = ? AND status = 'active'
+    ORDER BY id
+    """ + _MENU_ENTRY_ON_CONFLICT_SQL
+
+SHOP_OFFERING_RECONCILE_SQL = """
+    INSERT INTO shop_offerings(
+        shop_id, strain_id,
+        base_type, is_cali,
+        grower,
+        price_currency, price_amount, price_unit,
+        package_price_amount, package_weight_g,
+        notes,
+        status,
+        discontinued_reason, discontinued_since_utc, discontinued_until_utc,
+        last_seen_at_utc,
+        manual_status_lock,
+        created_at, updated_at
+    )
+    SELECT shop_id, strain_id,
+           base_type, is_cali,
+           COALESCE(grower, ''),
+           price_currency, price_amount, price_unit,
+           COALESCE(NULLIF(package_price_amount, 0), price_amount),
+           COALESCE(NULLIF(package_weight_g, 0), 1),
+           COALESCE(notes, ''),
+           'active',
+           '', '', '',
+           ?,
+           0,
+           ?, ?
+    FROM menu_entries
+    WHERE shop_id = ?
+    ORDER BY id
+    """ + _SHOP_OFFERING_ON_CONFLICT_SQL
+
+
+# menus.shop_id is UNIQUE, so this is an index lookup; rows already processed are left
+# untouched (no write, no data_revision bump).
+MARK_MENU_PROCESSED_SQL = """
+    UPDATE menus SET status = 'processed', error = ''
+    WHERE shop_id = ?
+      AND (status <> 'processed' OR COALESCE(error, '') <> '');
+    """
+
+
+def upsert_strain(conn: sqlite3.Connection, name: str) -> int:
+    """Insert a strain if missing; return strain_id.
+
+    NOTE:
+    This is used when adding new menu entries.
+    For correcting mistakes while editing, we now prefer a true rename/merge,
+    implemented in `rename_or_merge_strain_id(...)`.
+
+    Does not commit: the caller owns the transaction.
+    """
+    norm, disp = normalise_strain_name(name)
+    if not norm:
+        raise ValueError("Strain name cannot be blank.")
+
+    now = utc_now_iso_cached()
+    upsert_sql = """
+        INSERT INTO strains(name_normalised, name_display, created_at)
+        VALUES(?, ?, ?)
+        ON CONFLICT(name_normalised) DO UPDATE SET
+            name_display = excluded.name_display
+        """
+    if SQLITE_HAS_RETURNING:
+        row = conn.execute(upsert_sql + " RETURNING id;", (norm, disp, now)).fetchone()
+    else:
+        conn.execute(upsert_sql + ";", (norm, disp, now))
+        row = conn.execute("SELECT id FROM strains WHERE name_normalised = ?;", (norm,)).fetchone()
+    assert row is not None
+    return int(row[0])
+
+
+def rename_or_merge_strain_id(
+    conn: sqlite3.Connection,
+    current_strain_id: int,
+    new_name: str,
 ) -> Tuple[bool, int, str]:
     """Rename a strain in-place, or merge it into an existing strain.
 
@@ -1200,49 +1944,25 @@ def rename_or_merge_strain_id(
         (new_norm,),
     ).fetchone()
 
-    # Wrap rename/merge in a transaction so we don't leave partial state
+    # Wrap rename/merge in a savepoint so we don't leave partial state. Outside a
+    # transaction it behaves like BEGIN/COMMIT; inside one it nests in the caller's.
     try:
-        conn.execute("BEGIN;")
+        conn.execute("SAVEPOINT rename_strain;")
 
         if existing and int(existing["id"]) != current_strain_id:
             # MERGE: move all references from current_strain_id -> existing_id
             target_id = int(existing["id"])
 
-            # Resolve UNIQUE(shop_id, strain_id) collisions in menu_entries
-            conn.execute(
-                """
-                DELETE FROM menu_entries
-                WHERE strain_id = ?
-                  AND EXISTS (
-                      SELECT 1
-                      FROM menu_entries me2
-                      WHERE me2.shop_id = menu_entries.shop_id
-                        AND me2.strain_id = ?
-                  );
-                """,
-                (current_strain_id, target_id),
-            )
+            # Repoint references. UPDATE OR IGNORE skips rows whose (shop_id, strain_id)
+            # already exists for the target, leaving them on the old strain; deleting the
+            # old strain row then drops them via ON DELETE CASCADE (foreign_keys is on in
+            # db_connect). Same outcome as delete-collisions-then-update, in one statement.
             conn.execute(
-                "UPDATE menu_entries SET strain_id = ? WHERE strain_id = ?;",
+                "UPDATE OR IGNORE menu_entries SET strain_id = ? WHERE strain_id = ?;",
                 (target_id, current_strain_id),
             )
-
-            # Resolve UNIQUE(shop_id, strain_id) collisions in shop_offerings
             conn.execute(
-                """
-                DELETE FROM shop_offerings
-                WHERE strain_id = ?
-                  AND EXISTS (
-                      SELECT 1
-                      FROM shop_offerings so2
-                      WHERE so2.shop_id = shop_offerings.shop_id
-                        AND so2.strain_id = ?
-                  );
-                """,
-                (current_strain_id, target_id),
-            )
-            conn.execute(
-                "UPDATE shop_offerings SET strain_id = ? WHERE strain_id = ?;",
+                "UPDATE OR IGNORE shop_offerings SET strain_id = ? WHERE strain_id = ?;",
                 (target_id, current_strain_id),
             )
             conn.execute(
@@ -1250,7 +1970,7 @@ def rename_or_merge_strain_id(
                 (target_id, current_strain_id),
             )
 
-            # Delete the old strain row
+            # Delete the old strain row (and any collided leftovers with it)
             conn.execute("DELETE FROM strains WHERE id = ?;", (current_strain_id,))
 
             # Also update the target display name to the canonical "corrected" display
@@ -1260,7 +1980,7 @@ def rename_or_merge_strain_id(
                 (new_disp, target_id),
             )
 
-            conn.execute("COMMIT;")
+            conn.execute("RELEASE rename_strain;")
             return True, target_id, f"Merged into existing strain: {new_disp}"
 
         # RENAME in-place (no conflict)
@@ -1273,14 +1993,53 @@ def rename_or_merge_strain_id(
             """,
             (new_norm, new_disp, current_strain_id),
         )
-        conn.execute("COMMIT;")
+        conn.execute("RELEASE rename_strain;")
         return True, current_strain_id, f"Renamed strain to: {new_disp}"
 
     except Exception as e:
-        conn.execute("ROLLBACK;")
+        conn.execute("ROLLBACK TO rename_strain;")
+        conn.execute("RELEASE rename_strain;")
         return False, current_strain_id, f"Rename/merge failed: {e}"
 
 
+def renormalise_strain_keys(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """Re-derive strains.name_normalised from name_display (e.g. after normaliser changes).
+
+    Non-conflicting keys are fixed in one set-based UPDATE via the norm_strain() SQL
+    function. Strains whose new key is already taken are then merged into the owner
+    with rename_or_merge_strain_id(), so references are repointed as usual.
+
+    Returns:
+      (renamed_count, merged_count)
+    """
+    cur = conn.execute(
+        """
+        UPDATE OR IGNORE strains
+        SET name_normalised = norm_strain(name_display)
+        WHERE name_normalised <> norm_strain(name_display)
+          AND norm_strain(name_display) <> '';
+        """
+    )
+    renamed = max(cur.rowcount, 0)
+    conn.commit()
+
+    collisions = conn.execute(
+        """
+        SELECT id, name_display
+        FROM strains
+        WHERE name_normalised <> norm_strain(name_display)
+          AND norm_strain(name_display) <> ''
+        ORDER BY id;
+        """
+    ).fetchall()
+    merged = 0
+    for r in collisions:
+        ok, _target_id, _msg = rename_or_merge_strain_id(conn, int(r["id"]), str(r["name_display"]))
+        if ok:
+            merged += 1
+    return renamed, merged
+
+
 def sync_offering_from_menu_entry(
     conn: sqlite3.Connection,
     shop_id: int,
@@ -1295,54 +2054,11 @@ def sync_offering_from_menu_entry(
     notes: str,
 ) -> None:
     """Upsert into shop_offerings using the latest values from a menu entry."""
-    now = utc_now_iso()
-    is_cali_int = 1 if bool(is_cali) else 0
+    now = utc_now_iso_cached()
+    is_cali_int = int(bool(is_cali))
 
     conn.execute(
-        """
-        INSERT INTO shop_offerings(
-            shop_id, strain_id,
-            base_type, is_cali,
-            grower,
-            price_currency, price_amount, price_unit,
-            package_price_amount, package_weight_g,
-            notes,
-            status,
-            discontinued_reason, discontinued_since_utc, discontinued_until_utc,
-            last_seen_at_utc,
-            manual_status_lock,
-            created_at, updated_at
-        )
-        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active', '', '', '', ?, 0, ?, ?)
-        ON CONFLICT(shop_id, strain_id) DO UPDATE SET
-            base_type = excluded.base_type,
-            is_cali = excluded.is_cali,
-            grower = excluded.grower,
-            price_currency = excluded.price_currency,
-            price_amount = excluded.price_amount,
-            price_unit = excluded.price_unit,
-            package_price_amount = excluded.package_price_amount,
-            package_weight_g = excluded.package_weight_g,
-            notes = excluded.notes,
-            last_seen_at_utc = excluded.last_seen_at_utc,
-            updated_at = excluded.updated_at,
-            status = CASE
-                WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.status
-                ELSE 'active'
-            END,
-            discontinued_reason = CASE
-                WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_reason
-                ELSE ''
-            END,
-            discontinued_since_utc = CASE
-                WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_since_utc
-                ELSE ''
-            END,
-            discontinued_until_utc = CASE
-                WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_until_utc
-                ELSE ''
-            END;
-        """,
+        SHOP_OFFERING_UPSERT_SQL,
         (
             shop_id,
             strain_id,
@@ -1396,29 +2112,24 @@ def latest_menu_history_id_for_shop(conn: sqlite3.Connection, shop_id: int) -> O
     return int(row["id"]) if row else None
 
 
-def record_offering_history(
+def record_offering_history_from(
     conn: sqlite3.Connection,
-    shop_id: int,
-    strain_id: int,
+    from_sql: str,
+    params: Tuple[Any, ...],
     menu_history_id: Optional[int],
     event_type: str,
     status: str,
-    base_type: str,
-    is_cali: Any,
-    grower: str,
-    price_currency: str,
-    price_amount: Any,
-    price_unit: str,
-    package_price_amount: Any,
-    package_weight_g: Any,
-    notes: str,
     source: str,
-    observed_at_utc: Optional[str] = None,
-) -> None:
-    """Append one offering observation for future trend/history views."""
-    now = observed_at_utc or utc_now_iso()
-    conn.execute(
-        """
+    observed_at_utc: str,
+) -> int:
+    """Append one offering observation per row selected by `from_sql` (for trend/history views).
+
+    `from_sql` is a trusted FROM/WHERE(/ORDER BY) clause over a table with the offering
+    value columns (menu_entries or shop_offerings). Text values are trimmed and blank
+    currency/unit fall back to the defaults. Returns the number of rows written.
+    """
+    cur = conn.execute(
+        f"""
         INSERT INTO offering_history(
             shop_id, strain_id, menu_history_id,
             observed_at_utc, event_type, status,
@@ -1426,28 +2137,31 @@ def record_offering_history(
             package_price_amount, package_weight_g,
             notes, source, created_at
         )
-        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+        SELECT shop_id, strain_id, ?,
+               ?, ?, ?,
+               LOWER(TRIM(COALESCE(base_type, ''))),
+               CASE WHEN is_cali THEN 1 ELSE 0 END,
+               TRIM(COALESCE(grower, '')),
+               COALESCE(NULLIF(TRIM(COALESCE(price_currency, '')), ''), ?),
+               price_amount,
+               COALESCE(NULLIF(TRIM(COALESCE(price_unit, '')), ''), ?),
+               package_price_amount, package_weight_g,
+               TRIM(COALESCE(notes, ''), char(32, 9, 10, 13)), ?, ?
+        {from_sql};
         """,
         (
-            int(shop_id),
-            int(strain_id),
             menu_history_id,
-            now,
+            observed_at_utc,
             event_type,
             status,
-            (base_type or "").strip().lower(),
-            1 if bool(is_cali) else 0,
-            (grower or "").strip(),
-            (price_currency or DEFAULT_CURRENCY).strip() or DEFAULT_CURRENCY,
-            float(price_amount),
-            (price_unit or DEFAULT_UNIT).strip() or DEFAULT_UNIT,
-            float(package_price_amount),
-            float(package_weight_g),
-            (notes or "").strip(),
+            DEFAULT_CURRENCY,
+            DEFAULT_UNIT,
             source,
-            now,
+            observed_at_utc,
+            *params,
         ),
     )
+    return max(cur.rowcount, 0)
 
 
 def preferred_base_type_for_strain_id(conn: sqlite3.Connection, strain_id: int) -> str:
@@ -1491,7 +2205,7 @@ def consolidate_base_type_for_strain(
     base_type: str,
 ) -> Tuple[int, int]:
     """Apply one base_type to all current entries and offerings for a strain."""
-    now = utc_now_iso()
+    now = utc_now_iso_cached()
     menu_rows = conn.execute(
         """
         UPDATE menu_entries
@@ -1531,95 +2245,183 @@ def add_or_update_menu_entry(
     consolidate_type: bool = False,
 ) -> Tuple[bool, str]:
     """Upsert a row in menu_entries for this shop/strain (add flow)."""
-    base_type = (base_type or "").strip().lower()
-    if base_type not in VALID_BASE_TYPES:
-        return False, f"Base type must be one of: {', '.join(VALID_BASE_TYPES)}"
-
-    price_currency = (price_currency or DEFAULT_CURRENCY).strip()
-    if price_currency not in SUPPORTED_CURRENCIES:
-        return False, f"Currency must be one of: {', '.join(SUPPORTED_CURRENCIES)}"
-
     try:
-        package_price_amount = parse_positive_decimal(package_price_amount_text, "Price amount")
-        package_weight_g = resolve_package_weight(package_weight_choice, package_weight_custom)
-        price_amount = normalised_price_per_gram(package_price_amount, package_weight_g)
+        base_type, price_currency, package_price_amount, package_weight_g, price_amount = (
+            validate_menu_entry_fields(
+                base_type,
+                price_currency,
+                package_price_amount_text,
+                package_weight_choice,
+                package_weight_custom,
+            )
+        )
     except ValueError as e:
         return False, str(e)
 
     grower = resolve_grower(grower_choice, grower_custom)
+    now = utc_now_iso_cached()
+    is_cali_int = int(bool(is_cali))
 
+    # Strain upsert, entry upsert and catalogue sync commit together (one fsync).
     try:
+        conn.execute("BEGIN IMMEDIATE;")
         strain_id = upsert_strain(conn, strain_name)
+        conn.execute(
+            MENU_ENTRY_UPSERT_SQL,
+            (
+                shop_id,
+                strain_id,
+                base_type,
+                is_cali_int,
+                grower,
+                price_currency,
+                price_amount,
+                DEFAULT_UNIT,
+                package_price_amount,
+                package_weight_g,
+                (notes or "").strip(),
+                now,
+            ),
+        )
+
+        # Keep catalogue in sync so entries are visible immediately.
+        sync_offering_from_menu_entry(
+            conn,
+            shop_id=shop_id,
+            strain_id=strain_id,
+            base_type=base_type,
+            is_cali=bool(is_cali_int),
+            grower=grower,
+            price_currency=price_currency,
+            price_amount=price_amount,
+            package_price_amount=package_price_amount,
+            package_weight_g=package_weight_g,
+            notes=(notes or "").strip(),
+        )
+
+        msg = "Saved."
+        if consolidate_type:
+            menu_rows, offering_rows = consolidate_base_type_for_strain(conn, strain_id, base_type)
+            touched = menu_rows + offering_rows
+            if touched > 0:
+                msg = f"Saved. Consolidated type '{base_type}' across {touched} existing rows."
+            else:
+                msg = f"Saved. Type '{base_type}' was already consistent."
+
+        conn.execute("COMMIT;")
     except ValueError as e:
+        conn.execute("ROLLBACK;")
         return False, str(e)
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+    return True, msg
 
-    now = utc_now_iso()
-    is_cali_int = 1 if bool(is_cali) else 0
 
-    conn.execute(
-        """
-        INSERT INTO menu_entries(
-            shop_id, strain_id, base_type, is_cali,
-            grower,
-            price_currency, price_amount, price_unit,
-            package_price_amount, package_weight_g,
-            notes, created_at
+def add_menu_entries_batch(
+    conn: sqlite3.Connection,
+    shop_id: int,
+    rows: Iterable[Dict[str, Any]],
+) -> Tuple[int, List[str]]:
+    """Upsert many menu entries for one shop in a single transaction.
+
+    Each row uses the add-form field names (strain_name, base_type, is_cali,
+    grower_choice, grower_custom, price_currency, package_price_amount,
+    package_weight_choice, package_weight_custom, notes).
+
+    All-or-nothing: if any row fails validation nothing is written and the
+    per-row errors are returned. Later rows for the same strain win, exactly as
+    if the rows had been posted one by one.
+
+    Returns:
+      (saved_count, errors)
+    """
+    now = utc_now_iso_cached()
+    errors: List[str] = []
+    # name_normalised -> (display, entry values minus strain_id); dict keeps last-wins order.
+    entries: Dict[str, Tuple[str, Tuple[Any, ...]]] = {}
+
+    for i, row in enumerate(rows, start=1):
+        norm, disp = normalise_strain_name(str(row.get("strain_name", "") or ""))
+        if not norm:
+            errors.append(f"Row {i}: Strain name cannot be blank.")
+            continue
+        try:
+            base_type, price_currency, package_price_amount, package_weight_g, price_amount = (
+                validate_menu_entry_fields(
+                    str(row.get("base_type", "") or ""),
+                    str(row.get("price_currency", "") or ""),
+                    str(row.get("package_price_amount", "") or ""),
+                    str(row.get("package_weight_choice", "1") or ""),
+                    str(row.get("package_weight_custom", "") or ""),
+                )
+            )
+        except ValueError as e:
+            errors.append(f"Row {i}: {e}")
+            continue
+        grower = resolve_grower(
+            str(row.get("grower_choice", "") or ""),
+            str(row.get("grower_custom", "") or ""),
+        )
+        is_cali_int = 1 if row.get("is_cali") in (True, 1, "1", "on", "true") else 0
+        entries.pop(norm, None)
+        entries[norm] = (
+            disp,
+            (
+                base_type,
+                is_cali_int,
+                grower,
+                price_currency,
+                price_amount,
+                DEFAULT_UNIT,
+                package_price_amount,
+                package_weight_g,
+                str(row.get("notes", "") or "").strip(),
+            ),
         )
-        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(shop_id, strain_id) DO UPDATE SET
-            base_type = excluded.base_type,
-            is_cali = excluded.is_cali,
-            grower = excluded.grower,
-            price_currency = excluded.price_currency,
-            price_amount = excluded.price_amount,
-            price_unit = excluded.price_unit,
-            package_price_amount = excluded.package_price_amount,
-            package_weight_g = excluded.package_weight_g,
-            notes = excluded.notes,
-            created_at = excluded.created_at;
-        """,
-        (
-            shop_id,
-            strain_id,
-            base_type,
-            is_cali_int,
-            grower,
-            price_currency,
-            price_amount,
-            DEFAULT_UNIT,
-            package_price_amount,
-            package_weight_g,
-            (notes or "").strip(),
-            now,
-        ),
-    )
 
-    # Keep catalogue in sync so entries are visible immediately.
-    sync_offering_from_menu_entry(
-        conn,
-        shop_id=shop_id,
-        strain_id=strain_id,
-        base_type=base_type,
-        is_cali=bool(is_cali_int),
-        grower=grower,
-        price_currency=price_currency,
-        price_amount=price_amount,
-        package_price_amount=package_price_amount,
-        package_weight_g=package_weight_g,
-        notes=(notes or "").strip(),
-    )
+    if errors:
+        return 0, errors
+    if not entries:
+        return 0, []
 
-    msg = "Saved."
-    if consolidate_type:
-        menu_rows, offering_rows = consolidate_base_type_for_strain(conn, strain_id, base_type)
-        touched = menu_rows + offering_rows
-        if touched > 0:
-            msg = f"Saved. Consolidated type '{base_type}' across {touched} existing rows."
-        else:
-            msg = f"Saved. Type '{base_type}' was already consistent."
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        conn.executemany(
+            """
+            INSERT INTO strains(name_normalised, name_display, created_at)
+            VALUES(?, ?, ?)
+            ON CONFLICT(name_normalised) DO UPDATE SET
+                name_display = excluded.name_display;
+            """,
+            [(norm, disp, now) for norm, (disp, _vals) in entries.items()],
+        )
 
-    conn.commit()
-    return True, msg
+        # Resolve ids in chunks to stay well under SQLite's bound-parameter limit.
+        norms = list(entries)
+        strain_ids: Dict[str, int] = {}
+        for start in range(0, len(norms), SQL_IN_CHUNK_SIZE):
+            chunk = norms[start:start + SQL_IN_CHUNK_SIZE]
+            placeholders = ",".join("?" for _ in chunk)
+            for r in conn.execute(
+                f"SELECT id, name_normalised FROM strains WHERE name_normalised IN ({placeholders});",
+                chunk,
+            ):
+                strain_ids[str(r["name_normalised"])] = int(r["id"])
+
+        conn.executemany(
+            MENU_ENTRY_UPSERT_SQL,
+            [(shop_id, strain_ids[norm], *vals, now) for norm, (_disp, vals) in entries.items()],
+        )
+        conn.executemany(
+            SHOP_OFFERING_UPSERT_SQL,
+            [(shop_id, strain_ids[norm], *vals, now, now, now) for norm, (_disp, vals) in entries.items()],
+        )
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+    return len(entries), []
 
 
 def update_menu_entry_by_id(
@@ -1643,157 +2445,133 @@ def update_menu_entry_by_id(
     - If the user edits the strain name, we now RENAME or MERGE the *existing* strain,
       rather than creating a new strain_id and leaving the wrong one behind.
     """
-    base_type = (base_type or "").strip().lower()
-    if base_type not in VALID_BASE_TYPES:
-        return False, f"Base type must be one of: {', '.join(VALID_BASE_TYPES)}"
-
-    price_currency = (price_currency or DEFAULT_CURRENCY).strip()
-    if price_currency not in SUPPORTED_CURRENCIES:
-        return False, f"Currency must be one of: {', '.join(SUPPORTED_CURRENCIES)}"
-
     try:
-        package_price_amount = parse_positive_decimal(package_price_amount_text, "Price amount")
-        package_weight_g = resolve_package_weight(package_weight_choice, package_weight_custom)
-        price_amount = normalised_price_per_gram(package_price_amount, package_weight_g)
+        base_type, price_currency, package_price_amount, package_weight_g, price_amount = (
+            validate_menu_entry_fields(
+                base_type,
+                price_currency,
+                package_price_amount_text,
+                package_weight_choice,
+                package_weight_custom,
+            )
+        )
     except ValueError as e:
         return False, str(e)
     grower = resolve_grower(grower_choice, grower_custom)
 
-    # Ensure entry exists and belongs to this shop
-    existing = conn.execute(
-        """
-        SELECT me.id, me.shop_id, me.strain_id,
-               st.name_normalised AS strain_norm,
-               st.name_display AS strain_display
-        FROM menu_entries me
-        JOIN strains st ON st.id = me.strain_id
-        WHERE me.id = ? AND me.shop_id = ?;
-        """,
-        (entry_id, shop_id),
-    ).fetchone()
-    if not existing:
-        return False, "Entry not found."
-
-    current_strain_id = int(existing["strain_id"])
-    current_norm = str(existing["strain_norm"])
-
-    # Decide if the strain name is changing (based on normalised form)
-    new_norm, _new_disp = normalise_strain_name(new_strain_name)
-    if not new_norm:
-        return False, "Strain name cannot be blank."
-
-    # If normalised differs, do a rename/merge of the *existing* strain_id
-    resulting_strain_id = current_strain_id
-    rename_msg = ""
-    if new_norm != current_norm:
-        ok, resulting_strain_id, rename_msg = rename_or_merge_strain_id(
-            conn, current_strain_id=current_strain_id, new_name=new_strain_name
-        )
-        if not ok:
-            return False, rename_msg
-    else:
-        # Same normalised name: still allow updating display string (fix casing)
-        ok, resulting_strain_id, rename_msg = rename_or_merge_strain_id(
-            conn, current_strain_id=current_strain_id, new_name=new_strain_name
-        )
-        if not ok:
-            return False, rename_msg
-
-    now = utc_now_iso()
-    is_cali_int = 1 if bool(is_cali) else 0
-
-    # If the rename resulted in a different strain_id (merge), we might have collided
-    # with an existing entry for this shop. Resolve: keep the target one, delete this one.
-    if resulting_strain_id != current_strain_id:
-        clash = conn.execute(
+    # Rename/merge, entry UPDATE (or merge-clash DELETE) and catalogue sync commit together.
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        # Ensure entry exists and belongs to this shop
+        existing = conn.execute(
             """
-            SELECT id FROM menu_entries
-            WHERE shop_id = ? AND strain_id = ? AND id != ?;
+            SELECT me.id, me.shop_id, me.strain_id,
+                   st.name_normalised AS strain_norm,
+                   st.name_display AS strain_display
+            FROM menu_entries me
+            JOIN strains st ON st.id = me.strain_id
+            WHERE me.id = ? AND me.shop_id = ?;
             """,
-            (shop_id, resulting_strain_id, entry_id),
+            (entry_id, shop_id),
         ).fetchone()
-        if clash:
-            # Delete this entry, because the shop already has the merged strain entry.
-            conn.execute("DELETE FROM menu_entries WHERE id = ? AND shop_id = ?;", (entry_id, shop_id))
-            conn.commit()
-            return True, f"{rename_msg}. Note: merged with existing shop entry; duplicate removed."
-
-    # Update the menu entry row values (strain_id may have changed if merged)
-    conn.execute(
-        """
-        UPDATE menu_entries
-        SET strain_id = ?,
-            base_type = ?,
-            is_cali = ?,
-            grower = ?,
-            price_currency = ?,
-            price_amount = ?,
-            price_unit = ?,
-            package_price_amount = ?,
-            package_weight_g = ?,
-            notes = ?,
-            created_at = ?
-        WHERE id = ? AND shop_id = ?;
-        """,
-        (
-            resulting_strain_id,
-            base_type,
-            is_cali_int,
-            grower,
-            price_currency,
-            price_amount,
-            DEFAULT_UNIT,
-            package_price_amount,
-            package_weight_g,
-            (notes or "").strip(),
-            now,
-            entry_id,
-            shop_id,
-        ),
-    )
-
-    # Sync catalogue so changes are visible immediately.
-    sync_offering_from_menu_entry(
-        conn,
-        shop_id=shop_id,
-        strain_id=resulting_strain_id,
-        base_type=base_type,
-        is_cali=bool(is_cali_int),
-        grower=grower,
-        price_currency=price_currency,
-        price_amount=price_amount,
-        package_price_amount=package_price_amount,
-        package_weight_g=package_weight_g,
-        notes=(notes or "").strip(),
-    )
+        if not existing:
+            conn.execute("ROLLBACK;")
+            return False, "Entry not found."
+
+        current_strain_id = int(existing["strain_id"])
+        current_norm = str(existing["strain_norm"])
+
+        # Decide if the strain name is changing (based on normalised form).
+        # After a successful rename/merge/no-op the strain's display is exactly new_disp.
+        new_norm, new_disp = normalise_strain_name(new_strain_name)
+        if not new_norm:
+            conn.execute("ROLLBACK;")
+            return False, "Strain name cannot be blank."
+
+        # Rename/merge the *existing* strain_id when the normalised name changes, or when
+        # only the display string does (fix casing). Unchanged names (the usual price/notes
+        # edit) skip the rename helper entirely.
+        resulting_strain_id = current_strain_id
+        rename_msg = ""
+        if new_norm != current_norm or new_disp != str(existing["strain_display"]):
+            ok, resulting_strain_id, rename_msg = rename_or_merge_strain_id(
+                conn, current_strain_id=current_strain_id, new_name=new_strain_name
+            )
+            if not ok:
+                conn.execute("ROLLBACK;")
+                return False, rename_msg
 
-    conn.commit()
+        now = utc_now_iso_cached()
+        is_cali_int = int(bool(is_cali))
 
-    # Read back saved state
-    saved = conn.execute(
-        """
-        SELECT me.id AS entry_id,
-               st.name_display AS strain_name,
-               me.base_type, me.is_cali,
-               me.grower,
-               me.price_currency, me.price_amount, me.price_unit,
-               me.package_price_amount, me.package_weight_g,
-               me.notes
-        FROM menu_entries me
-        JOIN strains st ON st.id = me.strain_id
-        WHERE me.id = ? AND me.shop_id = ?;
-        """,
-        (entry_id, shop_id),
-    ).fetchone()
+        # Update the menu entry row values (strain_id may have changed if merged).
+        # The success message is built from the values written here, so no re-load is needed.
+        cur = conn.execute(
+            """
+            UPDATE menu_entries
+            SET strain_id = ?,
+                base_type = ?,
+                is_cali = ?,
+                grower = ?,
+                price_currency = ?,
+                price_amount = ?,
+                price_unit = ?,
+                package_price_amount = ?,
+                package_weight_g = ?,
+                notes = ?,
+                created_at = ?
+            WHERE id = ? AND shop_id = ?;
+            """,
+            (
+                resulting_strain_id,
+                base_type,
+                is_cali_int,
+                grower,
+                price_currency,
+                price_amount,
+                DEFAULT_UNIT,
+                package_price_amount,
+                package_weight_g,
+                (notes or "").strip(),
+                now,
+                entry_id,
+                shop_id,
+            ),
+        )
+        if not cur.rowcount:
+            if resulting_strain_id != current_strain_id:
+                # The merge collided with this shop's existing entry for the target strain:
+                # that entry is kept and this one was removed with the old strain.
+                conn.execute("COMMIT;")
+                return True, f"{rename_msg}. Note: merged with existing shop entry; duplicate removed."
+            conn.execute("ROLLBACK;")
+            return False, "Save failed: entry no longer exists."
+
+        # Sync catalogue so changes are visible immediately.
+        sync_offering_from_menu_entry(
+            conn,
+            shop_id=shop_id,
+            strain_id=resulting_strain_id,
+            base_type=base_type,
+            is_cali=bool(is_cali_int),
+            grower=grower,
+            price_currency=price_currency,
+            price_amount=price_amount,
+            package_price_amount=package_price_amount,
+            package_weight_g=package_weight_g,
+            notes=(notes or "").strip(),
+        )
 
-    if not saved:
-        return False, "Save failed: could not re-load saved entry."
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
 
     prefix = (rename_msg + ". ") if rename_msg else ""
     return True, (
-        f"{prefix}Updated. Now: {saved['strain_name']} · {saved['base_type']}"
-        f"{' (cali)' if int(saved['is_cali']) else ''}, "
-        f"{saved['price_currency']}{float(saved['price_amount']):.2f}/{saved['price_unit']}"
+        f"{prefix}Updated. Now: {new_disp} · {base_type}"
+        f"{' (cali)' if is_cali_int else ''}, "
+        f"{price_currency}{float(price_amount):.2f}/{DEFAULT_UNIT}"
     )
 
 
@@ -1805,15 +2583,15 @@ def delete_menu_entry_by_id(conn: sqlite3.Connection, shop_id: int, entry_id: in
 
 def normalise_entry_ids(entry_ids: Iterable[Any]) -> List[int]:
     """Convert submitted entry IDs to a sorted unique integer list."""
-    clean_ids: List[int] = []
+    clean_ids: Set[int] = set()
     for raw in entry_ids:
         try:
             entry_id = int(raw)
         except (TypeError, ValueError):
             continue
         if entry_id > 0:
-            clean_ids.append(entry_id)
-    return sorted(set(clean_ids))
+            clean_ids.add(entry_id)
+    return sorted(clean_ids)
 
 
 def delete_menu_entries_by_ids(
@@ -1826,34 +2604,54 @@ def delete_menu_entries_by_ids(
     if not clean_ids:
         return 0
 
-    placeholders = ", ".join(["?"] * len(clean_ids))
-    cur = conn.execute(
-        f"DELETE FROM menu_entries WHERE shop_id = ? AND id IN ({placeholders});",
-        (shop_id, *clean_ids),
-    )
-    conn.commit()
-    return max(int(cur.rowcount or 0), 0)
+    # One DELETE per chunk of ids, all inside a single transaction.
+    removed = 0
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        for start in range(0, len(clean_ids), SQL_IN_CHUNK_SIZE):
+            chunk = clean_ids[start:start + SQL_IN_CHUNK_SIZE]
+            placeholders = ", ".join(["?"] * len(chunk))
+            cur = conn.execute(
+                f"DELETE FROM menu_entries WHERE shop_id = ? AND id IN ({placeholders});",
+                (shop_id, *chunk),
+            )
+            removed += max(int(cur.rowcount or 0), 0)
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+    return removed
 
 
 def keep_only_menu_entries_by_ids(conn: sqlite3.Connection, shop_id: int, entry_ids: Iterable[Any]) -> Dict[str, int]:
     """Keep only selected current menu entries for one shop."""
     keep_ids = normalise_entry_ids(entry_ids)
-    before = count_menu_entries_for_shop(conn, shop_id)
-    if before <= 0:
-        return {"before": 0, "after": 0, "removed": 0}
-
-    if not keep_ids:
-        conn.execute("DELETE FROM menu_entries WHERE shop_id = ?;", (shop_id,))
-    else:
-        placeholders = ", ".join(["?"] * len(keep_ids))
-        conn.execute(
-            f"DELETE FROM menu_entries WHERE shop_id = ? AND id NOT IN ({placeholders});",
-            (shop_id, *keep_ids),
-        )
-    conn.commit()
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        before = count_menu_entries_for_shop(conn, shop_id)
+        if before <= 0:
+            conn.execute("ROLLBACK;")
+            return {"before": 0, "after": 0, "removed": 0}
 
-    after = count_menu_entries_for_shop(conn, shop_id)
-    return {"before": before, "after": after, "removed": max(before - after, 0)}
+        if not keep_ids:
+            cur = conn.execute("DELETE FROM menu_entries WHERE shop_id = ?;", (shop_id,))
+        else:
+            # The ids to keep go through a connection-local temp table rather than a
+            # NOT IN placeholder list (no parameter limit, indexed lookup per row).
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_entry_ids (id INTEGER PRIMARY KEY);")
+            conn.execute("DELETE FROM temp.keep_entry_ids;")
+            conn.executemany("INSERT INTO temp.keep_entry_ids (id) VALUES (?);", ((i,) for i in keep_ids))
+            cur = conn.execute(
+                "DELETE FROM menu_entries WHERE shop_id = ? AND id NOT IN (SELECT id FROM temp.keep_entry_ids);",
+                (shop_id,),
+            )
+        # The DELETE's rowcount gives the removed total; no second COUNT(*) needed.
+        removed = max(int(cur.rowcount or 0), 0)
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+    return {"before": before, "after": max(before - removed, 0), "removed": removed}
 
 
 def count_menu_entries_for_shop(conn: sqlite3.Connection, shop_id: int) -> int:
@@ -1862,7 +2660,7 @@ def count_menu_entries_for_shop(conn: sqlite3.Connection, shop_id: int) -> int:
         "SELECT COUNT(*) AS n FROM menu_entries WHERE shop_id = ?;",
         (shop_id,),
     ).fetchone()
-    return int(row["n"] if row else 0)
+    return int(row[0]) if row else 0
 
 
 def count_active_offerings_for_shop(conn: sqlite3.Connection, shop_id: int) -> int:
@@ -1871,40 +2669,37 @@ def count_active_offerings_for_shop(conn: sqlite3.Connection, shop_id: int) -> i
         "SELECT COUNT(*) AS n FROM shop_offerings WHERE shop_id = ? AND status = 'active';",
         (shop_id,),
     ).fetchone()
-    return int(row["n"] if row else 0)
+    return int(row[0]) if row else 0
 
 
-def count_active_unlocked_offerings_for_shop(conn: sqlite3.Connection, shop_id: int) -> int:
-    """Count active offerings that can be auto-discontinued (manual lock = 0)."""
+def count_shop_summary(conn: sqlite3.Connection, shop_id: int) -> Dict[str, int]:
+    """Menu entry, active, active-unlocked and would-auto-discontinue counts in one query."""
     row = conn.execute(
         """
-        SELECT COUNT(*) AS n
+        SELECT
+            (SELECT COUNT(*) FROM menu_entries WHERE shop_id = ?) AS menu_entries,
+            COUNT(*) AS active,
+            COALESCE(SUM(manual_status_lock = 0), 0) AS active_unlocked,
+            COALESCE(SUM(
+                manual_status_lock = 0
+                AND strain_id NOT IN (SELECT strain_id FROM menu_entries WHERE shop_id = ?)
+            ), 0) AS would_auto_discontinue
         FROM shop_offerings
         WHERE shop_id = ?
-          AND status = 'active'
-          AND manual_status_lock = 0;
+          AND status = 'active';
         """,
-        (shop_id,),
+        (shop_id, shop_id, shop_id),
     ).fetchone()
-    return int(row["n"] if row else 0)
+    return {k: int(row[k]) for k in ("menu_entries", "active", "active_unlocked", "would_auto_discontinue")}
 
 
-def count_would_auto_discontinue_for_shop(conn: sqlite3.Connection, shop_id: int) -> int:
-    """Count active unlocked offerings that are absent from current menu_entries."""
-    row = conn.execute(
-        """
-        SELECT COUNT(*) AS n
-        FROM shop_offerings
-        WHERE shop_id = ?
-          AND status = 'active'
-          AND manual_status_lock = 0
-          AND strain_id NOT IN (
-              SELECT strain_id FROM menu_entries WHERE shop_id = ?
-          );
-        """,
-        (shop_id, shop_id),
-    ).fetchone()
-    return int(row["n"] if row else 0)
+def needs_mass_finish_confirm(shop_counts: Dict[str, int]) -> bool:
+    """True when finishing would auto-discontinue every one of 5+ active unlocked offerings."""
+    return (
+        shop_counts["menu_entries"] > 0
+        and shop_counts["active_unlocked"] >= 5
+        and shop_counts["would_auto_discontinue"] == shop_counts["active_unlocked"]
+    )
 
 
 def load_menu_entries_from_active_offerings(
@@ -1917,228 +2712,93 @@ def load_menu_entries_from_active_offerings(
     This is a convenience helper for menu refreshes: clone active offerings into
     current entries, then remove/edit what changed on the newly published menu.
     """
-    now = utc_now_iso()
-    if replace:
-        conn.execute("DELETE FROM menu_entries WHERE shop_id = ?;", (shop_id,))
-
-    rows = conn.execute(
-        """
-        SELECT strain_id, base_type, is_cali, grower,
-               price_currency, price_amount, price_unit,
-               package_price_amount, package_weight_g, notes
-        FROM shop_offerings
-        WHERE shop_id = ? AND status = 'active'
-        ORDER BY id;
-        """,
-        (shop_id,),
-    ).fetchall()
-
-    for r in rows:
-        conn.execute(
-            """
-            INSERT INTO menu_entries(
-                shop_id, strain_id, base_type, is_cali,
-                grower,
-                price_currency, price_amount, price_unit,
-                package_price_amount, package_weight_g,
-                notes, created_at
-            )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(shop_id, strain_id) DO UPDATE SET
-                base_type = excluded.base_type,
-                is_cali = excluded.is_cali,
-                grower = excluded.grower,
-                price_currency = excluded.price_currency,
-                price_amount = excluded.price_amount,
-                price_unit = excluded.price_unit,
-                package_price_amount = excluded.package_price_amount,
-                package_weight_g = excluded.package_weight_g,
-                notes = excluded.notes,
-                created_at = excluded.created_at;
-            """,
-            (
-                shop_id,
-                int(r["strain_id"]),
-                r["base_type"],
-                int(r["is_cali"]),
-                r["grower"] or "",
-                r["price_currency"],
-                float(r["price_amount"]),
-                r["price_unit"] or DEFAULT_UNIT,
-                float(r["package_price_amount"] or r["price_amount"]),
-                float(r["package_weight_g"] or 1),
-                (r["notes"] or "").strip(),
-                now,
-            ),
-        )
+    now = utc_now_iso_cached()
+    # Delete + clone take the write lock once and commit together.
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        if replace:
+            conn.execute("DELETE FROM menu_entries WHERE shop_id = ?;", (shop_id,))
 
-    conn.commit()
-    return len(rows)
+        # Clone inside SQLite; the COALESCE/NULLIF fallbacks mirror the old per-row Python ones.
+        cur = conn.execute(MENU_ENTRY_CLONE_SQL, (DEFAULT_UNIT, now, shop_id))
+        count = max(cur.rowcount, 0)
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+    return count
 
 
-def reconcile_offerings_for_shop(conn: sqlite3.Connection, shop_id: int) -> None:
-    """Reconcile shop_offerings with current menu_entries."""
-    now = utc_now_iso()
-    menu_history_id = latest_menu_history_id_for_shop(conn, shop_id)
+def reconcile_offerings_for_shop(conn: sqlite3.Connection, shop_id: int, mark_processed: bool = False) -> None:
+    """Reconcile shop_offerings with current menu_entries.
 
-    current = conn.execute(
-        """
-        SELECT me.strain_id, me.base_type, me.is_cali, me.grower,
-               me.price_currency, me.price_amount, me.price_unit,
-               me.package_price_amount, me.package_weight_g, me.notes
-        FROM menu_entries me
-        WHERE me.shop_id = ?;
-        """,
-        (shop_id,),
-    ).fetchall()
+    With mark_processed the menu also leaves the queue, in the same transaction.
+    """
+    now = utc_now_iso_cached()
+    # History, upsert and discontinue steps take the write lock once and commit together.
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        menu_history_id = latest_menu_history_id_for_shop(conn, shop_id)
 
-    for r in current:
-        strain_id = int(r["strain_id"])
-        record_offering_history(
+        # Everything below is set-based: history rows and upserts come straight from
+        # menu_entries / shop_offerings without a round trip through Python.
+        record_offering_history_from(
             conn,
-            shop_id=shop_id,
-            strain_id=strain_id,
+            "FROM menu_entries WHERE shop_id = ? ORDER BY id",
+            (shop_id,),
             menu_history_id=menu_history_id,
             event_type="seen_on_menu",
             status="active",
-            base_type=r["base_type"],
-            is_cali=r["is_cali"],
-            grower=r["grower"] or "",
-            price_currency=r["price_currency"],
-            price_amount=r["price_amount"],
-            price_unit=r["price_unit"],
-            package_price_amount=r["package_price_amount"],
-            package_weight_g=r["package_weight_g"],
-            notes=r["notes"] or "",
             source="finish_menu",
             observed_at_utc=now,
         )
-        conn.execute(
-            """
-            INSERT INTO shop_offerings(
-                shop_id, strain_id,
-                base_type, is_cali,
-                grower,
-                price_currency, price_amount, price_unit,
-                package_price_amount, package_weight_g,
-                notes,
-                status,
-                discontinued_reason, discontinued_since_utc, discontinued_until_utc,
-                last_seen_at_utc,
-                manual_status_lock,
-                created_at, updated_at
-            )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active', '', '', '', ?, 0, ?, ?)
-            ON CONFLICT(shop_id, strain_id) DO UPDATE SET
-                base_type = excluded.base_type,
-                is_cali = excluded.is_cali,
-                grower = excluded.grower,
-                price_currency = excluded.price_currency,
-                price_amount = excluded.price_amount,
-                price_unit = excluded.price_unit,
-                package_price_amount = excluded.package_price_amount,
-                package_weight_g = excluded.package_weight_g,
-                notes = excluded.notes,
-                last_seen_at_utc = excluded.last_seen_at_utc,
-                updated_at = excluded.updated_at,
-                status = CASE
-                    WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.status
-                    ELSE 'active'
-                END,
-                discontinued_reason = CASE
-                    WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_reason
-                    ELSE ''
-                END,
-                discontinued_since_utc = CASE
-                    WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_since_utc
-                    ELSE ''
-                END,
-                discontinued_until_utc = CASE
-                    WHEN shop_offerings.manual_status_lock = 1 THEN shop_offerings.discontinued_until_utc
-                    ELSE ''
-                END;
-            """,
-            (
-                shop_id,
-                strain_id,
-                r["base_type"],
-                int(r["is_cali"]),
-                r["grower"] or "",
-                r["price_currency"],
-                float(r["price_amount"]),
-                r["price_unit"],
-                float(r["package_price_amount"] or r["price_amount"]),
-                float(r["package_weight_g"] or 1),
-                r["notes"] or "",
-                now,
-                now,
-                now,
-            ),
-        )
 
-    discontinued_rows = conn.execute(
-        """
-        SELECT shop_id, strain_id, base_type, is_cali, grower,
-               price_currency, price_amount, price_unit,
-               package_price_amount, package_weight_g, notes
-        FROM shop_offerings
-        WHERE shop_id = ?
-          AND status = 'active'
-          AND manual_status_lock = 0
-          AND strain_id NOT IN (
-              SELECT strain_id FROM menu_entries WHERE shop_id = ?
-          );
-        """,
-        (shop_id, shop_id),
-    ).fetchall()
+        conn.execute(SHOP_OFFERING_RECONCILE_SQL, (now, now, now, shop_id))
 
-    for r in discontinued_rows:
-        record_offering_history(
+        missing_sql = """
+            FROM shop_offerings
+            WHERE shop_id = ?
+              AND status = 'active'
+              AND manual_status_lock = 0
+              AND strain_id NOT IN (
+                  SELECT strain_id FROM menu_entries WHERE shop_id = ?
+              )
+            """
+        record_offering_history_from(
             conn,
-            shop_id=int(r["shop_id"]),
-            strain_id=int(r["strain_id"]),
+            missing_sql + " ORDER BY id",
+            (shop_id, shop_id),
             menu_history_id=menu_history_id,
             event_type="missing_from_latest_menu",
             status="discontinued",
-            base_type=r["base_type"],
-            is_cali=r["is_cali"],
-            grower=r["grower"] or "",
-            price_currency=r["price_currency"],
-            price_amount=r["price_amount"],
-            price_unit=r["price_unit"],
-            package_price_amount=r["package_price_amount"],
-            package_weight_g=r["package_weight_g"],
-            notes=r["notes"] or "",
             source="finish_menu",
             observed_at_utc=now,
         )
 
-    conn.execute(
-        """
-        UPDATE shop_offerings
-        SET
-            status = 'discontinued',
-            discontinued_reason = 'missing from latest menu',
-            discontinued_since_utc = ?,
-            discontinued_until_utc = '',
-            updated_at = ?
-        WHERE shop_id = ?
-          AND status = 'active'
-          AND manual_status_lock = 0
-          AND strain_id NOT IN (
-              SELECT strain_id FROM menu_entries WHERE shop_id = ?
-          );
-        """,
-        (now, now, shop_id, shop_id),
-    )
-
-    conn.commit()
-
-
-def mark_menu_processed(conn: sqlite3.Connection, shop_id: int) -> None:
-    """Mark menu processed so it leaves the queue."""
-    conn.execute("UPDATE menus SET status = 'processed', error = '' WHERE shop_id = ?;", (shop_id,))
-    conn.commit()
+        conn.execute(
+            """
+            UPDATE shop_offerings
+            SET
+                status = 'discontinued',
+                discontinued_reason = 'missing from latest menu',
+                discontinued_since_utc = ?,
+                discontinued_until_utc = '',
+                updated_at = ?
+            WHERE shop_id = ?
+              AND status = 'active'
+              AND manual_status_lock = 0
+              AND strain_id NOT IN (
+                  SELECT strain_id FROM menu_entries WHERE shop_id = ?
+              );
+            """,
+            (now, now, shop_id, shop_id),
+        )
+        if mark_processed:
+            conn.execute(MARK_MENU_PROCESSED_SQL, (shop_id,))
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
 
 
 def set_offering_status(
@@ -2152,8 +2812,8 @@ def set_offering_status(
     commit: bool = True,
 ) -> None:
     """Manually set offering status and optional lock."""
-    now = utc_now_iso()
-    lock_int = 1 if bool(lock) else 0
+    now = utc_now_iso_cached()
+    lock_int = int(bool(lock))
 
     if status not in ("active", "discontinued"):
         raise ValueError("status must be active or discontinued")
@@ -2206,6 +2866,10 @@ BASE_CSS = """
   --warn: #f6ad55;
   --good: #68d391;
   --bad: #fc8181;
+  /* Shop view section heights: one root property instead of per-panel values. */
+  --h-add: clamp(220px, calc(100vh - 320px), 72vh);
+  --h-entries: clamp(180px, calc(100vh - 320px), 72vh);
+  --h-catalogue: clamp(180px, calc(100vh - 320px), 72vh);
 }
 
 * { box-sizing: border-box; }
@@ -2325,11 +2989,11 @@ button.danger { border-color: rgba(252,129,129,.45); color: var(--bad); }
 .tableWrap { overflow:auto; border-top: 1px solid var(--border); }
 .tableWrap.entries {
   min-height: 180px;
-  max-height: clamp(180px, calc(100vh - 320px), 72vh);
+  max-height: var(--h-entries);
 }
 .tableWrap.catalogue {
   min-height: 180px;
-  max-height: clamp(180px, calc(100vh - 320px), 72vh);
+  max-height: var(--h-catalogue);
 }
 .tableWrap.browse { max-height: 70vh; }
 .tableWrap.browse td { word-break: break-word; }
@@ -2354,7 +3018,7 @@ button.danger { border-color: rgba(252,129,129,.45); color: var(--bad); }
 
 .addEntryPanel {
   min-height: 220px;
-  max-height: clamp(220px, calc(100vh - 320px), 72vh);
+  max-height: var(--h-add);
   overflow: auto;
   border: 1px solid var(--border);
   border-radius: 12px;
@@ -2465,6 +3129,10 @@ pre.log {
   .menuImg { height: min(calc(100vh - 220px), 56vh); }
 }
 """
+# Pages link the stylesheet instead of inlining it; the content hash in the URL lets
+# browsers cache it forever (see the /assets route in create_app).
+BASE_CSS_BYTES = BASE_CSS.encode("utf-8")
+BASE_CSS_DIGEST = hashlib.sha1(BASE_CSS_BYTES).hexdigest()[:10]
 
 PAGE_TMPL = """
 <!doctype html>
@@ -2473,7 +3141,7 @@ PAGE_TMPL = """
   <meta charset="utf-8">
   <title>Coffeeshop Menu Entry</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -2570,7 +3238,7 @@ PAGE_TMPL = """
           {% else %}
             <button class="ghost" type="button" onclick="navTo('{{ url_for('finish_menu', shop_id=shop_id) }}')">Finish menu</button>
           {% endif %}
-          {% if not menu_entries and offerings %}
+          {% if not menu_entry_count and offering_count %}
             <button class="danger" type="button"
                     onclick="if (confirm('Finish with an empty menu? This will discontinue all currently active offerings for this shop.')) navTo('{{ url_for('finish_menu', shop_id=shop_id, allow_empty=1) }}');">
               Finish empty
@@ -2700,34 +3368,8 @@ PAGE_TMPL = """
                     <th>Pick</th><th>Strain</th><th>Grower</th><th>Type</th><th>Price</th><th>Notes</th><th>Action</th>
                   </tr>
                 </thead>
-                <tbody>
-                  {% for it in menu_entries %}
-                    <tr>
-                      <td><input type="checkbox" class="entryCheck" value="{{ it['entry_id'] }}" aria-label="select {{ it['strain_name'] }}"></td>
-                      <td>{{ it['strain_name'] }}</td>
-                      <td>{{ it['grower'] or '—' }}</td>
-                      <td>{{ it['base_type'] }}{% if it['is_cali'] %} (cali){% endif %}</td>
-                      <td>
-                        {% if it['package_weight_g'] and it['package_weight_g'] != 1 %}
-                          {{ it['price_currency'] }}{{ '%.2f'|format(it['package_price_amount']) }}/{{ it['package_weight_g'] }}g pack ·
-                        {% endif %}
-                        {{ it['price_currency'] }}{{ '%.2f'|format(it['price_amount']) }}/{{ it['price_unit'] }}
-                      </td>
-                      <td>{{ it['notes'] }}</td>
-                      <td>
-                        <div class="btnrow">
-                          <a class="pill" href="{{ url_for('edit_entry_get', shop_id=shop_id, entry_id=it['entry_id']) }}">Edit</a>
-                          <form method="post"
-                                action="{{ url_for('delete_entry_route', shop_id=shop_id, entry_id=it['entry_id']) }}"
-                                onsubmit="return confirm('Remove this strain from current menu entries?');"
-                                style="display:inline;">
-                            <button class="danger" type="submit">Remove</button>
-                          </form>
-                        </div>
-                      </td>
-                    </tr>
-                  {% endfor %}
-                  {% if not menu_entries %}
+                <tbody id="entriesBody">
+                  {% if not menu_entry_count %}
                     <tr><td colspan="7" class="small">No entries yet.</td></tr>
                   {% endif %}
                 </tbody>
@@ -2736,7 +3378,7 @@ PAGE_TMPL = """
           </div>
         </div>
 
-        <div id="sectionCatalogue" class="viewSection" style="margin-top:16px;">
+        <div id="sectionCatalogue" class="viewSection is-hidden" style="margin-top:16px;">
           <div style="display:flex; align-items:baseline; justify-content: space-between; gap:10px; flex-wrap:wrap;">
             <div style="font-weight:800;">Offerings status list</div>
             <div class="small">Active stays on top. Inactive is moved to the bottom.</div>
@@ -2750,40 +3392,14 @@ PAGE_TMPL = """
                     <th>Strain</th><th>Status</th><th>Last seen</th>
                   </tr>
                 </thead>
-                <tbody>
-                  {% for off in offerings %}
-                    <tr>
-                      <td>{{ off['strain_name'] }}</td>
-                      <td>
-                        <div class="radioGroup">
-                          <label class="radioOption">
-                            <input type="radio" name="status_{{ off['strain_id'] }}" value="active"
-                                   {% if off['status'] == 'active' %}checked{% endif %}>
-                            <span>Active</span>
-                          </label>
-                          <label class="radioOption">
-                            <input type="radio" name="status_{{ off['strain_id'] }}" value="discontinued"
-                                   {% if off['status'] != 'active' %}checked{% endif %}>
-                            <span>Inactive</span>
-                          </label>
-                        </div>
-                        {% if off['manual_status_lock'] %}
-                          <span class="pill" style="margin-top:6px;">manual lock</span>
-                        {% endif %}
-                        {% if off['status'] == 'discontinued' and off['discontinued_until_utc'] %}
-                          <div class="small" style="margin-top:4px;">until {{ off['discontinued_until_utc'] }}</div>
-                        {% endif %}
-                      </td>
-                      <td class="small">{{ off['last_seen_at_utc'] }}</td>
-                    </tr>
-                  {% endfor %}
-                  {% if not offerings %}
+                <tbody id="catalogueBody">
+                  {% if not offering_count %}
                     <tr><td colspan="3" class="small">No offerings yet (finish a menu to create them).</td></tr>
                   {% endif %}
                 </tbody>
               </table>
             </div>
-            {% if offerings %}
+            {% if offering_count %}
               <div class="btnrow" style="margin-top:10px;">
                 <button class="primary" type="submit">Save status changes</button>
               </div>
@@ -2791,12 +3407,305 @@ PAGE_TMPL = """
           </form>
         </div>
 
-      </div>
-    </div>
-  </div>
+      </div>
+    </div>
+  </div>
+
+<script id="entriesData" type="application/json">{{ entries_json }}</script>
+<script id="offeringsData" type="application/json">{{ offerings_json }}</script>
+<script>
+  function navTo(url) { window.location.href = url; }
+
+  // Both tables are built from the JSON payloads above and inserted with one
+  // innerHTML assignment each, instead of the parser laying out row by row.
+  const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&#34;', "'": '&#39;' };
+
+  function escapeHtml(value) {
+    return String(value == null ? '' : value).replace(/[&<>"']/g, (ch) => HTML_ESCAPES[ch]);
+  }
+
+  function readJsonData(id) {
+    const el = document.getElementById(id);
+    if (!el) return [];
+    try {
+      const data = JSON.parse(el.textContent || '[]');
+      return Array.isArray(data) ? data : [];
+    } catch (_err) {
+      return [];
+    }
+  }
+
+  function renderRows(tbodyId, data, rowFn) {
+    const tbody = document.getElementById(tbodyId);
+    if (!tbody || !data.length) return;
+    tbody.innerHTML = data.map(rowFn).join('');
+  }
+
+  const ENTRY_EDIT_URL = {{ url_for('edit_entry_get', shop_id=shop_id, entry_id=0)|tojson }};
+  const ENTRY_DELETE_URL = {{ url_for('delete_entry_route', shop_id=shop_id, entry_id=0)|tojson }};
+
+  function entryUrl(template, entryId) {
+    return template.replace('/entry/0/', `/entry/${encodeURIComponent(entryId)}/`);
+  }
+
+  function entryRowHtml(it) {
+    return `<tr>
+      <td><input type="checkbox" class="entryCheck" value="${escapeHtml(it.entry_id)}" aria-label="select ${escapeHtml(it.strain_name)}"${selectedEntryIds.has(String(it.entry_id)) ? ' checked' : ''}></td>
+      <td>${escapeHtml(it.strain_name)}</td>
+      <td>${escapeHtml(it.grower || '—')}</td>
+      <td>${escapeHtml(it.type_display)}</td>
+      <td>${escapeHtml(it.price_display)}</td>
+      <td>${escapeHtml(it.notes)}</td>
+      <td>
+        <div class="btnrow">
+          <a class="pill" href="${escapeHtml(entryUrl(ENTRY_EDIT_URL, it.entry_id))}">Edit</a>
+          <form method="post" action="${escapeHtml(entryUrl(ENTRY_DELETE_URL, it.entry_id))}"
+                onsubmit="return confirm('Remove this strain from current menu entries?');"
+                style="display:inline;">
+            <button class="danger" type="submit">Remove</button>
+          </form>
+        </div>
+      </td>
+    </tr>`;
+  }
+
+  function offeringRowHtml(off) {
+    const name = `status_${escapeHtml(off.strain_id)}`;
+    const active = (off._choice || (off.status === 'active' ? 'active' : 'discontinued')) === 'active';
+    return `<tr>
+      <td>${escapeHtml(off.strain_name)}</td>
+      <td>
+        <div class="radioGroup">
+          <label class="radioOption">
+            <input type="radio" name="${name}" value="active"${active ? ' checked' : ''}>
+            <span>Active</span>
+          </label>
+          <label class="radioOption">
+            <input type="radio" name="${name}" value="discontinued"${active ? '' : ' checked'}>
+            <span>Inactive</span>
+          </label>
+        </div>
+        ${off.manual_status_lock ? '<span class="pill" style="margin-top:6px;">manual lock</span>' : ''}
+        ${(off.status === 'discontinued' && off.discontinued_until_utc)
+          ? `<div class="small" style="margin-top:4px;">until ${escapeHtml(off.discontinued_until_utc)}</div>`
+          : ''}
+      </td>
+      <td class="small">${escapeHtml(off.last_seen_at_utc)}</td>
+    </tr>`;
+  }
+
+  // Long tables only keep the rows in view (plus overscan) in the DOM. Checkbox and
+  // radio state lives on the data items, so rows can be re-rendered at any time.
+  const VIRTUAL_MIN_ROWS = 150;
+  const VIRTUAL_OVERSCAN = 10;
+
+  class RowWindow {
+    constructor(wrap, tbody, data, rowFn, colspan) {
+      this.wrap = wrap;
+      this.tbody = tbody;
+      this.data = data;
+      this.rowFn = rowFn;
+      this.colspan = colspan;
+      this.rowHeight = 0;
+      this.start = -1;
+      this.end = -1;
+      this.forceNext = false;
+      wrap.addEventListener('scroll', () => queueRowWindow(this, false), { passive: true });
+      window.addEventListener('resize', () => queueRowWindow(this, false));
+      queueRowWindow(this, true);
+    }
+
+    spacer(px) {
+      return `<tr aria-hidden="true"><td colspan="${this.colspan}" style="height:${px}px; padding:0; border:0;"></td></tr>`;
+    }
+
+    // Read phase: layout lookups only, no DOM writes.
+    measure() {
+      const view = { top: this.wrap.scrollTop, height: this.wrap.clientHeight, rowHeight: this.rowHeight };
+      if (!this.rowHeight && this.end > this.start) {
+        // Rows are close to uniform: size the spacers from the first visible slice.
+        const rows = this.tbody.rows;
+        const first = rows[1];
+        const last = rows[rows.length - 2];
+        const measured = (last.offsetTop + last.offsetHeight - first.offsetTop) / (this.end - this.start);
+        if (measured > 0) view.rowHeight = measured;
+      }
+      return view;
+    }
+
+    // Write phase: works only from the values collected by measure().
+    render(view) {
+      const force = this.forceNext || view.rowHeight !== this.rowHeight;
+      this.forceNext = false;
+      this.rowHeight = view.rowHeight;
+      const n = this.data.length;
+      const rowHeight = this.rowHeight || 40;
+      const visible = Math.ceil(view.height / rowHeight) + 1;
+      const start = Math.max(0, Math.floor(view.top / rowHeight) - VIRTUAL_OVERSCAN);
+      const end = Math.min(n, start + visible + 2 * VIRTUAL_OVERSCAN);
+      if (!force && start === this.start && end === this.end) return;
+      this.start = start;
+      this.end = end;
+      this.tbody.innerHTML = this.spacer(start * rowHeight)
+        + this.data.slice(start, end).map(this.rowFn).join('')
+        + this.spacer((n - end) * rowHeight);
+      // Measure the real row height next frame rather than forcing layout now.
+      if (!this.rowHeight && view.height > 0 && end > start) queueRowWindow(this, false);
+    }
+  }
+
+  const rowWindows = [];
+  const rowWindowQueue = new Set();
+  let rowWindowFrame = 0;
+
+  // Every window due an update shares one frame: all reads first, then all
+  // writes, so one table's innerHTML never forces layout for the other's reads.
+  function queueRowWindow(w, force) {
+    if (force) w.forceNext = true;
+    rowWindowQueue.add(w);
+    if (!rowWindowFrame) rowWindowFrame = requestAnimationFrame(flushRowWindows);
+  }
+
+  function flushRowWindows() {
+    rowWindowFrame = 0;
+    const batch = Array.from(rowWindowQueue);
+    rowWindowQueue.clear();
+    const views = batch.map((w) => w.measure());
+    batch.forEach((w, i) => w.render(views[i]));
+  }
+
+  function mountRows(wrapId, tbodyId, data, rowFn, colspan) {
+    const wrap = document.getElementById(wrapId);
+    const tbody = document.getElementById(tbodyId);
+    if (!wrap || !tbody || !data.length) return;
+    if (data.length < VIRTUAL_MIN_ROWS) {
+      renderRows(tbodyId, data, rowFn);
+      return;
+    }
+    rowWindows.push(new RowWindow(wrap, tbody, data, rowFn, colspan));
+  }
+
+  function refreshRows(tbodyId, data, rowFn) {
+    const w = rowWindows.find((rw) => rw.tbody.id === tbodyId);
+    if (w) queueRowWindow(w, true);
+    else renderRows(tbodyId, data, rowFn);
+  }
+
+  function refreshRowWindows() {
+    rowWindows.forEach((w) => queueRowWindow(w, true));
+  }
+
+  const entriesData = readJsonData('entriesData');
+  const offeringsData = readJsonData('offeringsData');
+  const entriesById = new Map(entriesData.map((it) => [String(it.entry_id), it]));
+  const offeringsById = new Map(offeringsData.map((off) => [String(off.strain_id), off]));
+  const selectedEntryIds = new Set();
+  mountRows('entriesWrap', 'entriesBody', entriesData, entryRowHtml, 7);
+
+  // The catalogue starts hidden behind the view switch, so its rows are only built the
+  // first time it is shown (and are then measured while visible).
+  let catalogueMounted = false;
+  function mountCatalogue() {
+    if (catalogueMounted) return;
+    catalogueMounted = true;
+    mountRows('catalogueWrap', 'catalogueBody', offeringsData, offeringRowHtml, 3);
+  }
+
+  const entriesBody = document.getElementById('entriesBody');
+  if (entriesBody) {
+    entriesBody.addEventListener('change', (e) => {
+      const el = e.target;
+      if (!el.classList || !el.classList.contains('entryCheck')) return;
+      if (!entriesById.has(el.value)) return;
+      if (el.checked) selectedEntryIds.add(el.value);
+      else selectedEntryIds.delete(el.value);
+    });
+  }
+
+  const catalogueBody = document.getElementById('catalogueBody');
+  if (catalogueBody) {
+    catalogueBody.addEventListener('change', (e) => {
+      const el = e.target;
+      if (!el.name || el.name.indexOf('status_') !== 0) return;
+      const off = offeringsById.get(el.name.slice('status_'.length));
+      if (off) off._choice = el.value;
+    });
+    const statusForm = catalogueBody.closest('form');
+    if (statusForm) {
+      statusForm.addEventListener('submit', (e) => {
+        if (statusForm.dataset.plainSubmit) {
+          // Changes on rows scrolled out of the window have no radios left in the form.
+          offeringsData.forEach((off) => {
+            if (!off._choice || statusForm.querySelector(`input[name="status_${off.strain_id}"]`)) return;
+            const hidden = document.createElement('input');
+            hidden.type = 'hidden';
+            hidden.name = `status_${off.strain_id}`;
+            hidden.value = off._choice;
+            statusForm.appendChild(hidden);
+          });
+          return;
+        }
+        e.preventDefault();
+        saveOfferingStatuses(statusForm);
+      });
+    }
+  }
 
-<script>
-  function navTo(url) { window.location.href = url; }
+  // The page-level finish safety state; a status save that changes it reloads the page
+  // so the finish buttons and warning are rebuilt by the server.
+  const FINISH_REQUIRES_MASS_CONFIRM = {{ finish_requires_mass_confirm|tojson }};
+  const WOULD_AUTO_DISCONTINUE = {{ would_auto_discontinue|tojson }};
+
+  async function saveOfferingStatuses(form) {
+    const body = new FormData();
+    offeringsData.forEach((off) => {
+      if (off._choice) body.append(`status_${off.strain_id}`, off._choice);
+    });
+    let data = null;
+    try {
+      const res = await fetch(form.action, { method: 'POST', body, headers: { Accept: 'application/json' } });
+      if (res.ok) data = await res.json();
+    } catch (_err) {
+      data = null;
+    }
+    if (!data) {
+      // Fall back to the normal post-and-redirect.
+      form.dataset.plainSubmit = '1';
+      form.requestSubmit();
+      return;
+    }
+    if (data.reload_url && (data.finish_requires_mass_confirm !== FINISH_REQUIRES_MASS_CONFIRM
+        || data.would_auto_discontinue !== WOULD_AUTO_DISCONTINUE)) {
+      window.location.href = data.reload_url;
+      return;
+    }
+    (data.offerings || []).forEach((row) => {
+      const off = offeringsById.get(String(row.strain_id));
+      if (!off) return;
+      Object.assign(off, row);
+      delete off._choice;
+    });
+    // Saved rows may have changed status: restore the server's order (active first, then name).
+    offeringsData.sort((a, b) => (a.status === 'active' ? 0 : 1) - (b.status === 'active' ? 0 : 1)
+      || (a.strain_name < b.strain_name ? -1 : a.strain_name > b.strain_name ? 1 : 0));
+    refreshRows('catalogueBody', offeringsData, offeringRowHtml);
+    showToast(data.message);
+  }
+
+  function showToast(text) {
+    if (!text) return;
+    let el = document.getElementById('toast');
+    if (!el) {
+      el = document.createElement('div');
+      el.id = 'toast';
+      el.className = 'toast good';
+      document.body.appendChild(el);
+    }
+    el.textContent = text;
+    el.style.display = '';
+    clearTimeout(showToast.timer);
+    showToast.timer = setTimeout(() => { el.style.display = 'none'; }, 3500);
+  }
 
   function clearForm() {
     const f = document.getElementById('entryForm');
@@ -2844,6 +3753,8 @@ PAGE_TMPL = """
     getSectionViewRadios().forEach((radio) => {
       radio.checked = radio.value === view;
     });
+    if (view === 'catalogue') mountCatalogue();
+    refreshRowWindows();
 
     if (persist) {
       try {
@@ -2854,41 +3765,83 @@ PAGE_TMPL = """
     }
   }
 
+  // The markup already starts on the add view, so first paint needs no writes from here;
+  // only a radio state restored by the browser (back/forward, reload) has to be reset.
   function initSectionView() {
-    getSectionViewRadios().forEach((radio) => {
+    const radios = getSectionViewRadios();
+    radios.forEach((radio) => {
       radio.addEventListener('change', () => {
         if (radio.checked) setSectionView(radio.value, true);
       });
     });
-    setSectionView('add', false);
+    if (radios.some((radio) => radio.checked && radio.value !== 'add')) setSectionView('add', false);
   }
 
   initSectionView();
 
   function setAllEntryChecks(checked) {
-    document.querySelectorAll('.entryCheck').forEach((el) => {
-      el.checked = !!checked;
+    selectedEntryIds.clear();
+    if (checked) entriesById.forEach((it, id) => { if (id) selectedEntryIds.add(id); });
+    syncEntryChecks();
+  }
+
+  // Only the rows currently rendered have checkboxes to update.
+  function syncEntryChecks() {
+    if (!entriesBody) return;
+    entriesBody.querySelectorAll('.entryCheck').forEach((el) => {
+      el.checked = selectedEntryIds.has(el.value);
     });
   }
 
   function getSelectedEntryIds() {
-    return Array.from(document.querySelectorAll('.entryCheck:checked'))
-      .map((el) => el.value)
-      .filter((v) => v);
+    return Array.from(selectedEntryIds);
   }
 
-  function submitEntrySelection(formId, ids) {
+  // Posts the selection as JSON and drops the removed rows in place. A change that affects
+  // the server-rendered parts (empty state, finish safety check) reloads the page instead.
+  async function submitEntrySelection(formId, ids) {
     const form = document.getElementById(formId);
     if (!form) return;
-    form.innerHTML = '';
-    ids.forEach((id) => {
-      const hidden = document.createElement('input');
-      hidden.type = 'hidden';
-      hidden.name = 'entry_ids';
-      hidden.value = id;
-      form.appendChild(hidden);
+    let data = null;
+    try {
+      const res = await fetch(form.action, {
+        method: 'POST',
+        body: JSON.stringify({ entry_ids: ids }),
+        headers: { 'Content-Type': 'application/json', Accept: 'application/json' },
+      });
+      if (res.ok) data = await res.json();
+    } catch (_err) {
+      data = null;
+    }
+    if (!data) {
+      // Fall back to the normal post-and-redirect.
+      const frag = document.createDocumentFragment();
+      ids.forEach((id) => {
+        const hidden = document.createElement('input');
+        hidden.type = 'hidden';
+        hidden.name = 'entry_ids';
+        hidden.value = id;
+        frag.appendChild(hidden);
+      });
+      form.replaceChildren(frag);
+      form.requestSubmit();
+      return;
+    }
+    const remaining = new Set((data.entry_ids || []).map(String));
+    if (!remaining.size
+        || data.finish_requires_mass_confirm !== FINISH_REQUIRES_MASS_CONFIRM
+        || data.would_auto_discontinue !== WOULD_AUTO_DISCONTINUE) {
+      window.location.href = data.reload_url;
+      return;
+    }
+    const kept = entriesData.filter((it) => remaining.has(String(it.entry_id)));
+    entriesData.splice(0, entriesData.length, ...kept);
+    Array.from(entriesById.keys()).forEach((id) => {
+      if (!remaining.has(id)) entriesById.delete(id);
     });
-    form.requestSubmit();
+    selectedEntryIds.clear();
+    refreshRows('entriesBody', entriesData, entryRowHtml);
+    showToast(data.message);
   }
 
   function keepSelectedEntries() {
@@ -2997,56 +3950,133 @@ PAGE_TMPL = """
     showTypeHint(`Prefilled type from existing records: ${exact.base_type}.`);
   }
 
+  // Shortcuts only fire outside form fields; one lookup per keypress instead of a chain of tests.
+  const TYPING_TAGS = new Set(['INPUT', 'TEXTAREA', 'SELECT']);
+  const caliBox = document.querySelector('input[name="is_cali"]');
+  const NEXT_SHOP_URL = "{{ url_for('next_shop', shop_id=shop_id) }}";
+  const PREV_SHOP_URL = "{{ url_for('prev_shop', shop_id=shop_id) }}";
+
+  function pickBaseType(val) {
+    setBaseType(val);
+    if (priceAmount) priceAmount.focus();
+  }
+
+  const KEY_HANDLERS = Object.freeze({
+    '1': () => pickBaseType('sativa'),
+    '2': () => pickBaseType('indica'),
+    '3': () => pickBaseType('hybrid'),
+    '4': () => pickBaseType('hash'),
+    '5': () => pickBaseType('kush'),
+    '6': () => { if (caliBox) caliBox.checked = !caliBox.checked; },
+    'n': () => navTo(NEXT_SHOP_URL),
+    'N': () => navTo(NEXT_SHOP_URL),
+    'p': () => navTo(PREV_SHOP_URL),
+    'P': () => navTo(PREV_SHOP_URL),
+  });
+
   document.addEventListener('keydown', (e) => {
-    const tag = (e.target && e.target.tagName) ? e.target.tagName.toLowerCase() : '';
-    const isTyping = (tag === 'input' || tag === 'textarea' || tag === 'select');
+    if (e.target && TYPING_TAGS.has(e.target.tagName)) return;
 
-    if (!isTyping && e.key === '/') {
+    if (e.key === '/') {
       e.preventDefault();
       if (strain) strain.focus();
       return;
     }
-    if (isTyping) return;
-    const caliBox = document.querySelector('input[name="is_cali"]');
-
-    if (e.key === '1') { setBaseType('sativa'); if (priceAmount) priceAmount.focus(); }
-    if (e.key === '2') { setBaseType('indica'); if (priceAmount) priceAmount.focus(); }
-    if (e.key === '3') { setBaseType('hybrid'); if (priceAmount) priceAmount.focus(); }
-    if (e.key === '4') { setBaseType('hash'); if (priceAmount) priceAmount.focus(); }
-    if (e.key === '5') { setBaseType('kush'); if (priceAmount) priceAmount.focus(); }
-    if (e.key === '6') { if (caliBox) caliBox.checked = !caliBox.checked; }
-
-    const k = e.key.toLowerCase();
-    if (k === 'n') { navTo("{{ url_for('next_shop', shop_id=shop_id) }}"); }
-    if (k === 'p') { navTo("{{ url_for('prev_shop', shop_id=shop_id) }}"); }
-
     if (e.key === 'Enter') {
-      const activeTag = (document.activeElement && document.activeElement.tagName)
-        ? document.activeElement.tagName.toLowerCase() : '';
-      if (activeTag !== 'button') {
+      if (!document.activeElement || document.activeElement.tagName !== 'BUTTON') {
         e.preventDefault();
         submitEntryForm();
       }
+      return;
     }
+    const handler = KEY_HANDLERS[e.key];
+    if (handler) handler();
   });
 
+  // Suggestions are memoised per query for the browser session. The DB revision is part
+  // of the cache so any saved change (new strain, type edits) starts a fresh cache.
+  const SUGGEST_CACHE_KEY = 'strain_suggest_cache_v1';
+  const SUGGEST_CACHE_MAX = 200;
+  const SUGGEST_REVISION = {{ data_revision|tojson }};
+  const suggestCache = loadSuggestCache();
+  let suggestSaveQueued = false;
+
+  function loadSuggestCache() {
+    try {
+      const stored = JSON.parse(sessionStorage.getItem(SUGGEST_CACHE_KEY) || 'null');
+      if (stored && stored.revision === SUGGEST_REVISION && stored.items) {
+        return new Map(Object.entries(stored.items));
+      }
+    } catch (_err) {
+      // no-op
+    }
+    return new Map();
+  }
+
+  function saveSuggestCache() {
+    if (suggestSaveQueued) return;
+    suggestSaveQueued = true;
+    const idle = window.requestIdleCallback || ((fn) => setTimeout(fn, 200));
+    idle(() => {
+      suggestSaveQueued = false;
+      try {
+        sessionStorage.setItem(SUGGEST_CACHE_KEY, JSON.stringify({
+          revision: SUGGEST_REVISION,
+          items: Object.fromEntries(suggestCache),
+        }));
+      } catch (_err) {
+        // no-op
+      }
+    });
+  }
+
+  function suggestKey(q) {
+    // The server's LIKE prefix match ignores case for ASCII only.
+    const typed = (q || '').trim();
+    return /^[\\x00-\\x7f]*$/.test(typed) ? typed.toLowerCase() : typed;
+  }
+
+  async function fetchSuggestions(q) {
+    const key = suggestKey(q);
+    if (suggestCache.has(key)) return suggestCache.get(key);
+    // Prefix search: if a shorter prefix matched nothing, a longer one cannot match either.
+    for (let i = key.length - 1; i > 0; i -= 1) {
+      const shorter = suggestCache.get(key.slice(0, i));
+      if (shorter && !shorter.length) return [];
+    }
+    const res = await fetch(`/api/strain_suggest?q=${encodeURIComponent(q)}`);
+    const data = await res.json();
+    const items = Array.isArray(data.items) ? data.items : [];
+    if (suggestCache.size >= SUGGEST_CACHE_MAX) suggestCache.delete(suggestCache.keys().next().value);
+    suggestCache.set(key, items);
+    saveSuggestCache();
+    return items;
+  }
+
+  const suggestionList = document.getElementById('strain_suggestions');
+  let shownSuggestions = null;
+
+  // One DOM mutation per update; cached lookups hand back the same array, which is skipped.
+  function showSuggestions(items) {
+    if (!suggestionList || items === shownSuggestions) return;
+    shownSuggestions = items;
+    const frag = document.createDocumentFragment();
+    items.forEach((item) => {
+      const opt = document.createElement('option');
+      opt.value = item.name_display || '';
+      frag.appendChild(opt);
+    });
+    suggestionList.replaceChildren(frag);
+  }
+
   let debounceTimer = null;
   if (strain) {
     strain.addEventListener('input', () => {
       clearTimeout(debounceTimer);
       debounceTimer = setTimeout(async () => {
         const q = strain.value || '';
-        const res = await fetch(`/api/strain_suggest?q=${encodeURIComponent(q)}`);
-        const data = await res.json();
-        const dl = document.getElementById('strain_suggestions');
-        if (!dl) return;
-        dl.innerHTML = '';
-        const items = Array.isArray(data.items) ? data.items : [];
-        items.forEach((item) => {
-          const opt = document.createElement('option');
-          opt.value = item.name_display || '';
-          dl.appendChild(opt);
-        });
+        const items = await fetchSuggestions(q);
+        showSuggestions(items);
         applySuggestedType(q, items);
       }, 120);
     });
@@ -3063,7 +4093,7 @@ EDIT_TMPL = """
   <meta charset="utf-8">
   <title>Edit Entry</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -3242,7 +4272,7 @@ QUEUE_TMPL = """
   <meta charset="utf-8">
   <title>Menu Queue</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -3314,7 +4344,7 @@ MAIN_TMPL = """
   <meta charset="utf-8">
   <title>Coffeeshop Menu Admin</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -3483,7 +4513,7 @@ SHOP_COVERAGE_TMPL = """
   <meta charset="utf-8">
   <title>Shop Coverage</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -3762,7 +4792,7 @@ CHECK_TMPL = """
   <meta charset="utf-8">
   <title>Menu Check Results</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -3845,7 +4875,7 @@ BROWSE_TMPL = """
   <meta charset="utf-8">
   <title>Database Browser</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -3913,11 +4943,11 @@ BROWSE_TMPL = """
           <tbody>
             {% for r in rows %}
               <tr>
-                {% for col in columns %}
-                  <td>{{ r[col] }}</td>
+                {% for cell in r %}
+                  <td>{{ cell }}</td>
                 {% endfor %}
                 {% if table_key == 'shops' %}
-                  <td><a class="pill" href="{{ url_for('digitised_shop_menu', shop_id=r['id']) }}">Digitised menu</a></td>
+                  <td><a class="pill" href="{{ url_for('digitised_shop_menu', shop_id=r[shop_id_index]) }}">Digitised menu</a></td>
                 {% endif %}
               </tr>
             {% endfor %}
@@ -3940,7 +4970,7 @@ STRAIN_LOOKUP_TMPL = """
   <meta charset="utf-8">
   <title>Shops By Strain</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -4007,8 +5037,8 @@ STRAIN_LOOKUP_TMPL = """
                 <td>{{ r['shop'] }}</td>
                 <td>{{ r['city'] }}</td>
                 <td>{{ r['grower'] or '—' }}</td>
-                <td>{{ r['price_currency'] }}{{ '%.2f'|format(r['price_amount']) }}/{{ r['price_unit'] }}</td>
-                <td>{{ r['base_type'] }}{% if r['is_cali'] %} (cali){% endif %}</td>
+                <td>{{ r['unit_price_display'] }}</td>
+                <td>{{ r['type_display'] }}</td>
                 <td>{{ r['last_seen_at_utc'] }}</td>
                 <td>
                   <a class="pill" href="{{ url_for('digitised_shop_menu', shop_id=r['shop_id']) }}">Digitised menu</a>
@@ -4035,7 +5065,7 @@ STRAIN_CONSOLIDATE_TMPL = """
   <meta charset="utf-8">
   <title>Consolidate Strains</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -4184,7 +5214,7 @@ SHOP_DIGITISED_TMPL = """
   <meta charset="utf-8">
   <title>Digitised Shop Menu</title>
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>{{ css }}</style>
+  <link rel="stylesheet" href="{{ css_href }}">
 </head>
 <body>
   <div class="topbar">
@@ -4221,13 +5251,8 @@ SHOP_DIGITISED_TMPL = """
               <tr>
                 <td>{{ r['strain'] }}</td>
                 <td>{{ r['grower'] or '—' }}</td>
-                <td>{{ r['base_type'] }}{% if r['is_cali'] %} (cali){% endif %}</td>
-                <td>
-                  {% if r['package_weight_g'] and r['package_weight_g'] != 1 %}
-                    {{ r['price_currency'] }}{{ '%.2f'|format(r['package_price_amount']) }}/{{ r['package_weight_g'] }}g pack ·
-                  {% endif %}
-                  {{ r['price_currency'] }}{{ '%.2f'|format(r['price_amount']) }}/{{ r['price_unit'] }}
-                </td>
+                <td>{{ r['type_display'] }}</td>
+                <td>{{ r['price_display'] }}</td>
                 <td>{{ r['notes'] }}</td>
               </tr>
             {% endfor %}
@@ -4257,13 +5282,8 @@ SHOP_DIGITISED_TMPL = """
                 <td>{{ r['strain'] }}</td>
                 <td>{{ r['grower'] or '—' }}</td>
                 <td>{{ r['status'] }}</td>
-                <td>{{ r['base_type'] }}{% if r['is_cali'] %} (cali){% endif %}</td>
-                <td>
-                  {% if r['package_weight_g'] and r['package_weight_g'] != 1 %}
-                    {{ r['price_currency'] }}{{ '%.2f'|format(r['package_price_amount']) }}/{{ r['package_weight_g'] }}g pack ·
-                  {% endif %}
-                  {{ r['price_currency'] }}{{ '%.2f'|format(r['price_amount']) }}/{{ r['price_unit'] }}
-                </td>
+                <td>{{ r['type_display'] }}</td>
+                <td>{{ r['price_display'] }}</td>
                 <td>{{ r['last_seen_at_utc'] }}</td>
                 <td>{{ r['notes'] }}</td>
               </tr>
@@ -4280,6 +5300,30 @@ SHOP_DIGITISED_TMPL = """
 </html>
 """
 
+# Compiled up front by create_app, so no request pays the parse and syntax errors show at startup.
+# The names let Jinja's bytecode cache keep the compiled code across restarts (.html keeps autoescape on).
+PAGE_TEMPLATES = {
+    "shop.html": PAGE_TMPL,
+    "edit.html": EDIT_TMPL,
+    "queue.html": QUEUE_TMPL,
+    "main.html": MAIN_TMPL,
+    "shop_coverage.html": SHOP_COVERAGE_TMPL,
+    "check.html": CHECK_TMPL,
+    "browse.html": BROWSE_TMPL,
+    "strain_lookup.html": STRAIN_LOOKUP_TMPL,
+    "strain_consolidate.html": STRAIN_CONSOLIDATE_TMPL,
+    "shop_digitised.html": SHOP_DIGITISED_TMPL,
+}
+TEMPLATE_BYTECODE_DIR = ".jinja_cache"
+# Block-tag-only lines render as nothing; the templates never change at runtime, so no reload checks.
+TEMPLATE_JINJA_OPTIONS = {"trim_blocks": True, "lstrip_blocks": True, "auto_reload": False}
+# Cached bytecode depends on these options as well as the source, so they go in the file name.
+TEMPLATE_BYTECODE_PATTERN = (
+    "__jinja2_" + hashlib.sha1(repr(sorted(TEMPLATE_JINJA_OPTIONS.items())).encode("utf-8")).hexdigest()[:8] + "_%s.cache"
+)
+# Template events per streamed chunk: a table row is several events, so a few KB per write.
+STREAM_BUFFER_EVENTS = 100
+
 
 # -----------------------------------------------------------------------------
 # Flask app
@@ -4301,78 +5345,147 @@ def create_app(
     app.config["SCRAPER_PATH"] = scraper_path or os.path.join(app.config["BASE_DIR"], DEFAULT_SCRAPER_SCRIPT)
     app.config["JSON_EXPORT_DIR"] = json_export_dir or app.config["BASE_DIR"]
 
+    # The page templates are module-level constants, so compile each one once per app.
+    # render_template_string would lex/parse/compile the source again on every request.
+    # Compiled bytecode is also kept on disk (keyed by source checksum) for the next start.
+    bytecode_dir = os.path.join(app.config["BASE_DIR"], TEMPLATE_BYTECODE_DIR)
+    try:
+        os.makedirs(bytecode_dir, exist_ok=True)
+    except OSError:
+        bytecode_dir = ""
+    app.jinja_options = {**app.jinja_options, **TEMPLATE_JINJA_OPTIONS}
+    if bytecode_dir and os.access(bytecode_dir, os.W_OK):
+        app.jinja_options["bytecode_cache"] = FileSystemBytecodeCache(bytecode_dir, TEMPLATE_BYTECODE_PATTERN)
+    app.jinja_loader = DictLoader(PAGE_TEMPLATES)
+    compiled_templates: Dict[str, Any] = {
+        source: app.jinja_env.get_template(name) for name, source in PAGE_TEMPLATES.items()
+    }
+    # shop_id -> (data_revision, serialised entry/offering rows) for the shop view.
+    shop_rows_cache: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+    # data_revision -> shop dropdown rows (only the latest revision is kept).
+    shop_choices_cache: Dict[str, List[sqlite3.Row]] = {}
+    # data_revision -> strain name index for autocomplete (only the latest revision is kept).
+    strain_names_cache: Dict[str, Dict[str, Any]] = {}
+
+    def render_page(source: str, **context: Any) -> str:
+        tmpl = compiled_templates.get(source)
+        if tmpl is None:
+            tmpl = compiled_templates[source] = app.jinja_env.from_string(source)
+        app.update_template_context(context)
+        return tmpl.render(context)
+
+    def stream_page(source: str, **context: Any) -> Response:
+        """Like render_page, but send the HTML in chunks as the template renders (long tables)."""
+        tmpl = compiled_templates.get(source)
+        if tmpl is None:
+            tmpl = compiled_templates[source] = app.jinja_env.from_string(source)
+        app.update_template_context(context)
+        stream = tmpl.stream(context)
+        stream.enable_buffering(size=STREAM_BUFFER_EVENTS)
+        return Response(stream_with_context(stream), mimetype="text/html")
+
+    # Connections are opened (and schema-checked) once and reused by later requests instead of
+    # reconnecting per request. A request keeps its connection in g until teardown returns it.
+    conn_pool: LifoQueue[Tuple[str, sqlite3.Connection]] = LifoQueue(maxsize=DB_POOL_SIZE)
+    schema_ready: Set[str] = set()
+    schema_lock = threading.Lock()
+
+    def close_pool() -> None:
+        """Checkpoint and close the idle connections (at exit, so the DB file is complete)."""
+        while True:
+            try:
+                _pooled_path, c = conn_pool.get_nowait()
+            except Empty:
+                return
+            with contextlib.suppress(sqlite3.Error):
+                checkpoint_wal(c)
+            c.close_for_real()
+
+    atexit.register(close_pool)
+
+    @app.context_processor
+    def inject_css_href() -> Dict[str, str]:
+        return {"css_href": url_for("base_css", digest=BASE_CSS_DIGEST)}
+
     def conn() -> sqlite3.Connection:
-        """Get a connection and ensure schema exists."""
-        c = db_connect(app.config["DB_PATH"])
-        db_init(c)
+        """Get this request's connection (from the pool when one is idle) and ensure schema exists."""
+        db_path = app.config["DB_PATH"]
+        c = g.get("db_conn")
+        if c is None:
+            try:
+                pooled_path, c = conn_pool.get_nowait()
+            except Empty:
+                pooled_path = db_path
+            if c is not None and pooled_path != db_path:
+                # DB_PATH was switched since this connection was pooled.
+                c.close_for_real()
+                c = None
+            if c is None:
+                c = db_connect(db_path, reusable=True)
+            g.db_conn, g.db_path = c, db_path
+        if db_path not in schema_ready:
+            with schema_lock:
+                if db_path not in schema_ready:
+                    db_init(c)
+                    schema_ready.add(db_path)
         return c
 
+    @app.teardown_request
+    def release_conn(_exc: Optional[BaseException]) -> None:
+        # A view that raised before c.close() must not leak its open transaction.
+        c = g.pop("db_conn", None)
+        if c is None:
+            return
+        c.close()
+        try:
+            conn_pool.put_nowait((g.pop("db_path"), c))
+        except Full:
+            c.close_for_real()
+
     # -------------------------------------------------------------------------
     # Query helpers
     # -------------------------------------------------------------------------
 
     def get_menu_counts(c: sqlite3.Connection, only_visible: bool = False) -> Dict[str, int]:
-        """Counts of menus by status."""
-        if only_visible:
-            return {
-                "new": int(
-                    c.execute(
-                        """
-                        SELECT COUNT(*) AS n
-                        FROM menus m
-                        JOIN shops s ON s.id = m.shop_id
-                        WHERE m.status = 'new'
-                          AND COALESCE(s.show_in_admin, 1) = 1
-                          AND COALESCE(s.is_closed, 0) = 0;
-                        """
-                    ).fetchone()["n"]
-                ),
-                "error": int(
-                    c.execute(
-                        """
-                        SELECT COUNT(*) AS n
-                        FROM menus m
-                        JOIN shops s ON s.id = m.shop_id
-                        WHERE m.status = 'error'
-                          AND COALESCE(s.show_in_admin, 1) = 1
-                          AND COALESCE(s.is_closed, 0) = 0;
-                        """
-                    ).fetchone()["n"]
-                ),
-                "processed": int(
-                    c.execute(
-                        """
-                        SELECT COUNT(*) AS n
-                        FROM menus m
-                        JOIN shops s ON s.id = m.shop_id
-                        WHERE m.status = 'processed'
-                          AND COALESCE(s.show_in_admin, 1) = 1
-                          AND COALESCE(s.is_closed, 0) = 0;
-                        """
-                    ).fetchone()["n"]
-                ),
-            }
-        return {
-            "new": int(c.execute("SELECT COUNT(*) AS n FROM menus WHERE status='new';").fetchone()["n"]),
-            "error": int(c.execute("SELECT COUNT(*) AS n FROM menus WHERE status='error';").fetchone()["n"]),
-            "processed": int(c.execute("SELECT COUNT(*) AS n FROM menus WHERE status='processed';").fetchone()["n"]),
-        }
+        """Counts of menus by status (one scan of menus)."""
+        visible_join = (
+            """
+            JOIN shops s ON s.id = m.shop_id
+            WHERE COALESCE(s.show_in_admin, 1) = 1
+              AND COALESCE(s.is_closed, 0) = 0
+            """
+            if only_visible
+            else ""
+        )
+        row = c.execute(
+            f"""
+            SELECT COALESCE(SUM(m.status = 'new'), 0) AS new,
+                   COALESCE(SUM(m.status = 'error'), 0) AS error,
+                   COALESCE(SUM(m.status = 'processed'), 0) AS processed
+            FROM menus m
+            {visible_join};
+            """
+        ).fetchone()
+        return {k: int(row[k]) for k in ("new", "error", "processed")}
 
     def get_db_counts(c: sqlite3.Connection) -> Dict[str, int]:
-        """Counts of core tables."""
-        return {
-            "shops": int(c.execute("SELECT COUNT(*) AS n FROM shops;").fetchone()["n"]),
-            "menus": int(c.execute("SELECT COUNT(*) AS n FROM menus;").fetchone()["n"]),
-            "strains": int(c.execute("SELECT COUNT(*) AS n FROM strains;").fetchone()["n"]),
-            "menu_entries": int(c.execute("SELECT COUNT(*) AS n FROM menu_entries;").fetchone()["n"]),
-            "shop_offerings": int(c.execute("SELECT COUNT(*) AS n FROM shop_offerings;").fetchone()["n"]),
-            "menu_history": int(c.execute("SELECT COUNT(*) AS n FROM menu_history;").fetchone()["n"]),
-            "offering_history": int(c.execute("SELECT COUNT(*) AS n FROM offering_history;").fetchone()["n"]),
-        }
+        """Counts of core tables (one statement)."""
+        tables = ("shops", "menus", "strains", "menu_entries", "shop_offerings", "menu_history", "offering_history")
+        row = c.execute(
+            "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {t}) AS {t}" for t in tables) + ";"
+        ).fetchone()
+        return {t: int(row[t]) for t in tables}
 
-    def get_shop_choices(c: sqlite3.Connection) -> List[sqlite3.Row]:
-        """All shops that have a menu record, showing the current menu status."""
-        return c.execute(
+    def get_shop_choices(c: sqlite3.Connection, revision: Optional[str] = None) -> List[sqlite3.Row]:
+        """All shops that have a menu record, showing the current menu status.
+
+        With a data_revision the rows are reused until the next write to the data tables.
+        """
+        if revision is not None:
+            cached = shop_choices_cache.get(revision)
+            if cached is not None:
+                return cached
+        rows = c.execute(
             """
             SELECT s.id AS shop_id, s.name, s.city, m.status
             FROM shops s
@@ -4382,6 +5495,34 @@ def create_app(
             ORDER BY s.city, s.name;
             """
         ).fetchall()
+        if revision is not None:
+            shop_choices_cache.clear()
+            shop_choices_cache[revision] = rows
+        return rows
+
+    def get_strain_name_index(c: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        """Strain (id, name_display) pairs sorted by ASCII-folded name, for prefix suggestions.
+
+        Rebuilt after any write to the data tables; None when the DB has no data_revision.
+        """
+        revision = get_data_revision(c)
+        if revision is None:
+            return None
+        cached = strain_names_cache.get(revision)
+        if cached is not None:
+            return cached
+        strains = [(int(r[0]), str(r[1] or "")) for r in c.execute("SELECT id, name_display FROM strains;")]
+        strains.sort(key=lambda item: item[1].translate(_ASCII_LOWER))
+        index = {
+            "keys": [name.translate(_ASCII_LOWER) for _id, name in strains],
+            "strains": strains,
+            "recent": sorted(strains, reverse=True)[:STRAIN_SUGGEST_LIMIT],
+            # q -> finished suggestion items (with base types) answered at this revision.
+            "answers": {},
+        }
+        strain_names_cache.clear()
+        strain_names_cache[revision] = index
+        return index
 
     def get_known_growers(c: sqlite3.Connection) -> List[str]:
         """Return seeded + previously-used grower labels for the dropdowns."""
@@ -4411,13 +5552,43 @@ def create_app(
             WHERE m.status = 'new'
               AND COALESCE(s.show_in_admin, 1) = 1
               AND COALESCE(s.is_closed, 0) = 0
-            ORDER BY s.city, s.name;
+            ORDER BY s.city, s.name, s.id;
             """
         ).fetchall()
         return [int(r["id"]) for r in rows]
 
     def get_prev_next_new(c: sqlite3.Connection, shop_id: int) -> Tuple[Optional[int], Optional[int]]:
-        """Return (prev_id, next_id) within the 'new' queue."""
+        """Return (prev_id, next_id) within the 'new' queue (same order as get_queue_ids)."""
+        if SQLITE_HAS_WINDOW_FUNCTIONS:
+            rows = c.execute(
+                """
+                WITH q AS (
+                    SELECT s.id,
+                           LAG(s.id) OVER w AS prev_id,
+                           LEAD(s.id) OVER w AS next_id,
+                           ROW_NUMBER() OVER w AS pos
+                    FROM shops s
+                    JOIN menus m ON m.shop_id = s.id
+                    WHERE m.status = 'new'
+                      AND COALESCE(s.show_in_admin, 1) = 1
+                      AND COALESCE(s.is_closed, 0) = 0
+                    WINDOW w AS (ORDER BY s.city, s.name, s.id)
+                )
+                -- One read of q: this shop's row (if queued) and the queue head.
+                SELECT id, prev_id, next_id, pos
+                FROM q
+                WHERE id = ? OR pos = 1;
+                """,
+                (shop_id,),
+            ).fetchall()
+            current = next((r for r in rows if int(r["id"]) == shop_id), None)
+            if current is None:
+                return None, (int(rows[0]["id"]) if rows else None)
+            return (
+                int(current["prev_id"]) if current["prev_id"] is not None else None,
+                int(current["next_id"]) if current["next_id"] is not None else None,
+            )
+
         ids = get_queue_ids(c)
         if not ids:
             return None, None
@@ -4462,53 +5633,73 @@ def create_app(
         if not row:
             return {}
 
-        menu_entries = c.execute(
-            """
-            SELECT me.id AS entry_id,
-                   me.strain_id,
-                   st.name_display AS strain_name,
-                   me.base_type, me.is_cali,
-                   me.grower,
-                   me.price_currency, me.price_amount, me.price_unit,
-                   me.package_price_amount, me.package_weight_g,
-                   me.notes
-            FROM menu_entries me
-            JOIN strains st ON st.id = me.strain_id
-            WHERE me.shop_id = ?
-            ORDER BY st.name_display;
-            """,
-            (shop_id,),
-        ).fetchall()
-
-        offerings = c.execute(
-            """
-            SELECT so.strain_id,
-                   st.name_display AS strain_name,
-                   so.status, so.last_seen_at_utc, so.manual_status_lock,
-                   so.discontinued_until_utc
-            FROM shop_offerings so
-            JOIN strains st ON st.id = so.strain_id
-            WHERE so.shop_id = ?
-            ORDER BY
-                CASE so.status WHEN 'active' THEN 0 ELSE 1 END,
-                st.name_display;
-            """,
-            (shop_id,),
-        ).fetchall()
+        # Entry and offering rows only change with data_revision, so their JSON payloads are
+        # kept per shop. The revision is read first: a write racing the SELECTs can only
+        # cache newer rows under an older revision, which the next view simply refetches.
+        revision = get_data_revision(c)
+        cached = shop_rows_cache.get(shop_id)
+        if cached is not None and revision is not None and cached[0] == revision:
+            shop_rows = cached[1]
+        else:
+            # One round-trip for both lists: each row is tagged with its kind and carries
+            # NULLs for the other kind's columns, then gets split back apart here.
+            rows = c.execute(
+                """
+                SELECT 'm' AS kind, 0 AS sort_rank,
+                       me.id AS entry_id,
+                       me.strain_id,
+                       st.name_display AS strain_name,
+                       me.base_type, me.is_cali,
+                       me.grower,
+                       me.price_currency, me.price_amount, me.price_unit,
+                       me.package_price_amount, me.package_weight_g,
+                       me.notes,
+                       NULL AS status, NULL AS last_seen_at_utc, NULL AS manual_status_lock,
+                       NULL AS discontinued_until_utc
+                FROM menu_entries me
+                JOIN strains st ON st.id = me.strain_id
+                WHERE me.shop_id = ?
+                UNION ALL
+                SELECT 'o', CASE so.status WHEN 'active' THEN 0 ELSE 1 END,
+                       NULL,
+                       so.strain_id,
+                       st.name_display,
+                       NULL, NULL,
+                       NULL,
+                       NULL, NULL, NULL,
+                       NULL, NULL,
+                       NULL,
+                       so.status, so.last_seen_at_utc, so.manual_status_lock,
+                       so.discontinued_until_utc
+                FROM shop_offerings so
+                JOIN strains st ON st.id = so.strain_id
+                WHERE so.shop_id = ?
+                ORDER BY kind, sort_rank, strain_name;
+                """,
+                (shop_id, shop_id),
+            ).fetchall()
+            menu_entries = [{k: r[k] for k in SHOP_ENTRY_FIELDS} for r in rows if r["kind"] == "m"]
+            offerings = [{k: r[k] for k in SHOP_OFFERING_FIELDS} for r in rows if r["kind"] == "o"]
+
+            shop_rows = {
+                "menu_entry_count": len(menu_entries),
+                "offering_count": len(offerings),
+                "entries_json": htmlsafe_json_dumps(with_display_fields(menu_entries), dumps=app.json.dumps),
+                "offerings_json": htmlsafe_json_dumps(offerings, dumps=app.json.dumps),
+            }
+            if revision is not None:
+                shop_rows_cache[shop_id] = (revision, shop_rows)
 
-        menu_entry_count = len(menu_entries)
-        active_unlocked_count = count_active_unlocked_offerings_for_shop(c, shop_id)
-        would_auto_discontinue = count_would_auto_discontinue_for_shop(c, shop_id)
-        finish_requires_mass_confirm = (
-            menu_entry_count > 0
-            and active_unlocked_count >= 5
-            and would_auto_discontinue == active_unlocked_count
-        )
+        menu_entry_count = shop_rows["menu_entry_count"]
+        shop_counts = count_shop_summary(c, shop_id)
+        active_unlocked_count = shop_counts["active_unlocked"]
+        would_auto_discontinue = shop_counts["would_auto_discontinue"]
+        finish_requires_mass_confirm = needs_mass_finish_confirm(shop_counts)
 
         counts = get_menu_counts(c, only_visible=True)
 
         local_path = row["local_path"] or ""
-        file_exists = bool(local_path and os.path.exists(local_path))
+        file_exists = bool(local_path and path_exists(local_path))
 
         return {
             "shop_id": int(row["shop_id"]),
@@ -4518,20 +5709,53 @@ def create_app(
             "menu_image_url": row["image_url"] or "",
             "menu_status": row["status"],
             "menu_file_exists": file_exists,
-            "menu_entries": menu_entries,
-            "offerings": offerings,
+            "entries_json": shop_rows["entries_json"],
+            "offerings_json": shop_rows["offerings_json"],
             "menu_entry_count": menu_entry_count,
+            "offering_count": shop_rows["offering_count"],
             "active_unlocked_count": active_unlocked_count,
             "would_auto_discontinue": would_auto_discontinue,
             "finish_requires_mass_confirm": finish_requires_mass_confirm,
             "new_count": counts["new"],
-            "shop_choices": get_shop_choices(c),
+            "shop_choices": get_shop_choices(c, revision),
             "current_shop_id": int(row["shop_id"]),
             "unit": DEFAULT_UNIT,
             "known_growers": get_known_growers(c),
             "known_package_weights": KNOWN_PACKAGE_WEIGHTS,
+            "data_revision": revision,
         }
 
+    def shop_view_url(shop_id: int, msg: str = "") -> str:
+        """URL of the shop view, built directly rather than through the url_map (mutation redirects)."""
+        url = f"{request.script_root}/shop/{int(shop_id)}"
+        return f"{url}?{urlencode({'msg': msg})}" if msg else url
+
+    def requested_entry_ids() -> List[Any]:
+        """entry_ids from a JSON body ({"entry_ids": [...]}) or from repeated form fields."""
+        if request.is_json:
+            payload = request.get_json(silent=True)
+            ids = payload.get("entry_ids") if isinstance(payload, dict) else None
+            return ids if isinstance(ids, list) else []
+        return request.form.getlist("entry_ids")
+
+    def entry_selection_response(c: sqlite3.Connection, shop_id: int, msg: str) -> Response:
+        """Answer a bulk keep/remove: JSON for the shop page's fetch, else redirect to it."""
+        if not request.is_json:
+            c.close()
+            return redirect(shop_view_url(shop_id, msg=msg))
+        remaining = c.execute("SELECT id FROM menu_entries WHERE shop_id = ?;", (shop_id,)).fetchall()
+        shop_counts = count_shop_summary(c, shop_id)
+        c.close()
+        return jsonify(
+            {
+                "message": msg,
+                "entry_ids": [int(r["id"]) for r in remaining],
+                "finish_requires_mass_confirm": needs_mass_finish_confirm(shop_counts),
+                "would_auto_discontinue": shop_counts["would_auto_discontinue"],
+                "reload_url": shop_view_url(shop_id, msg=msg),
+            }
+        )
+
     def list_strains_for_consolidation(
         c: sqlite3.Connection,
         q: str,
@@ -4806,6 +6030,18 @@ def create_app(
             "order_by": "oh.observed_at_utc DESC, oh.id DESC",
         },
     }
+    # Finished statements per table (with and without a search term), so each request
+    # reuses the same SQL text and with it sqlite3's cached prepared statement.
+    for spec in browse_specs.values():
+        where_parts = list(spec.get("where", []))
+        search_part = "(" + " OR ".join([f"{col} LIKE ?" for col in spec["search_cols"]]) + ")"
+        for key, parts in (("sql_all", where_parts), ("sql_search", [*where_parts, search_part])):
+            where_sql = f" WHERE {' AND '.join(parts)}" if parts else ""
+            spec[key] = f"{spec['sql']}{where_sql} ORDER BY {spec['order_by']} LIMIT ?"
+        # Labels are fixed literals; as Markup, autoescape passes them through untouched.
+        spec["label"] = Markup(spec["label"])
+    # The /browse table picker never changes either.
+    browse_tables = [{"key": k, "label": v["label"]} for k, v in browse_specs.items()]
 
     # -------------------------------------------------------------------------
     # Routes
@@ -4825,9 +6061,8 @@ def create_app(
         scraper_path = app.config["SCRAPER_PATH"]
 
         return Response(
-            render_template_string(
+            render_page(
                 MAIN_TMPL,
-                css=BASE_CSS,
                 message=message,
                 menu_counts=menu_counts,
                 db_counts=db_counts,
@@ -4836,8 +6071,8 @@ def create_app(
                 shops_csv=shops_csv,
                 menus_dir=menus_dir,
                 scraper_path=scraper_path,
-                shops_csv_exists=os.path.exists(shops_csv),
-                scraper_exists=os.path.exists(scraper_path),
+                shops_csv_exists=path_exists(shops_csv),
+                scraper_exists=path_exists(scraper_path),
             )
         )
 
@@ -4875,9 +6110,8 @@ def create_app(
             )
 
         return Response(
-            render_template_string(
+            render_page(
                 SHOP_COVERAGE_TMPL,
-                css=BASE_CSS,
                 q=q,
                 message=message,
                 message_kind=message_kind,
@@ -5140,6 +6374,20 @@ def create_app(
         mimetype = "application/json" if path.endswith(".json") else "text/csv"
         return send_file(path, mimetype=mimetype, as_attachment=False)
 
+    @app.get("/assets/app.<digest>.css")
+    def base_css(digest: str) -> Response:
+        """Serve BASE_CSS; the digest in the URL changes whenever the stylesheet does."""
+        if digest != BASE_CSS_DIGEST:
+            return redirect(url_for("base_css", digest=BASE_CSS_DIGEST))
+        resp = Response(
+            BASE_CSS_BYTES,
+            mimetype="text/css",
+            headers={"Cache-Control": "public, max-age=31536000, immutable"},
+        )
+        # Browsers that ignore "immutable" revalidate on reload; answer those with a 304.
+        resp.set_etag(BASE_CSS_DIGEST)
+        return resp.make_conditional(request)
+
     @app.get("/images/<path:image_path>")
     def static_image_asset(image_path: str) -> Response:
         """Serve small static image assets used by standalone pages."""
@@ -5157,7 +6405,7 @@ def create_app(
         c.close()
         if not ids:
             return redirect(url_for("queue"))
-        return redirect(url_for("shop_view", shop_id=ids[0]))
+        return redirect(shop_view_url(ids[0]))
 
     @app.post("/check_menus")
     def check_menus() -> Response:
@@ -5218,6 +6466,9 @@ def create_app(
                         "backup_path": "",
                     }
 
+        # The scrape may have written new menu files; drop the memoised existence checks.
+        _path_exists_in_window.cache_clear()
+
         c = conn()
         try:
             menu_counts = get_menu_counts(c, only_visible=True)
@@ -5227,9 +6478,8 @@ def create_app(
             c.close()
 
         return Response(
-            render_template_string(
+            render_page(
                 CHECK_TMPL,
-                css=BASE_CSS,
                 result=result,
                 menu_counts=menu_counts,
                 shops_csv=shops_csv,
@@ -5275,7 +6525,7 @@ def create_app(
         ).fetchall()
         counts = get_menu_counts(c, only_visible=True)
         c.close()
-        return Response(render_template_string(QUEUE_TMPL, css=BASE_CSS, rows=rows, counts=counts))
+        return stream_page(QUEUE_TMPL, rows=rows, counts=counts)
 
     @app.get("/strains/consolidate")
     def strain_consolidate() -> Response:
@@ -5299,9 +6549,8 @@ def create_app(
 
         canonical_seed = q
         return Response(
-            render_template_string(
+            render_page(
                 STRAIN_CONSOLIDATE_TMPL,
-                css=BASE_CSS,
                 q=q,
                 limit=limit,
                 rows=rows,
@@ -5422,39 +6671,31 @@ def create_app(
         limit = max(1, min(limit, 1000))
 
         spec = browse_specs[table_key]
-        sql = spec["sql"]
         params: List[object] = []
-        where_parts = list(spec.get("where", []))
         if q:
-            like = f"%{q}%"
-            where_parts.append("(" + " OR ".join([f"{col} LIKE ?" for col in spec["search_cols"]]) + ")")
-            params.extend([like] * len(spec["search_cols"]))
-
-        if where_parts:
-            sql = f"{sql} WHERE {' AND '.join(where_parts)}"
-
-        sql = f"{sql} ORDER BY {spec['order_by']} LIMIT ?"
+            sql = spec["sql_search"]
+            params.extend([f"%{q}%"] * len(spec["search_cols"]))
+        else:
+            sql = spec["sql_all"]
         params.append(limit)
 
         c = conn()
-        rows = c.execute(sql, params).fetchall()
+        # Each spec selects exactly its "columns", in order, so the template walks plain
+        # tuples instead of looking every cell up by name on a sqlite3.Row.
+        rows = [tuple(r) for r in c.execute(sql, params)]
         c.close()
 
-        table_list = [{"key": k, "label": v["label"]} for k, v in browse_specs.items()]
-
-        return Response(
-            render_template_string(
-                BROWSE_TMPL,
-                css=BASE_CSS,
-                tables=table_list,
-                table_key=table_key,
-                table_label=spec["label"],
-                q=q,
-                limit=limit,
-                columns=spec["columns"],
-                rows=rows,
-                row_count=len(rows),
-            )
+        return stream_page(
+            BROWSE_TMPL,
+            tables=browse_tables,
+            table_key=table_key,
+            table_label=spec["label"],
+            q=q,
+            limit=limit,
+            columns=spec["columns"],
+            rows=rows,
+            row_count=len(rows),
+            shop_id_index=spec["columns"].index("id") if table_key == "shops" else None,
         )
 
     @app.get("/strain_lookup")
@@ -5472,8 +6713,16 @@ def create_app(
         if q:
             like = f"%{q.lower()}%"
             c = conn()
+            # The trigram index narrows the strains first; the LOWER() LIKE keeps the exact
+            # match rules (the index also folds non-ASCII case).
+            params: List[Any] = [like]
+            fts_filter = ""
+            if has_strain_name_fts(c):
+                fts_filter = "AND st.id IN (SELECT rowid FROM strains_fts WHERE name_display LIKE ?)"
+                params.append(like)
+            params.append(limit)
             rows = c.execute(
-                """
+                f"""
                 SELECT so.shop_id,
                        st.name_display AS strain,
                        s.name AS shop,
@@ -5490,24 +6739,22 @@ def create_app(
                   AND COALESCE(s.show_in_admin, 1) = 1
                   AND COALESCE(s.is_closed, 0) = 0
                   AND LOWER(st.name_display) LIKE ?
+                  {fts_filter}
                 ORDER BY st.name_display, s.city, s.name
                 LIMIT ?;
                 """,
-                (like, limit),
+                params,
             ).fetchall()
             c.close()
 
         unique_shops = len({int(r["shop_id"]) for r in rows}) if rows else 0
-        return Response(
-            render_template_string(
-                STRAIN_LOOKUP_TMPL,
-                css=BASE_CSS,
-                q=q,
-                limit=limit,
-                rows=rows,
-                row_count=len(rows),
-                unique_shops=unique_shops,
-            )
+        return stream_page(
+            STRAIN_LOOKUP_TMPL,
+            q=q,
+            limit=limit,
+            rows=with_display_fields(rows),
+            row_count=len(rows),
+            unique_shops=unique_shops,
         )
 
     @app.get("/shop/<int:shop_id>/digitised")
@@ -5528,25 +6775,24 @@ def create_app(
             c.close()
             return Response("Shop not found or not currently available.", status=404)
 
-        menu_rows = c.execute(
+        # Menu entries and active offerings in one round-trip, tagged by kind (as on the shop page).
+        rows = c.execute(
             """
-            SELECT st.name_display AS strain,
+            SELECT 'm' AS kind,
+                   st.name_display AS strain,
+                   NULL AS status,
                    me.base_type, me.is_cali,
                    me.grower,
                    me.price_currency, me.price_amount, me.price_unit,
                    me.package_price_amount, me.package_weight_g,
+                   NULL AS last_seen_at_utc,
                    me.notes
             FROM menu_entries me
             JOIN strains st ON st.id = me.strain_id
             WHERE me.shop_id = ?
-            ORDER BY st.name_display;
-            """,
-            (shop_id,),
-        ).fetchall()
-
-        offering_rows = c.execute(
-            """
-            SELECT st.name_display AS strain,
+            UNION ALL
+            SELECT 'o',
+                   st.name_display,
                    so.status,
                    so.base_type, so.is_cali,
                    so.grower,
@@ -5558,22 +6804,21 @@ def create_app(
             JOIN strains st ON st.id = so.strain_id
             WHERE so.shop_id = ?
               AND so.status = 'active'
-            ORDER BY st.name_display;
+            ORDER BY kind, strain;
             """,
-            (shop_id,),
+            (shop_id, shop_id),
         ).fetchall()
+        menu_rows = [{k: r[k] for k in DIGITISED_MENU_FIELDS} for r in rows if r["kind"] == "m"]
+        offering_rows = [{k: r[k] for k in DIGITISED_OFFERING_FIELDS} for r in rows if r["kind"] == "o"]
         c.close()
 
-        return Response(
-            render_template_string(
-                SHOP_DIGITISED_TMPL,
-                css=BASE_CSS,
-                shop_id=shop_id,
-                shop_name=shop["name"],
-                city=shop["city"],
-                menu_rows=menu_rows,
-                offering_rows=offering_rows,
-            )
+        return stream_page(
+            SHOP_DIGITISED_TMPL,
+            shop_id=shop_id,
+            shop_name=shop["name"],
+            city=shop["city"],
+            menu_rows=with_display_fields(menu_rows),
+            offering_rows=with_display_fields(offering_rows),
         )
 
     @app.get("/shop/<int:shop_id>")
@@ -5599,7 +6844,7 @@ def create_app(
         if not ctx:
             return Response("Shop not found (or no menu record).", status=404)
         ctx["message"] = message
-        return Response(render_template_string(PAGE_TMPL, css=BASE_CSS, **ctx))
+        return Response(render_page(PAGE_TMPL, **ctx))
 
     @app.get("/shop/<int:shop_id>/menu_file")
     def serve_menu_file(shop_id: int) -> Response:
@@ -5620,24 +6865,39 @@ def create_app(
         if not row:
             return Response("Not found", status=404)
         path = row["local_path"] or ""
-        if not path or not os.path.exists(path):
+        if not path:
+            return Response("File not found", status=404)
+        # send_file stats the file once (no separate exists check) and answers If-None-Match /
+        # If-Modified-Since with a 304 from its mtime/size ETag. max-age=0 keeps that revalidation
+        # on every view, since a rescrape may rewrite the image under the same path.
+        try:
+            return send_file(
+                path,
+                mimetype="image/jpeg",
+                as_attachment=False,
+                download_name=os.path.basename(path),
+                conditional=True,
+                etag=True,
+                max_age=0,
+            )
+        except FileNotFoundError:
             return Response("File not found", status=404)
-        return send_file(path, mimetype="image/jpeg", as_attachment=False, download_name=os.path.basename(path))
 
     @app.post("/shop/<int:shop_id>/add")
     def add_entry(shop_id: int) -> Response:
         """Add or update a current menu entry."""
-        strain_name = request.form.get("strain_name", "")
-        base_type = request.form.get("base_type", "")
-        is_cali = (request.form.get("is_cali") == "1")
-        consolidate_type = (request.form.get("consolidate_type") == "1")
-        grower_choice = request.form.get("grower_choice", "")
-        grower_custom = request.form.get("grower_custom", "")
-        price_currency = request.form.get("price_currency", DEFAULT_CURRENCY)
-        package_price_amount = request.form.get("package_price_amount", "")
-        package_weight_choice = request.form.get("package_weight_choice", "1")
-        package_weight_custom = request.form.get("package_weight_custom", "")
-        notes = request.form.get("notes", "")
+        form = request.form
+        strain_name = form.get("strain_name", "")
+        base_type = form.get("base_type", "")
+        is_cali = (form.get("is_cali") == "1")
+        consolidate_type = (form.get("consolidate_type") == "1")
+        grower_choice = form.get("grower_choice", "")
+        grower_custom = form.get("grower_custom", "")
+        price_currency = form.get("price_currency", DEFAULT_CURRENCY)
+        package_price_amount = form.get("package_price_amount", "")
+        package_weight_choice = form.get("package_weight_choice", "1")
+        package_weight_custom = form.get("package_weight_custom", "")
+        notes = form.get("notes", "")
 
         c = conn()
         _ok, msg = add_or_update_menu_entry(
@@ -5656,7 +6916,7 @@ def create_app(
             consolidate_type=consolidate_type,
         )
         c.close()
-        return redirect(url_for("shop_view", shop_id=shop_id, msg=msg))
+        return redirect(shop_view_url(shop_id, msg=msg))
 
     @app.get("/shop/<int:shop_id>/finish")
     def finish_menu(shop_id: int) -> Response:
@@ -5665,17 +6925,16 @@ def create_app(
         allow_mass = (request.args.get("allow_mass", "0") == "1")
         c = conn()
 
-        menu_entry_count = count_menu_entries_for_shop(c, shop_id)
-        active_offering_count = count_active_offerings_for_shop(c, shop_id)
-        active_unlocked_count = count_active_unlocked_offerings_for_shop(c, shop_id)
-        would_auto_discontinue = count_would_auto_discontinue_for_shop(c, shop_id)
+        shop_counts = count_shop_summary(c, shop_id)
+        menu_entry_count = shop_counts["menu_entries"]
+        active_offering_count = shop_counts["active"]
+        would_auto_discontinue = shop_counts["would_auto_discontinue"]
 
         if menu_entry_count == 0 and active_offering_count > 0 and not allow_empty:
             c.close()
             return redirect(
-                url_for(
-                    "shop_view",
-                    shop_id=shop_id,
+                shop_view_url(
+                    shop_id,
                     msg=(
                         "No current menu entries yet. Finishing now would discontinue all active offerings. "
                         "Use 'Load active offerings' first, or use 'Finish empty' to confirm."
@@ -5683,17 +6942,11 @@ def create_app(
                 )
             )
 
-        if (
-            menu_entry_count > 0
-            and active_unlocked_count >= 5
-            and would_auto_discontinue == active_unlocked_count
-            and not allow_mass
-        ):
+        if needs_mass_finish_confirm(shop_counts) and not allow_mass:
             c.close()
             return redirect(
-                url_for(
-                    "shop_view",
-                    shop_id=shop_id,
+                shop_view_url(
+                    shop_id,
                     msg=(
                         f"Safety stop: finishing now would auto-discontinue all {would_auto_discontinue} active offerings. "
                         "Review entries, then use the confirm finish button."
@@ -5701,8 +6954,8 @@ def create_app(
                 )
             )
 
-        reconcile_offerings_for_shop(c, shop_id)
-        mark_menu_processed(c, shop_id)
+        # One write transaction (one WAL commit) for the reconcile and the queue update.
+        reconcile_offerings_for_shop(c, shop_id, mark_processed=True)
         export_json_snapshot(c, app.config["JSON_EXPORT_DIR"])
         _prev_id, next_id = get_prev_next_new(c, shop_id)
         c.close()
@@ -5711,13 +6964,12 @@ def create_app(
             return redirect(url_for("queue"))
         if menu_entry_count == 0 and active_offering_count > 0 and allow_empty:
             return redirect(
-                url_for(
-                    "shop_view",
-                    shop_id=next_id,
+                shop_view_url(
+                    next_id,
                     msg="Menu processed as empty. All previously active offerings were discontinued. Next →",
                 )
             )
-        return redirect(url_for("shop_view", shop_id=next_id, msg="Menu processed. Next →"))
+        return redirect(shop_view_url(next_id, msg="Menu processed. Next →"))
 
     @app.get("/shop/<int:shop_id>/next")
     def next_shop(shop_id: int) -> Response:
@@ -5727,7 +6979,7 @@ def create_app(
         c.close()
         if next_id is None:
             return redirect(url_for("queue"))
-        return redirect(url_for("shop_view", shop_id=next_id))
+        return redirect(shop_view_url(next_id))
 
     @app.get("/shop/<int:shop_id>/prev")
     def prev_shop(shop_id: int) -> Response:
@@ -5736,8 +6988,8 @@ def create_app(
         prev_id, _next_id = get_prev_next_new(c, shop_id)
         c.close()
         if prev_id is None:
-            return redirect(url_for("shop_view", shop_id=shop_id, msg="Already at first new menu (or not in queue)."))
-        return redirect(url_for("shop_view", shop_id=prev_id))
+            return redirect(shop_view_url(shop_id, msg="Already at first new menu (or not in queue)."))
+        return redirect(shop_view_url(prev_id))
 
     @app.get("/shop/<int:shop_id>/entry/<int:entry_id>/edit")
     def edit_entry_get(shop_id: int, entry_id: int) -> Response:
@@ -5752,9 +7004,8 @@ def create_app(
             return Response("Entry not found", status=404)
 
         return Response(
-            render_template_string(
+            render_page(
                 EDIT_TMPL,
-                css=BASE_CSS,
                 shop_id=shop_id,
                 shop_name=shop_row["name"],
                 city=shop_row["city"],
@@ -5773,20 +7024,20 @@ def create_app(
         If save fails, we re-render the edit page with the user's submitted values
         preserved (so it doesn't "snap back" to DB state).
         """
-        strain_name = request.form.get("strain_name", "")
-        base_type = request.form.get("base_type", "")
-        is_cali = (request.form.get("is_cali") == "1")
-        grower_choice = request.form.get("grower_choice", "")
-        grower_custom = request.form.get("grower_custom", "")
-        price_currency = request.form.get("price_currency", DEFAULT_CURRENCY)
-        package_price_amount = request.form.get("package_price_amount", "")
-        package_weight_choice = request.form.get("package_weight_choice", "1")
-        package_weight_custom = request.form.get("package_weight_custom", "")
-        notes = request.form.get("notes", "")
+        form = request.form
+        strain_name = form.get("strain_name", "")
+        base_type = form.get("base_type", "")
+        is_cali = (form.get("is_cali") == "1")
+        grower_choice = form.get("grower_choice", "")
+        grower_custom = form.get("grower_custom", "")
+        price_currency = form.get("price_currency", DEFAULT_CURRENCY)
+        package_price_amount = form.get("package_price_amount", "")
+        package_weight_choice = form.get("package_weight_choice", "1")
+        package_weight_custom = form.get("package_weight_custom", "")
+        notes = form.get("notes", "")
 
         c = conn()
         shop_row = c.execute("SELECT id, name, city FROM shops WHERE id = ?;", (shop_id,)).fetchone()
-        known_growers = get_known_growers(c)
 
         try:
             ok, msg = update_menu_entry_by_id(
@@ -5841,11 +7092,12 @@ def create_app(
                 "package_weight_g": package_weight_g_float,
                 "notes": notes,
             }
+            # Only the re-rendered form needs the grower list; a failed save left it unchanged.
+            known_growers = get_known_growers(c)
             c.close()
             return Response(
-                render_template_string(
+                render_page(
                     EDIT_TMPL,
-                    css=BASE_CSS,
                     shop_id=shop_id,
                     shop_name=shop_row["name"],
                     city=shop_row["city"],
@@ -5858,7 +7110,7 @@ def create_app(
             )
 
         c.close()
-        return redirect(url_for("shop_view", shop_id=shop_id, msg=msg))
+        return redirect(shop_view_url(shop_id, msg=msg))
 
     @app.post("/shop/<int:shop_id>/load_active")
     def load_active_to_entries(shop_id: int) -> Response:
@@ -5867,15 +7119,14 @@ def create_app(
         active_count = count_active_offerings_for_shop(c, shop_id)
         if active_count == 0:
             c.close()
-            return redirect(url_for("shop_view", shop_id=shop_id, msg="No active offerings found to load."))
+            return redirect(shop_view_url(shop_id, msg="No active offerings found to load."))
 
         replaced = count_menu_entries_for_shop(c, shop_id)
         loaded = load_menu_entries_from_active_offerings(c, shop_id, replace=True)
         c.close()
         return redirect(
-            url_for(
-                "shop_view",
-                shop_id=shop_id,
+            shop_view_url(
+                shop_id,
                 msg=(
                     f"Loaded {loaded} active offerings into current entries (replaced {replaced}). "
                     "Now remove/edit what changed, then finish menu."
@@ -5889,30 +7140,28 @@ def create_app(
         c = conn()
         delete_menu_entry_by_id(c, shop_id, entry_id)
         c.close()
-        return redirect(url_for("shop_view", shop_id=shop_id, msg="Entry deleted."))
+        return redirect(shop_view_url(shop_id, msg="Entry deleted."))
 
     @app.post("/shop/<int:shop_id>/entries/delete_selected")
     def delete_selected_entries(shop_id: int) -> Response:
         """Bulk-delete selected current menu entries."""
-        ids = request.form.getlist("entry_ids")
+        ids = requested_entry_ids()
         c = conn()
         removed = delete_menu_entries_by_ids(c, shop_id, ids)
-        c.close()
         if removed <= 0:
             msg = "No entries selected."
         elif removed == 1:
             msg = "Removed 1 entry."
         else:
             msg = f"Removed {removed} entries."
-        return redirect(url_for("shop_view", shop_id=shop_id, msg=msg))
+        return entry_selection_response(c, shop_id, msg)
 
     @app.post("/shop/<int:shop_id>/entries/keep_selected")
     def keep_selected_entries(shop_id: int) -> Response:
         """Keep only selected current menu entries for this shop."""
-        ids = request.form.getlist("entry_ids")
+        ids = requested_entry_ids()
         c = conn()
         summary = keep_only_menu_entries_by_ids(c, shop_id, ids)
-        c.close()
 
         if summary["before"] <= 0:
             msg = "No entries to update."
@@ -5922,11 +7171,16 @@ def create_app(
             msg = f"Kept all {summary['after']} selected entries (nothing removed)."
         else:
             msg = f"Kept {summary['after']} selected entries. Removed {summary['removed']}."
-        return redirect(url_for("shop_view", shop_id=shop_id, msg=msg))
+        return entry_selection_response(c, shop_id, msg)
 
     @app.post("/shop/<int:shop_id>/offerings/status")
     def update_offering_statuses(shop_id: int) -> Response:
-        """Bulk-update offering statuses from the status list radio controls."""
+        """Bulk-update offering statuses from the status list radio controls.
+
+        The shop page posts this with fetch and asks for JSON, so it can update the rows in
+        place; a plain form post still gets the redirect back to the shop view.
+        """
+        wants_json = request.accept_mimetypes.best == "application/json"
         c = conn()
         rows = c.execute(
             """
@@ -5938,7 +7192,9 @@ def create_app(
         ).fetchall()
         if not rows:
             c.close()
-            return redirect(url_for("shop_view", shop_id=shop_id, msg="No offerings found to update."))
+            if wants_json:
+                return jsonify({"message": "No offerings found to update.", "offerings": []})
+            return redirect(shop_view_url(shop_id, msg="No offerings found to update."))
 
         changed = 0
         for r in rows:
@@ -5976,8 +7232,29 @@ def create_app(
             msg = f"Updated {changed} offering status{'es' if changed != 1 else ''}."
         else:
             msg = "No status changes."
+        if not wants_json:
+            c.close()
+            return redirect(shop_view_url(shop_id, msg=msg))
+
+        offerings = c.execute(
+            """
+            SELECT strain_id, status, manual_status_lock, discontinued_until_utc
+            FROM shop_offerings
+            WHERE shop_id = ?;
+            """,
+            (shop_id,),
+        ).fetchall()
+        shop_counts = count_shop_summary(c, shop_id)
         c.close()
-        return redirect(url_for("shop_view", shop_id=shop_id, msg=msg))
+        return jsonify(
+            {
+                "message": msg,
+                "offerings": [dict(r) for r in offerings],
+                "finish_requires_mass_confirm": needs_mass_finish_confirm(shop_counts),
+                "would_auto_discontinue": shop_counts["would_auto_discontinue"],
+                "reload_url": shop_view_url(shop_id, msg=msg),
+            }
+        )
 
     @app.post("/shop/<int:shop_id>/offering/<int:strain_id>/discontinue")
     def discontinue_offering(shop_id: int, strain_id: int) -> Response:
@@ -5987,7 +7264,7 @@ def create_app(
         c = conn()
         set_offering_status(c, shop_id, strain_id, status="discontinued", reason=reason, until_utc=until_utc, lock=True)
         c.close()
-        return redirect(url_for("shop_view", shop_id=shop_id, msg="Marked discontinued (locked)."))
+        return redirect(shop_view_url(shop_id, msg="Marked discontinued (locked)."))
 
     @app.post("/shop/<int:shop_id>/offering/<int:strain_id>/resume")
     def resume_offering(shop_id: int, strain_id: int) -> Response:
@@ -5995,14 +7272,48 @@ def create_app(
         c = conn()
         set_offering_status(c, shop_id, strain_id, status="active", lock=False)
         c.close()
-        return redirect(url_for("shop_view", shop_id=shop_id, msg="Resumed (unlocked)."))
+        return redirect(shop_view_url(shop_id, msg="Resumed (unlocked)."))
+
+    @app.post("/api/shop/<int:shop_id>/entries")
+    def api_add_entries_batch(shop_id: int) -> Tuple[Response, int]:
+        """Add or update many current menu entries at once (JSON: {"entries": [...]})."""
+        payload = request.get_json(silent=True) or {}
+        rows = payload.get("entries") if isinstance(payload, dict) else None
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            return jsonify({"ok": False, "saved": 0, "errors": ["Expected JSON body {\"entries\": [...]}."]}), 400
+
+        c = conn()
+        if not c.execute("SELECT 1 FROM shops WHERE id = ?;", (shop_id,)).fetchone():
+            c.close()
+            return jsonify({"ok": False, "saved": 0, "errors": ["Shop not found."]}), 404
+        saved, errors = add_menu_entries_batch(c, shop_id, rows)
+        c.close()
+        return jsonify({"ok": not errors, "saved": saved, "errors": errors}), (400 if errors else 200)
 
     @app.get("/api/strain_suggest")
     def api_strain_suggest() -> Response:
         """Autocomplete suggestions for strain names."""
         q = (request.args.get("q", "") or "").strip()
         c = conn()
-        if q:
+        index = None if "%" in q or "_" in q else get_strain_name_index(c)
+        items = index["answers"].get(q) if index is not None else None
+        if items is not None:
+            c.close()
+            return jsonify({"suggestions": [item["name_display"] for item in items], "items": items})
+        if index is not None:
+            # Same rows as the LIKE 'q%' query below, from the in-memory sorted names.
+            keys = index["keys"]
+            prefix = q.translate(_ASCII_LOWER)
+            if q:
+                pos = bisect.bisect_left(keys, prefix)
+                end = pos
+                while end < len(keys) and keys[end].startswith(prefix):
+                    end += 1
+                hits = sorted(index["strains"][pos:end], key=lambda item: item[1])[:STRAIN_SUGGEST_LIMIT]
+            else:
+                hits = index["recent"]
+            rows = [{"id": strain_id, "name_display": name} for strain_id, name in hits]
+        elif q:
             like = q + "%"
             rows = c.execute(
                 """
@@ -6010,9 +7321,9 @@ def create_app(
                 FROM strains
                 WHERE name_display LIKE ?
                 ORDER BY name_display
-                LIMIT 30;
+                LIMIT ?;
                 """,
-                (like,),
+                (like, STRAIN_SUGGEST_LIMIT),
             ).fetchall()
         else:
             rows = c.execute(
@@ -6020,8 +7331,9 @@ def create_app(
                 SELECT id, name_display
                 FROM strains
                 ORDER BY id DESC
-                LIMIT 30;
-                """
+                LIMIT ?;
+                """,
+                (STRAIN_SUGGEST_LIMIT,),
             ).fetchall()
         items = [
             {
@@ -6030,6 +7342,8 @@ def create_app(
             }
             for r in rows
         ]
+        if index is not None and len(index["answers"]) < STRAIN_SUGGEST_CACHE_SIZE:
+            index["answers"][q] = items
         c.close()
         return jsonify(
             {
@@ -6045,6 +7359,31 @@ def create_app(
 # Entrypoint
 # -----------------------------------------------------------------------------
 
+def report_json_export(manifest: Dict[str, Any], json_export_dir: str) -> None:
+    """Print where the JSON snapshot went and its manifest counts."""
+    print(f"[JSON] Exported to: {json_export_dir}")
+    counts = manifest.get("counts", {})
+    print(
+        "[JSON] Counts:",
+        f"shops={counts.get('shops', 0)}",
+        f"strains={counts.get('strains', 0)}",
+        f"active_offerings={counts.get('active_offerings', 0)}",
+        f"menu_entries={counts.get('menu_entries', 0)}",
+        f"strain_index={counts.get('strain_index', 0)}",
+    )
+
+
+def export_json_snapshot_in_background(db_path: str, json_export_dir: str) -> None:
+    """Startup export on a worker thread (own connection; failures are printed, not raised)."""
+    c = db_connect(db_path)
+    try:
+        report_json_export(export_json_snapshot(c, json_export_dir), json_export_dir)
+    except Exception:
+        print(f"[JSON] Export failed:\n{traceback.format_exc()}", file=sys.stderr)
+    finally:
+        c.close()
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Coffeeshop menu entry app.")
     ap.add_argument("--db", required=True, help="SQLite DB path (shared with scraper).")
@@ -6061,6 +7400,11 @@ def main() -> int:
         action="store_true",
         help="Export JSON and exit (do not start Flask server).",
     )
+    ap.add_argument(
+        "--renormalise-strains",
+        action="store_true",
+        help="Re-derive strain keys from display names (merging duplicates) before starting.",
+    )
     ap.add_argument("--host", default="127.0.0.1")
     ap.add_argument("--port", type=int, default=5000)
     args = ap.parse_args()
@@ -6075,24 +7419,27 @@ def main() -> int:
     c = db_connect(db_path)
     db_init(c)
 
-    if args.export_json_dir or args.export_json_only:
-        manifest = export_json_snapshot(c, json_export_dir)
-        print(f"[JSON] Exported to: {json_export_dir}")
-        counts = manifest.get("counts", {})
-        print(
-            "[JSON] Counts:",
-            f"shops={counts.get('shops', 0)}",
-            f"strains={counts.get('strains', 0)}",
-            f"active_offerings={counts.get('active_offerings', 0)}",
-            f"menu_entries={counts.get('menu_entries', 0)}",
-            f"strain_index={counts.get('strain_index', 0)}",
-        )
+    if args.renormalise_strains:
+        renamed, merged = renormalise_strain_keys(c)
+        print(f"[STRAINS] Renormalised {renamed} key(s), merged {merged} duplicate(s).")
 
+    if args.export_json_only:
+        report_json_export(export_json_snapshot(c, json_export_dir), json_export_dir)
     c.close()
 
     if args.export_json_only:
         return 0
 
+    if args.export_json_dir:
+        # The server can start listening while the snapshot is written; its own exports
+        # wait on the same lock, and the thread reads through its own connection.
+        threading.Thread(
+            target=export_json_snapshot_in_background,
+            args=(db_path, json_export_dir),
+            name="startup-json-export",
+            daemon=True,
+        ).start()
+
     app = create_app(
         db_path=db_path,
         shops_csv=shops_csv,
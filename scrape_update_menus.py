@@ -47,18 +47,31 @@ from __future__ import annotations
 
 import argparse
 import csv
+import functools
+import gzip
 import hashlib
+import json
 import os
 import re
 import sqlite3
 import ssl
+import tempfile
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from html.parser import HTMLParser
-from typing import Dict, List, Optional, Tuple
+from http.client import HTTPConnection, HTTPMessage, HTTPResponse, HTTPSConnection
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 from urllib.parse import quote, unquote, urljoin, urlparse, urlsplit, urlunsplit
-from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from urllib.request import Request, getproxies, urlopen
+
+try:
+    from selectolax.parser import HTMLParser as _FastHTMLParser  # type: ignore
+except ImportError:  # optional C parser; the stdlib one below works the same, only slower
+    _FastHTMLParser = None
 
 
 # -----------------------------
@@ -66,7 +79,15 @@ from urllib.request import Request, urlopen
 # -----------------------------
 
 HTTP_TIMEOUT = 30
-SLEEP_BETWEEN_SHOPS_SEC = 0.3  # polite delay; increase if you get blocked
+MAX_REDIRECTS = 5
+HTML_CACHE_DIRNAME = ".html_cache"  # under out_dir: shop pages + validators, revalidated with conditional GETs
+DOWNLOAD_CHUNK_BYTES = 64 * 1024  # images are hashed and written to disk in chunks of this size
+MIN_REQUEST_INTERVAL_SEC = 0.15  # polite gap between request starts per host; increase if you get blocked
+FETCH_WORKERS = 4  # shops downloaded concurrently (DB writes stay on the main thread)
+FETCH_AHEAD = 8  # downloads queued ahead of the shop being written (bounds temp images waiting in out_dir)
+SQLITE_BUSY_TIMEOUT_SEC = 5.0  # wait this long for the admin app's write lock
+# INSERT ... RETURNING needs SQLite 3.35+; older libraries fall back to a SELECT.
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
 USER_AGENT = "Mozilla/5.0 (compatible; CoffeeShopMenuTracker/1.0)"
 ALLOWED_IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
 # Only allow images from coffeeshopmenus.org and coffeeshopmenus.info style domains (adjust if needed)
@@ -74,19 +95,28 @@ ALLOWED_DOMAINS = {"www.coffeeshopmenus.org", "coffeeshopmenus.org"}
 
 # Prefer menu images that live in /Menus/ (common on coffeeshopmenus)
 MENU_PATH_HINT = "/Menus/"
+MENU_PATH_HINT_LOWER = MENU_PATH_HINT.lower()
+
+# Domain, path and extension checked in one match; group 1 is the path.
+_IMAGE_URL_RE = re.compile(
+    r"^https?://(?:" + "|".join(re.escape(d) for d in sorted(ALLOWED_DOMAINS)) + r")"
+    r"(/[^?#]*\.(?:" + "|".join(re.escape(e[1:]) for e in sorted(ALLOWED_IMAGE_EXTS)) + r"))(?:[?#]|$)",
+    re.IGNORECASE,
+)
 
 # macOS/python installs can have missing CA trust setup. We first try strict
 # verification, then optionally fall back to an unverified TLS context only
 # when certificate verification fails.
 ALLOW_INSECURE_SSL_FALLBACK = True
-_warned_insecure_ssl_fallback = False
+# Set by the fetch threads when they fall back; run() logs it once and resets it per run.
+_insecure_ssl_fallback_used = False
 
 
 # -----------------------------
 # Data models
 # -----------------------------
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ShopRow:
     """Represents one shop row from csd.csv"""
     shop: str
@@ -96,15 +126,50 @@ class ShopRow:
     is_closed: bool
 
 
+@dataclass(slots=True)
+class MenuFetch:
+    """Result of downloading one shop page and its menu image (no DB access)."""
+    menu_url: Optional[str] = None
+    sha256: str = ""
+    num_bytes: int = 0
+    tmp_path: str = ""  # downloaded image in out_dir, renamed or removed by the main thread
+    error_msg: str = ""
+    no_menu_url: bool = False
+    not_modified: bool = False  # 304 for the stored validators: nothing downloaded, image unchanged
+    http_etag: str = ""
+    http_last_modified: str = ""
+
+
+@dataclass(slots=True, frozen=True)
+class KnownMenu:
+    """What the DB already has for a shop's menu image, for conditional downloads."""
+    image_url: str
+    http_etag: str
+    http_last_modified: str
+
+
 # -----------------------------
 # DB helpers (schema is shared with the Flask app)
+# Write helpers do not commit: run() commits each shop's writes together.
 # -----------------------------
 
 def db_connect(db_path: str) -> sqlite3.Connection:
-    """Connect to SQLite with foreign keys enabled."""
-    conn = sqlite3.connect(db_path)
+    """Connect to SQLite with foreign keys enabled.
+
+    WAL lets the admin app keep reading while a scrape writes; with WAL, NORMAL
+    sync is still crash-safe and skips the fsync on every commit.
+    """
+    conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT_SEC)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
+    conn.executescript(
+        """
+        PRAGMA foreign_keys = ON;
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        """
+    )
     return conn
 
 
@@ -136,6 +201,8 @@ def db_init(conn: sqlite3.Connection) -> None:
             bytes INTEGER NOT NULL,
             status TEXT NOT NULL,   -- 'new' | 'processed' | 'error'
             error TEXT DEFAULT '',
+            http_etag TEXT NOT NULL DEFAULT '',          -- validators from the last image download,
+            http_last_modified TEXT NOT NULL DEFAULT '', -- sent back as a conditional GET
             FOREIGN KEY(shop_id) REFERENCES shops(id) ON DELETE CASCADE
         );
 
@@ -248,7 +315,8 @@ def db_init(conn: sqlite3.Connection) -> None:
             FOREIGN KEY(menu_history_id) REFERENCES menu_history(id) ON DELETE SET NULL
         );
 
-        CREATE INDEX IF NOT EXISTS idx_menus_status ON menus(status);
+        CREATE INDEX IF NOT EXISTS idx_menus_status_shop ON menus(status, shop_id);
+        DROP INDEX IF EXISTS idx_menus_status;
         CREATE INDEX IF NOT EXISTS idx_menu_entries_shop ON menu_entries(shop_id);
         CREATE INDEX IF NOT EXISTS idx_offerings_shop ON shop_offerings(shop_id);
         CREATE INDEX IF NOT EXISTS idx_offerings_status ON shop_offerings(status);
@@ -264,6 +332,10 @@ def db_init(conn: sqlite3.Connection) -> None:
         conn.execute("ALTER TABLE shops ADD COLUMN show_in_admin INTEGER NOT NULL DEFAULT 1;")
     if "is_closed" not in shop_cols:
         conn.execute("ALTER TABLE shops ADD COLUMN is_closed INTEGER NOT NULL DEFAULT 0;")
+    menu_cols = {str(r["name"]) for r in conn.execute("PRAGMA table_info(menus);").fetchall()}
+    for column_name in ("http_etag", "http_last_modified"):
+        if column_name not in menu_cols:
+            conn.execute(f"ALTER TABLE menus ADD COLUMN {column_name} TEXT NOT NULL DEFAULT '';")
     migration_columns = {
         "menu_entries": [
             ("grower", "TEXT NOT NULL DEFAULT ''"),
@@ -301,6 +373,32 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+UPSERT_SHOP_SQL = """
+    INSERT INTO shops(name, city, shop_url, show_in_admin, is_closed, created_at, updated_at)
+    VALUES(?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(name, city) DO UPDATE SET
+        shop_url = excluded.shop_url,
+        show_in_admin = excluded.show_in_admin,
+        is_closed = excluded.is_closed,
+        updated_at = excluded.updated_at
+"""
+
+
+def _shop_params(
+    name: str, city: str, shop_url: str, show_in_admin: bool, is_closed: bool, now: str
+) -> Tuple[str, str, str, int, int, str, str]:
+    return (name.strip(), city.strip(), shop_url.strip(), int(show_in_admin), int(is_closed), now, now)
+
+
+def upsert_shops(conn: sqlite3.Connection, rows: List[Tuple[ShopRow, str]]) -> None:
+    """Create or update many (shop, normalised shop_url) rows in one executemany."""
+    now = utc_now_iso()
+    conn.executemany(
+        UPSERT_SHOP_SQL + ";",
+        [_shop_params(s.shop, s.city, shop_url, s.show_in_admin, s.is_closed, now) for s, shop_url in rows],
+    )
+
+
 def upsert_shop(
     conn: sqlite3.Connection,
     name: str,
@@ -310,28 +408,17 @@ def upsert_shop(
     is_closed: bool,
 ) -> int:
     """Create shop if missing, return shop_id."""
-    now = utc_now_iso()
-    show_int = 1 if show_in_admin else 0
-    closed_int = 1 if is_closed else 0
-    conn.execute(
-        """
-        INSERT INTO shops(name, city, shop_url, show_in_admin, is_closed, created_at, updated_at)
-        VALUES(?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(name, city) DO UPDATE SET
-            shop_url = excluded.shop_url,
-            show_in_admin = excluded.show_in_admin,
-            is_closed = excluded.is_closed,
-            updated_at = excluded.updated_at;
-        """,
-        (name.strip(), city.strip(), shop_url.strip(), show_int, closed_int, now, now),
-    )
-    row = conn.execute(
-        "SELECT id FROM shops WHERE name = ? AND city = ?;",
-        (name.strip(), city.strip()),
-    ).fetchone()
+    params = _shop_params(name, city, shop_url, show_in_admin, is_closed, utc_now_iso())
+    if SQLITE_HAS_RETURNING:
+        row = conn.execute(UPSERT_SHOP_SQL + " RETURNING id;", params).fetchone()
+    else:
+        conn.execute(UPSERT_SHOP_SQL + ";", params)
+        row = conn.execute(
+            "SELECT id FROM shops WHERE name = ? AND city = ?;",
+            (name.strip(), city.strip()),
+        ).fetchone()
     assert row is not None
-    conn.commit()
-    return int(row["id"])
+    return int(row[0])
 
 
 def get_existing_menu_sha(conn: sqlite3.Connection, shop_id: int) -> Optional[str]:
@@ -342,6 +429,19 @@ def get_existing_menu_sha(conn: sqlite3.Connection, shop_id: int) -> Optional[st
     return str(row["sha256"] or "")
 
 
+def load_known_menus(conn: sqlite3.Connection) -> Dict[Tuple[str, str], KnownMenu]:
+    """Stored image URL and HTTP validators per (shop, city), for conditional downloads."""
+    rows = conn.execute(
+        """
+        SELECT s.name, s.city, m.image_url, m.http_etag, m.http_last_modified
+        FROM shops s
+        JOIN menus m ON m.shop_id = s.id
+        WHERE m.sha256 <> '' AND (m.http_etag <> '' OR m.http_last_modified <> '');
+        """
+    ).fetchall()
+    return {(r[0], r[1]): KnownMenu(r[2] or "", r[3], r[4]) for r in rows}
+
+
 def get_existing_menu(conn: sqlite3.Connection, shop_id: int) -> Optional[sqlite3.Row]:
     """Return the current menu row for one shop, if present."""
     return conn.execute(
@@ -361,6 +461,8 @@ def touch_menu_seen(
     image_url: str,
     sha256: str,
     num_bytes: int,
+    http_etag: str = "",
+    http_last_modified: str = "",
 ) -> str:
     """Update fetched_at for an unchanged menu while preserving queue status."""
     existing = get_existing_menu(conn, shop_id)
@@ -375,19 +477,22 @@ def touch_menu_seen(
             sha256 = ?,
             bytes = ?,
             status = ?,
-            error = ''
+            error = '',
+            http_etag = ?,
+            http_last_modified = ?
         WHERE shop_id = ?;
         """,
-        (now, source_page_url, image_url, sha256, int(num_bytes), preserved_status, shop_id),
+        (
+            now, source_page_url, image_url, sha256, int(num_bytes), preserved_status,
+            http_etag, http_last_modified, shop_id,
+        ),
     )
-    conn.commit()
     return preserved_status
 
 
 def clear_menu_entries(conn: sqlite3.Connection, shop_id: int) -> None:
     """When a new menu arrives, wipe any previous current entries for that shop."""
     conn.execute("DELETE FROM menu_entries WHERE shop_id = ?;", (shop_id,))
-    conn.commit()
 
 
 def record_menu_history(
@@ -426,7 +531,6 @@ def record_menu_history(
             now,
         ),
     )
-    conn.commit()
     return int(cur.lastrowid)
 
 
@@ -494,7 +598,6 @@ def archive_active_offerings_for_rebuild(
         """,
         (now, now, shop_id),
     )
-    conn.commit()
     return len(rows)
 
 
@@ -559,7 +662,6 @@ def record_current_offerings_seen(
         """,
         (now, now, shop_id),
     )
-    conn.commit()
     return len(rows)
 
 
@@ -590,7 +692,6 @@ def mark_menu_error(conn: sqlite3.Connection, shop_id: int, source_page_url: str
             """,
             (now, source_page_url, preserved_status, (error_msg or "").strip(), shop_id),
         )
-        conn.commit()
         record_menu_history(
             conn,
             shop_id=shop_id,
@@ -641,15 +742,18 @@ def upsert_menu(
     num_bytes: int,
     status: str,
     error: str = "",
+    http_etag: str = "",
+    http_last_modified: str = "",
 ) -> None:
     """Upsert the ONE current menu row per shop."""
     now = utc_now_iso()
     conn.execute(
         """
         INSERT INTO menus(
-            shop_id, fetched_at_utc, source_page_url, image_url, local_path, sha256, bytes, status, error
+            shop_id, fetched_at_utc, source_page_url, image_url, local_path, sha256, bytes, status, error,
+            http_etag, http_last_modified
         )
-        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(shop_id) DO UPDATE SET
             fetched_at_utc = excluded.fetched_at_utc,
             source_page_url = excluded.source_page_url,
@@ -658,11 +762,15 @@ def upsert_menu(
             sha256 = excluded.sha256,
             bytes = excluded.bytes,
             status = excluded.status,
-            error = excluded.error;
+            error = excluded.error,
+            http_etag = excluded.http_etag,
+            http_last_modified = excluded.http_last_modified;
         """,
-        (shop_id, now, source_page_url, image_url, local_path, sha256, num_bytes, status, error),
+        (
+            shop_id, now, source_page_url, image_url, local_path, sha256, num_bytes, status, error,
+            http_etag, http_last_modified,
+        ),
     )
-    conn.commit()
 
 
 # -----------------------------
@@ -687,8 +795,8 @@ def read_shops_csv(path: str) -> List[ShopRow]:
 
     out: List[ShopRow] = []
     with open(path, "r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        headers = [h.strip().lower() for h in (reader.fieldnames or [])]
+        reader = csv.reader(f)
+        headers = [h.strip().lower() for h in next(reader, [])]
         header_set = set(headers)
 
         # Accept either `shop` or `name` for the shop name column
@@ -701,32 +809,47 @@ def read_shops_csv(path: str) -> List[ShopRow]:
                 f"Found: {headers}"
             )
 
+        # Column indices resolved once; each name lists its accepted spellings in priority order.
+        def columns(*names: str) -> Tuple[int, ...]:
+            return tuple(headers.index(n) for n in names if n in header_set)
+
+        shop_cols = columns("shop", "name")
+        city_cols = columns("city")
+        url_cols = columns("shop_url")
+        show_cols = columns("show_in_admin", "enabled")
+        closed_cols = columns("is_closed", "closed")
+
         for r in reader:
-            # Support either column name for shop name
-            shop = (r.get("shop") or r.get("name") or "").strip()
-            city = (r.get("city") or "").strip()
-            shop_url = (r.get("shop_url") or "").strip()
+            shop = _first_cell(r, shop_cols)
+            city = _first_cell(r, city_cols)
+            shop_url = _first_cell(r, url_cols)
 
             if not shop_url or not shop:
                 continue
 
-            show_raw = (r.get("show_in_admin") or r.get("enabled") or "").strip()
-            show = parse_csv_bool(show_raw, default=True)
-            closed_raw = (r.get("is_closed") or r.get("closed") or "").strip()
-            is_closed = parse_csv_bool(closed_raw, default=False)
             out.append(
                 ShopRow(
                     shop=shop,
                     city=city or "Unknown",
                     shop_url=shop_url,
-                    show_in_admin=show,
-                    is_closed=is_closed,
+                    show_in_admin=parse_csv_bool(_first_cell(r, show_cols), default=True),
+                    is_closed=parse_csv_bool(_first_cell(r, closed_cols), default=False),
                 )
             )
 
     return out
 
 
+def _first_cell(row: List[str], indices: Tuple[int, ...]) -> str:
+    """First non-empty stripped cell among indices (short rows count as empty)."""
+    for i in indices:
+        if i < len(row):
+            value = row[i].strip()
+            if value:
+                return value
+    return ""
+
+
 def parse_csv_bool(raw: str, default: bool = True) -> bool:
     """Parse common CSV truthy/falsey toggles."""
     t = (raw or "").strip().lower()
@@ -742,21 +865,22 @@ def parse_csv_bool(raw: str, default: bool = True) -> bool:
 # Scraping / downloading helpers
 # -----------------------------
 
-def restrict_domain_ok(url: str) -> bool:
-    """Allow only known domains to avoid pulling random tracking images."""
-    host = urlparse(url).netloc.lower()
-    return host in ALLOWED_DOMAINS
-
+def image_url_path(url: str) -> Optional[str]:
+    """Path of url if it is an allowed image on an allowed domain, else None.
 
-def is_allowed_image_url(url: str) -> bool:
-    """True if url ends with an allowed image extension."""
-    path = urlparse(url).path.lower()
-    _, ext = os.path.splitext(path)
-    return ext in ALLOWED_IMAGE_EXTS
+    The domain allow-list avoids pulling random tracking images.
+    """
+    m = _IMAGE_URL_RE.match(url)
+    return m.group(1) if m else None
 
 
+@functools.lru_cache(maxsize=2)
 def _ssl_context(verify: bool) -> ssl.SSLContext:
-    """Build TLS context, preferring certifi CA bundle when available."""
+    """Build TLS context, preferring certifi CA bundle when available.
+
+    Cached: loading the CA bundle per request is the costly part, and a context is
+    safe to share across fetch threads.
+    """
     if not verify:
         return ssl._create_unverified_context()
     try:
@@ -780,11 +904,24 @@ def _is_cert_verify_error(err: Exception) -> bool:
     return False
 
 
+# Absolute URLs that normalise_url returns unchanged: lowercase scheme, a host, no fragment
+# or %-escapes, only characters its quote() calls keep, and no empty trailing "?".
+_CLEAN_URL_RE = re.compile(
+    r"[a-z][a-z0-9+.-]*://[A-Za-z0-9:@&+$,;=._~-]+(?:/[A-Za-z0-9/:@&+$,;=._~-]*)?(?:\?[A-Za-z0-9/:@&+$,;=?._~-]+)?"
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def normalise_url(url: str) -> str:
-    """Encode unsafe URL characters (e.g. spaces) without changing semantics."""
+    """Encode unsafe URL characters (e.g. spaces) without changing semantics.
+
+    Cached: every shop page repeats the same site navigation links.
+    """
     raw = (url or "").strip()
     if not raw:
         return ""
+    if _CLEAN_URL_RE.fullmatch(raw):
+        return raw  # nothing below would change it
     p = urlsplit(raw)
     path = quote(unquote(p.path), safe="/%:@&+$,;=-._~()")
     query = quote(unquote(p.query), safe="=&%:@/+$,;?-._~")
@@ -792,62 +929,281 @@ def normalise_url(url: str) -> str:
     return urlunsplit((p.scheme, p.netloc, path, query, fragment))
 
 
-def _http_get(url: str) -> Tuple[bytes, str]:
-    """Download raw bytes and return (body, content_type)."""
-    req = Request(normalise_url(url), headers={"User-Agent": USER_AGENT})
+class _HostRateLimiter:
+    """Space out request starts per host, across all fetch threads."""
+
+    def __init__(self, interval_sec: float) -> None:
+        self.interval_sec = interval_sec
+        self._lock = threading.Lock()
+        self._next_start: Dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.interval_sec
+        if start > now:
+            time.sleep(start - now)
+
+
+_rate_limiter = _HostRateLimiter(MIN_REQUEST_INTERVAL_SEC)
+
+
+def _read_response(resp: HTTPResponse) -> Tuple[bytes, HTTPMessage]:
+    """Read (body, headers), undoing gzip transfer compression."""
+    body = resp.read()
+    if (resp.headers.get("Content-Encoding") or "").strip().lower() == "gzip":
+        body = gzip.decompress(body)
+    return body, resp.headers
+
+
+_T = TypeVar("_T")
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+_thread_local = threading.local()
+
+
+@functools.lru_cache(maxsize=1)
+def _proxies() -> Dict[str, str]:
+    return getproxies()
+
+
+def _keepalive_connection(scheme: str, netloc: str, verify: bool) -> HTTPConnection:
+    """This thread's persistent connection to one host (http.client reopens it after close())."""
+    pool: Dict[Tuple[str, str, bool], HTTPConnection] = _thread_local.__dict__.setdefault("connections", {})
+    key = (scheme, netloc, verify)
+    conn = pool.get(key)
+    if conn is None:
+        if scheme == "https":
+            conn = HTTPSConnection(netloc, timeout=HTTP_TIMEOUT, context=_ssl_context(verify))
+        else:
+            conn = HTTPConnection(netloc, timeout=HTTP_TIMEOUT)
+        pool[key] = conn
+    return conn
+
+
+def _send_get(
+    url: str, headers: Dict[str, str], verify: bool
+) -> Tuple[Optional[HTTPConnection], HTTPResponse]:
+    """Send one GET for url and return (connection, response) without following redirects.
+
+    When a proxy is configured this goes through urlopen instead, and the
+    connection is None.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL scheme: {url}")
+    if parts.scheme in _proxies():
+        return None, urlopen(Request(url, headers=headers), timeout=HTTP_TIMEOUT, context=_ssl_context(verify))
+
+    target = urlunsplit(("", "", parts.path or "/", parts.query, ""))
+    conn = _keepalive_connection(parts.scheme, parts.netloc, verify)
+    for attempt in range(2):
+        reused = conn.sock is not None
+        try:
+            conn.request("GET", target, headers=headers)
+            return conn, conn.getresponse()
+        except Exception as err:
+            conn.close()
+            # The server may have dropped an idle keep-alive socket; retry once on a fresh one.
+            if not (reused and attempt == 0 and isinstance(err, ConnectionError)):
+                raise
+    raise AssertionError("unreachable")
+
+
+def _send_get_with_fallback(url: str, headers: Dict[str, str]) -> Tuple[Optional[HTTPConnection], HTTPResponse]:
     try:
-        with urlopen(req, timeout=HTTP_TIMEOUT, context=_ssl_context(verify=True)) as resp:
-            body = resp.read()
-            content_type = (resp.headers.get("Content-Type") or "").strip()
-        return body, content_type
+        return _send_get(url, headers, verify=True)
     except Exception as err:
         if not (ALLOW_INSECURE_SSL_FALLBACK and _is_cert_verify_error(err)):
             raise
 
-    global _warned_insecure_ssl_fallback
-    if not _warned_insecure_ssl_fallback:
-        print("[WARN] SSL verification failed; falling back to insecure TLS for this run.")
-        _warned_insecure_ssl_fallback = True
+    global _insecure_ssl_fallback_used
+    _insecure_ssl_fallback_used = True
+    return _send_get(url, headers, verify=False)
+
+
+def _http_request(
+    url: str,
+    handle: Callable[[HTTPResponse], _T],
+    accept_gzip: bool = False,
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> _T:
+    """GET url (rate-limited, with the SSL fallback) and return handle(response).
+
+    Requests reuse a keep-alive connection per host on each fetch thread, so a
+    shop's page and image share one TLS handshake with the shops before it.
+    accept_gzip asks for a compressed body; worth it for HTML, not for images
+    that are already compressed. Redirects are followed; other non-2xx answers
+    (including 304) raise HTTPError.
+    """
+    headers = {"User-Agent": USER_AGENT, **(extra_headers or {})}
+    if accept_gzip:
+        headers["Accept-Encoding"] = "gzip"
+    url = normalise_url(url)
+    for _ in range(MAX_REDIRECTS + 1):
+        _rate_limiter.wait(url)
+        conn, resp = _send_get_with_fallback(url, headers)
+        try:
+            location = resp.getheader("Location")
+            if resp.status in _REDIRECT_STATUSES and location:
+                resp.read()
+                url = normalise_url(urljoin(url, location))
+                continue
+            if not 200 <= resp.status < 300:
+                resp.read()
+                raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            return handle(resp)
+        finally:
+            # A connection is only reusable once its response has been read to the end.
+            if conn is None:
+                resp.close()
+            elif not resp.isclosed():
+                conn.close()
+    raise ValueError(f"More than {MAX_REDIRECTS} redirects, last to {url}")
+
+
+def _http_get(
+    url: str,
+    accept_gzip: bool = False,
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> Tuple[bytes, HTTPMessage]:
+    """Download raw bytes and return (body, response headers)."""
+    return _http_request(url, _read_response, accept_gzip=accept_gzip, extra_headers=extra_headers)
 
-    with urlopen(req, timeout=HTTP_TIMEOUT, context=_ssl_context(verify=False)) as resp:
-        body = resp.read()
-        content_type = (resp.headers.get("Content-Type") or "").strip()
-    return body, content_type
 
+_CHARSET_RE = re.compile(r"charset=([a-zA-Z0-9._-]+)", re.IGNORECASE)
 
-def download_text(url: str) -> str:
-    """Download HTML."""
-    body, content_type = _http_get(url)
-    m = re.search(r"charset=([a-zA-Z0-9._-]+)", content_type, flags=re.IGNORECASE)
+
+def _decode_html(body: bytes, content_type: str) -> str:
+    m = _CHARSET_RE.search(content_type)
     encoding = m.group(1) if m else "utf-8"
     return body.decode(encoding, errors="replace")
 
 
-def download_image_bytes(url: str) -> bytes:
-    """
-    Download bytes of an image URL with a safety Content-Type check.
-    If the server returns HTML (e.g. blocked page), we raise ValueError.
+def download_text(url: str, cache_dir: Optional[str] = None) -> str:
+    """Download HTML.
+
+    With cache_dir, a page cached with an ETag/Last-Modified is revalidated and
+    reused on 304; pages served without validators are not cached.
     """
-    body, content_type = _http_get(url)
-    ctype = content_type.lower().strip()
+    if cache_dir is None:
+        body, headers = _http_get(url, accept_gzip=True)
+        return _decode_html(body, (headers.get("Content-Type") or "").strip())
+
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    meta_path = os.path.join(cache_dir, key + ".json")
+    body_path = os.path.join(cache_dir, key + ".html.gz")
+    meta: Dict[str, str] = {}
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+    validators: Dict[str, str] = {}
+    if meta.get("etag"):
+        validators["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        validators["If-Modified-Since"] = meta["last_modified"]
+
+    # Second pass without validators only if a 304'd body turns out to be unreadable.
+    for extra_headers in ((validators, {}) if validators else ({},)):
+        try:
+            body, headers = _http_get(url, accept_gzip=True, extra_headers=extra_headers)
+        except HTTPError as err:
+            if err.code != 304 or not extra_headers:
+                raise
+            try:
+                with gzip.open(body_path, "rb") as f:
+                    return _decode_html(f.read(), meta.get("content_type", ""))
+            except OSError:
+                continue
+        break
+
+    content_type = (headers.get("Content-Type") or "").strip()
+    etag = (headers.get("ETag") or "").strip()
+    last_modified = (headers.get("Last-Modified") or "").strip()
+    if etag or last_modified:
+        _write_file_atomic(cache_dir, body_path, gzip.compress(body))
+        new_meta = {"url": url, "etag": etag, "last_modified": last_modified, "content_type": content_type}
+        _write_file_atomic(cache_dir, meta_path, json.dumps(new_meta).encode("utf-8"))
+    elif meta:
+        try:
+            os.remove(meta_path)  # validators no longer offered; stop sending stale ones
+        except FileNotFoundError:
+            pass
+    return _decode_html(body, content_type)
+
+
+def _write_file_atomic(directory: str, path: str, data: bytes) -> None:
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".write-", delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+def _check_image_content_type(url: str, headers: HTTPMessage) -> None:
+    ctype = (headers.get("Content-Type") or "").lower().strip()
     if ctype and not ctype.startswith("image/"):
         raise ValueError(f"Non-image response (Content-Type={ctype}) for {url}")
-    return body
 
 
-def sha256_bytes(data: bytes) -> str:
-    """Compute sha256 hex digest."""
-    h = hashlib.sha256()
-    h.update(data)
-    return h.hexdigest()
+def download_image(url: str, out_dir: str, result: MenuFetch, known: Optional[KnownMenu] = None) -> None:
+    """
+    Stream an image into a temp file in out_dir, hashing it on the way (fills `result`).
+
+    Sends the stored validators when `known` is for this same URL; a 304 sets
+    result.not_modified and downloads nothing.
+    """
+    extra_headers: Dict[str, str] = {}
+    if known is not None and known.image_url == url:
+        if known.http_etag:
+            extra_headers["If-None-Match"] = known.http_etag
+        if known.http_last_modified:
+            extra_headers["If-Modified-Since"] = known.http_last_modified
+
+    def stream_to_file(resp: HTTPResponse) -> None:
+        _check_image_content_type(url, resp.headers)
+        h = hashlib.sha256()
+        n = 0
+        with tempfile.NamedTemporaryFile(dir=out_dir, prefix=".download-", suffix=".part", delete=False) as tmp:
+            result.tmp_path = tmp.name
+            while chunk := resp.read(DOWNLOAD_CHUNK_BYTES):
+                h.update(chunk)
+                tmp.write(chunk)
+                n += len(chunk)
+        result.sha256, result.num_bytes = h.hexdigest(), n
+        result.http_etag = (resp.headers.get("ETag") or "").strip()
+        result.http_last_modified = (resp.headers.get("Last-Modified") or "").strip()
+
+    try:
+        _http_request(url, stream_to_file, extra_headers=extra_headers)
+    except HTTPError as err:
+        if err.code == 304 and known is not None and extra_headers:
+            result.not_modified = True
+            result.http_etag, result.http_last_modified = known.http_etag, known.http_last_modified
+            return
+        raise
+
+
+def discard_download(result: MenuFetch) -> None:
+    """Remove a temp image that was not moved into place."""
+    if result.tmp_path:
+        try:
+            os.remove(result.tmp_path)
+        except FileNotFoundError:
+            pass
+        result.tmp_path = ""
+
+
+_SLUG_SEPARATORS_RE = re.compile(r"[^a-z0-9]+")
 
 
 def slugify(text: str) -> str:
     """Simple filename-safe slug."""
-    t = text.lower().strip()
-    t = re.sub(r"[^a-z0-9]+", "_", t)
-    t = re.sub(r"_+", "_", t).strip("_")
-    return t or "unknown"
+    # Each run of other characters (underscores included) becomes a single "_",
+    # so one substitution already leaves no "__" to collapse.
+    return _SLUG_SEPARATORS_RE.sub("_", text.lower()).strip("_") or "unknown"
 
 
 class _TagCollector(HTMLParser):
@@ -859,16 +1215,33 @@ class _TagCollector(HTMLParser):
         self.img_srcs: List[str] = []
 
     def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
-        attrs_dict = {k.lower(): (v or "") for k, v in attrs}
-        t = tag.lower()
-        if t == "a":
-            href = attrs_dict.get("href", "").strip()
-            if href:
-                self.anchor_hrefs.append(href)
-        elif t == "img":
-            src = attrs_dict.get("src", "").strip()
-            if src:
-                self.img_srcs.append(src)
+        # HTMLParser already lowercases tag and attribute names.
+        if tag == "a":
+            wanted, found = "href", self.anchor_hrefs
+        elif tag == "img":
+            wanted, found = "src", self.img_srcs
+        else:
+            return
+        # A repeated attribute keeps its last value, like a dict built from attrs.
+        value = ""
+        for k, v in attrs:
+            if k == wanted:
+                value = v or ""
+        value = value.strip()
+        if value:
+            found.append(value)
+
+
+def _collect_tag_urls(html: str) -> Tuple[List[str], List[str]]:
+    """Return (anchor hrefs, img srcs) in document order, via selectolax when installed."""
+    if _FastHTMLParser is not None:
+        tree = _FastHTMLParser(html)
+        hrefs = [(node.attributes.get("href") or "").strip() for node in tree.css("a[href]")]
+        srcs = [(node.attributes.get("src") or "").strip() for node in tree.css("img[src]")]
+        return [h for h in hrefs if h], [s for s in srcs if s]
+    parser = _TagCollector()
+    parser.feed(html)
+    return parser.anchor_hrefs, parser.img_srcs
 
 
 def extract_menu_image_urls(page_url: str, html: str) -> List[str]:
@@ -881,42 +1254,26 @@ def extract_menu_image_urls(page_url: str, html: str) -> List[str]:
     - De-duplicate, preserve order
     - Sort so /Menus/ URLs come first
     """
-    parser = _TagCollector()
-    parser.feed(html)
-    candidates: List[str] = []
+    anchor_hrefs, img_srcs = _collect_tag_urls(html)
+    # url -> path is under /Menus/; dict insertion order de-duplicates and keeps page order
+    candidates: Dict[str, bool] = {}
 
     # Prefer anchors that link to an image file
-    for href in parser.anchor_hrefs:
+    for href in anchor_hrefs:
         abs_url = normalise_url(urljoin(page_url, href))
-        if not restrict_domain_ok(abs_url):
-            continue
-        if not is_allowed_image_url(abs_url):
-            continue
-        candidates.append(abs_url)
+        path = image_url_path(abs_url)
+        if path is not None and abs_url not in candidates:
+            candidates[abs_url] = MENU_PATH_HINT_LOWER in path.lower()
 
     # Add img tags that look like actual menus (avoid logos/buttons)
-    for src in parser.img_srcs:
+    for src in img_srcs:
         abs_url = normalise_url(urljoin(page_url, src))
-        if not restrict_domain_ok(abs_url):
-            continue
-        if not is_allowed_image_url(abs_url):
-            continue
-        path = urlparse(abs_url).path
-        if MENU_PATH_HINT.lower() not in path.lower():
-            continue
-        candidates.append(abs_url)
-
-    # Dedup
-    seen = set()
-    deduped: List[str] = []
-    for u in candidates:
-        if u not in seen:
-            seen.add(u)
-            deduped.append(u)
-
-    # Prefer /Menus/ first
-    deduped.sort(key=lambda u: (MENU_PATH_HINT.lower() not in urlparse(u).path.lower(),))
-    return deduped
+        path = image_url_path(abs_url)
+        if path is not None and abs_url not in candidates and MENU_PATH_HINT_LOWER in path.lower():
+            candidates[abs_url] = True
+
+    # Prefer /Menus/ first (stable sort keeps page order within each group)
+    return sorted(candidates, key=lambda u: not candidates[u])
 
 
 def choose_latest_menu_url(urls: List[str]) -> Optional[str]:
@@ -927,12 +1284,11 @@ def choose_latest_menu_url(urls: List[str]) -> Optional[str]:
     return urls[0] if urls else None
 
 
-def save_image(out_dir: str, city: str, shop: str, sha: str, image_url: str, data: bytes) -> str:
+def store_image(out_dir: str, city: str, shop: str, sha: str, image_url: str, tmp_path: str) -> str:
     """
-    Save the menu image bytes with a logical filename.
+    Move a downloaded menu image to its logical filename.
     Returns local path.
     """
-    os.makedirs(out_dir, exist_ok=True)
     path = urlparse(image_url).path
     base = unquote(os.path.basename(path)) or "menu.jpg"
     city_slug = slugify(city)
@@ -940,27 +1296,159 @@ def save_image(out_dir: str, city: str, shop: str, sha: str, image_url: str, dat
     sha8 = sha[:8]
     filename = f"{city_slug}__{shop_slug}__{sha8}__{base}"
     local_path = os.path.join(out_dir, filename)
-    with open(local_path, "wb") as f:
-        f.write(data)
+    os.replace(tmp_path, local_path)
+    _drop_page_cache(local_path)
     return local_path
 
 
+def _drop_page_cache(path: str) -> None:
+    """Flush a just-saved image and let the kernel evict it; nothing reads it back during a run.
+
+    Dirty pages cannot be dropped, hence the fsync first. No-op where posix_fadvise is missing.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
 # -----------------------------
 # Main routine
 # -----------------------------
 
-def main() -> int:
-    ap = argparse.ArgumentParser(description="Update most recent menu image per shop.")
-    ap.add_argument("--shops", required=True, help="Path to csd.csv containing shops.")
-    ap.add_argument("--db", required=True, help="SQLite DB path (shared with app).")
-    ap.add_argument("--out-dir", default="menus_downloaded", help="Folder to store downloaded images.")
-    args = ap.parse_args()
+def fetch_menu(shop_url: str, out_dir: str, known: Optional[KnownMenu] = None) -> MenuFetch:
+    """Download a shop page and its latest menu image; runs on the fetch threads."""
+    result = MenuFetch()
+    try:
+        html = download_text(shop_url, os.path.join(out_dir, HTML_CACHE_DIRNAME))
+        result.menu_url = choose_latest_menu_url(extract_menu_image_urls(shop_url, html))
+        if result.menu_url:
+            download_image(result.menu_url, out_dir, result, known)
+        else:
+            result.no_menu_url = True
+            result.error_msg = "No menu image URL found on page."
+    except Exception as e:
+        discard_download(result)
+        result.error_msg = str(e)
+    return result
+
+
+def record_menu_fetch(
+    conn: sqlite3.Connection,
+    shop_id: int,
+    shop: ShopRow,
+    shop_url: str,
+    fetch: MenuFetch,
+    out_dir: str,
+) -> Tuple[str, int, str]:
+    """Apply one fetched menu image to the DB (caller commits).
+
+    Returns ("unchanged", active offerings seen, existing local path) or
+    ("new", old offerings archived, saved local path).
+    """
+    menu_url = fetch.menu_url or ""
+    if fetch.not_modified:
+        # 304: the stored hash and size still describe the image.
+        existing_menu = get_existing_menu(conn, shop_id)
+        if existing_menu is None or not existing_menu["sha256"]:
+            raise ValueError(f"Not Modified response but no stored menu for {menu_url}")
+        sha = str(existing_menu["sha256"])
+        num_bytes = int(existing_menu["bytes"] or 0)
+    else:
+        sha = fetch.sha256
+        num_bytes = fetch.num_bytes
+    prev_sha = get_existing_menu_sha(conn, shop_id)
+    had_known_previous_sha = bool(prev_sha)
+
+    if prev_sha == sha:
+        # Menu unchanged; preserve queue state, but still record the observation.
+        existing_menu = get_existing_menu(conn, shop_id)
+        existing_local_path = str(existing_menu["local_path"] or "") if existing_menu else ""
+        preserved_status = touch_menu_seen(
+            conn,
+            shop_id=shop_id,
+            source_page_url=shop_url,
+            image_url=menu_url,
+            sha256=sha,
+            num_bytes=num_bytes,
+            http_etag=fetch.http_etag,
+            http_last_modified=fetch.http_last_modified,
+        )
+        menu_history_id = record_menu_history(
+            conn,
+            shop_id=shop_id,
+            source_page_url=shop_url,
+            image_url=menu_url,
+            local_path=existing_local_path,
+            sha256=sha,
+            num_bytes=num_bytes,
+            event_type="menu_seen",
+            status=preserved_status,
+            error="",
+        )
+        return "unchanged", record_current_offerings_seen(conn, shop_id, menu_history_id), existing_local_path
+
+    # New menu discovered
+    local_path = store_image(out_dir, shop.city, shop.shop, sha, menu_url, fetch.tmp_path)
+    fetch.tmp_path = ""
+
+    # Update DB menu record and mark NEW
+    upsert_menu(
+        conn,
+        shop_id=shop_id,
+        source_page_url=shop_url,
+        image_url=menu_url,
+        local_path=local_path,
+        sha256=sha,
+        num_bytes=num_bytes,
+        status="new",
+        error="",
+        http_etag=fetch.http_etag,
+        http_last_modified=fetch.http_last_modified,
+    )
+    menu_history_id = record_menu_history(
+        conn,
+        shop_id=shop_id,
+        source_page_url=shop_url,
+        image_url=menu_url,
+        local_path=local_path,
+        sha256=sha,
+        num_bytes=num_bytes,
+        event_type="new_menu",
+        status="new",
+        error="",
+    )
+
+    # Only clear if we have a confirmed previous hash -> changed hash transition.
+    # If previous hash was missing (e.g., historic error rows), keep entries.
+    archived_count = 0
+    if had_known_previous_sha:
+        archived_count = archive_active_offerings_for_rebuild(conn, shop_id, menu_history_id)
+        clear_menu_entries(conn, shop_id)
+    return "new", archived_count, local_path
+
+
+def run(shops_csv: str, db_path: str, out_dir: str, log: Callable[[str], None] = print) -> Dict[str, int]:
+    """Check every shop once and return the summary counts.
+
+    Importable entry point (the admin app calls this in-process with its own `log`, one call
+    per line); main() is the CLI wrapper and logs to stdout.
+    """
+    global _insecure_ssl_fallback_used
+    _insecure_ssl_fallback_used = False
+    warned_insecure_ssl = False
 
-    shops = read_shops_csv(args.shops)
-    print(f"[INFO] Loaded {len(shops)} shops from {args.shops}")
+    shops = read_shops_csv(shops_csv)
+    log(f"[INFO] Loaded {len(shops)} shops from {shops_csv}")
 
-    conn = db_connect(args.db)
+    conn = db_connect(db_path)
     db_init(conn)
+    known_menus = load_known_menus(conn)
+    os.makedirs(os.path.join(out_dir, HTML_CACHE_DIRNAME), exist_ok=True)
 
     new_count = 0
     unchanged = 0
@@ -968,129 +1456,111 @@ def main() -> int:
     errors = 0
     skipped = 0
 
-    for i, s in enumerate(shops, start=1):
-        print(f"[{i}/{len(shops)}] {s.city} - {s.shop}")
-
+    shop_urls: List[str] = []
+    for s in shops:
         # Normalise shop_url to absolute
         shop_url = s.shop_url
         if shop_url.startswith("/"):
             shop_url = urljoin("https://www.coffeeshopmenus.org/", shop_url)
-        shop_url = normalise_url(shop_url)
-
-        shop_id = upsert_shop(conn, s.shop, s.city, shop_url, s.show_in_admin, s.is_closed)
-        if s.is_closed:
-            skipped += 1
-            print("  [SKIP] shop marked closed in CSV.")
-            continue
-        if not s.show_in_admin:
-            skipped += 1
-            print("  [SKIP] show_in_admin disabled in CSV.")
-            continue
-
-        try:
-            html = download_text(shop_url)
-            urls = extract_menu_image_urls(shop_url, html)
-            menu_url = choose_latest_menu_url(urls)
-            if not menu_url:
-                mark_menu_error(conn, shop_id, source_page_url=shop_url, error_msg="No menu image URL found on page.")
-                errors += 1
-                print("  [WARN] No menu image URL found.")
-                time.sleep(SLEEP_BETWEEN_SHOPS_SEC)
+        shop_urls.append(normalise_url(shop_url))
+
+    # Closed/hidden shops only need their shops row refreshed: one batched write for all of them.
+    skipped_rows = [(s, shop_urls[i]) for i, s in enumerate(shops) if s.is_closed or not s.show_in_admin]
+    with conn:
+        upsert_shops(conn, skipped_rows)
+
+    # Downloads run ahead on a small pool (politeness is per-host in _http_get); results are
+    # consumed in CSV order, and every DB write happens here on the main thread.
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        fetches: Dict[int, Future] = {}
+        next_submit = 0
+        for i, s in enumerate(shops):
+            while next_submit < len(shops) and next_submit <= i + FETCH_AHEAD:
+                ahead = shops[next_submit]
+                if ahead.show_in_admin and not ahead.is_closed:
+                    known = known_menus.get((ahead.shop, ahead.city))
+                    fetches[next_submit] = pool.submit(fetch_menu, shop_urls[next_submit], out_dir, known)
+                next_submit += 1
+
+            shop_url = shop_urls[i]
+            log(f"[{i + 1}/{len(shops)}] {s.city} - {s.shop}")
+
+            if s.is_closed or not s.show_in_admin:
+                skipped += 1
+                log("  [SKIP] shop marked closed in CSV." if s.is_closed else "  [SKIP] show_in_admin disabled in CSV.")
                 continue
 
-            data = download_image_bytes(menu_url)
-            sha = sha256_bytes(data)
-            prev_sha = get_existing_menu_sha(conn, shop_id)
-            had_known_previous_sha = bool(prev_sha)
-
-            if prev_sha == sha:
-                # Menu unchanged; preserve queue state, but still record the observation.
-                existing_menu = get_existing_menu(conn, shop_id)
-                existing_local_path = str(existing_menu["local_path"] or "") if existing_menu else ""
-                preserved_status = touch_menu_seen(
-                    conn,
-                    shop_id=shop_id,
-                    source_page_url=shop_url,
-                    image_url=menu_url,
-                    sha256=sha,
-                    num_bytes=len(data),
-                )
-                menu_history_id = record_menu_history(
-                    conn,
-                    shop_id=shop_id,
-                    source_page_url=shop_url,
-                    image_url=menu_url,
-                    local_path=existing_local_path,
-                    sha256=sha,
-                    num_bytes=len(data),
-                    event_type="menu_seen",
-                    status=preserved_status,
-                    error="",
-                )
-                seen_count = record_current_offerings_seen(conn, shop_id, menu_history_id)
-                offering_seen_count += seen_count
+            fetch: MenuFetch = fetches.pop(i).result()
+            if _insecure_ssl_fallback_used and not warned_insecure_ssl:
+                log("[WARN] SSL verification failed; falling back to insecure TLS for this run.")
+                warned_insecure_ssl = True
+            error_msg = fetch.error_msg
+            no_menu_url = fetch.no_menu_url
+            outcome, detail, local_path = "", 0, ""
+            try:
+                with conn:
+                    shop_id = upsert_shop(conn, s.shop, s.city, shop_url, s.show_in_admin, s.is_closed)
+                    if error_msg:
+                        mark_menu_error(conn, shop_id, source_page_url=shop_url, error_msg=error_msg)
+                    else:
+                        assert fetch.menu_url is not None
+                        outcome, detail, local_path = record_menu_fetch(conn, shop_id, s, shop_url, fetch, out_dir)
+            except Exception as e:
+                # The shop's writes were rolled back; record the failure on its own.
+                outcome, no_menu_url, error_msg = "", False, str(e)
+                with conn:
+                    shop_id = upsert_shop(conn, s.shop, s.city, shop_url, s.show_in_admin, s.is_closed)
+                    mark_menu_error(conn, shop_id, source_page_url=shop_url, error_msg=error_msg)
+            finally:
+                discard_download(fetch)  # unchanged image, or a failed write
+
+            if outcome == "unchanged":
+                offering_seen_count += detail
                 unchanged += 1
-                print(f"  [OK] Unchanged; recorded menu_seen and {seen_count} active offering(s).")
-                time.sleep(SLEEP_BETWEEN_SHOPS_SEC)
-                continue
-
-            # New menu discovered
-            local_path = save_image(args.out_dir, s.city, s.shop, sha, menu_url, data)
-
-            # Update DB menu record and mark NEW
-            upsert_menu(
-                conn,
-                shop_id=shop_id,
-                source_page_url=shop_url,
-                image_url=menu_url,
-                local_path=local_path,
-                sha256=sha,
-                num_bytes=len(data),
-                status="new",
-                error="",
-            )
-            menu_history_id = record_menu_history(
-                conn,
-                shop_id=shop_id,
-                source_page_url=shop_url,
-                image_url=menu_url,
-                local_path=local_path,
-                sha256=sha,
-                num_bytes=len(data),
-                event_type="new_menu",
-                status="new",
-                error="",
-            )
-
-            # Only clear if we have a confirmed previous hash -> changed hash transition.
-            # If previous hash was missing (e.g., historic error rows), keep entries.
-            if had_known_previous_sha:
-                archived_count = archive_active_offerings_for_rebuild(conn, shop_id, menu_history_id)
-                clear_menu_entries(conn, shop_id)
-                if archived_count:
-                    print(f"       archived {archived_count} old active offering(s) for rebuild")
+                not_modified = " (304 Not Modified)" if fetch.not_modified else ""
+                log(f"  [OK] Unchanged{not_modified}; recorded menu_seen and {detail} active offering(s).")
+            elif outcome == "new":
+                new_count += 1
+                if detail:
+                    log(f"       archived {detail} old active offering(s) for rebuild")
+                log(f"  [NEW] {fetch.menu_url}")
+                log(f"       saved -> {local_path}")
+            else:
+                errors += 1
+                if no_menu_url:
+                    log("  [WARN] No menu image URL found.")
+                else:
+                    log(f"  [ERROR] {error_msg}")
 
-            new_count += 1
-            print(f"  [NEW] {menu_url}")
-            print(f"       saved -> {local_path}")
+    # Fold the WAL back into the DB file: the .sqlite is published and the -wal file is not.
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchall()
+    conn.close()
 
-        except Exception as e:
-            errors += 1
-            mark_menu_error(conn, shop_id, source_page_url=shop_url, error_msg=str(e))
-            print(f"  [ERROR] {e}")
+    log("\n[SUMMARY]")
+    log(f"  New menus:      {new_count}")
+    log(f"  Unchanged:      {unchanged}")
+    log(f"  Offerings seen: {offering_seen_count}")
+    log(f"  Skipped:        {skipped}")
+    log(f"  Errors:         {errors}")
+    log(f"  DB:             {os.path.abspath(db_path)}")
+    log(f"  Images folder:  {os.path.abspath(out_dir)}")
+    return {
+        "new": new_count,
+        "unchanged": unchanged,
+        "offerings_seen": offering_seen_count,
+        "skipped": skipped,
+        "errors": errors,
+    }
 
-        time.sleep(SLEEP_BETWEEN_SHOPS_SEC)
 
-    conn.close()
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Update most recent menu image per shop.")
+    ap.add_argument("--shops", required=True, help="Path to csd.csv containing shops.")
+    ap.add_argument("--db", required=True, help="SQLite DB path (shared with app).")
+    ap.add_argument("--out-dir", default="menus_downloaded", help="Folder to store downloaded images.")
+    args = ap.parse_args()
 
-    print("\n[SUMMARY]")
-    print(f"  New menus:      {new_count}")
-    print(f"  Unchanged:      {unchanged}")
-    print(f"  Offerings seen: {offering_seen_count}")
-    print(f"  Skipped:        {skipped}")
-    print(f"  Errors:         {errors}")
-    print(f"  DB:             {os.path.abspath(args.db)}")
-    print(f"  Images folder:  {os.path.abspath(args.out_dir)}")
+    run(args.shops, args.db, args.out_dir)
     return 0
 
 
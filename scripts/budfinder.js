@@ -177,6 +177,7 @@
     els.shopDirectory.addEventListener('click', handleActionClick);
     els.savedStrains.addEventListener('click', handleSavedClick);
     els.savedStrains.addEventListener('input', handleSavedInput);
+    window.addEventListener('pagehide', flushLocalStateSave);
     els.savedShops.addEventListener('click', handleActionClick);
     els.recentSearches.addEventListener('click', event => {
       const button = event.target.closest('[data-recent-query]');
@@ -1120,7 +1121,7 @@
     const item = state.saved.strains.find(row => row.key === textarea.dataset.noteStrain);
     if (!item) return;
     item.notes = textarea.value.slice(0, 280);
-    saveLocalState();
+    scheduleLocalStateSave();
   }
 
   function selectShop(key) {
@@ -1716,7 +1717,22 @@
     }
   }
 
+  // Typing in a note would otherwise serialise and write the whole saved state on
+  // every keystroke; coalesce those into one trailing write.
+  let localStateSaveTimer = 0;
+
+  function scheduleLocalStateSave() {
+    window.clearTimeout(localStateSaveTimer);
+    localStateSaveTimer = window.setTimeout(saveLocalState, 150);
+  }
+
+  function flushLocalStateSave() {
+    if (localStateSaveTimer) saveLocalState();
+  }
+
   function saveLocalState() {
+    window.clearTimeout(localStateSaveTimer);
+    localStateSaveTimer = 0;
     writeJson(STORAGE_KEY, {
       ...state.saved,
       route: state.route,